@@ -0,0 +1,147 @@
+"""
+Benchmark du provisionnement des formulaires festival.
+
+Exécute `create_all_forms()` contre le serveur NocoDB local (`nocodb_stub.py`) avec une latence
+injectée par requête, et mesure pour chaque scénario :
+- `cold` : base vide, tout est créé
+- `warm` : deuxième passage, tout existe déjà
+
+Rapport JSON : temps total, appels HTTP par endpoint, octets envoyés/reçus, tentatives rejouées.
+
+    python bench_provisioning.py --latency 0.05 --repeat 3 --output bench.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List
+
+import requests
+
+from festival_form_creator import create_all_forms, setup_logging
+from nocodb_stub import NocoDBStub
+from nocodb_transport import NocoDBTransport, endpoint_template
+
+
+class RequestAccounting:
+    """Compteurs alimentés par un hook `response` de la session : une entrée par tentative réelle"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.attempts_by_endpoint: Counter = Counter()
+        self.logical_requests = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.errors = 0
+
+    def on_response(self, response: requests.Response, *args, **kwargs):
+        body = response.request.body or b''
+        with self._lock:
+            self.attempts_by_endpoint[f"{response.request.method} {endpoint_template(response.url)}"] += 1
+            self.bytes_sent += len(body)
+            self.bytes_received += len(response.content)
+            if response.status_code >= 400:
+                self.errors += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        attempts = sum(self.attempts_by_endpoint.values())
+        return {
+            'http_calls': attempts,
+            'calls_by_endpoint': dict(sorted(self.attempts_by_endpoint.items())),
+            'bytes_sent': self.bytes_sent,
+            'bytes_received': self.bytes_received,
+            'retries': attempts - self.logical_requests,
+            'http_errors': self.errors,
+        }
+
+
+class AccountingTransport(NocoDBTransport):
+    """Transport instrumenté : compte les requêtes logiques en plus des tentatives"""
+
+    def __init__(self, accounting: RequestAccounting, **kwargs):
+        super().__init__(**kwargs)
+        self.accounting = accounting
+        self.session.hooks['response'].append(accounting.on_response)
+
+    def request(self, method, url, headers=None, json=None, params=None, **kwargs):
+        with self.accounting._lock:
+            self.accounting.logical_requests += 1
+        return super().request(method, url, headers=headers, json=json, params=params, **kwargs)
+
+
+def run_scenarios(latency: float, error_rate: float, workers: int, seed: int) -> Dict[str, Dict[str, Any]]:
+    """Un passage à froid puis un passage à chaud sur un serveur local neuf"""
+    results = {}
+    with NocoDBStub(latency=latency, error_rate=error_rate, seed=seed) as stub:
+        os.environ.update(stub.env())
+        for scenario in ('cold', 'warm'):
+            accounting = RequestAccounting()
+            # Backoff court : on mesure le coût des tentatives, pas la politique d'attente
+            transport = AccountingTransport(accounting, backoff_base=0.01, backoff_max=0.1)
+            start = time.perf_counter()
+            forms = create_all_forms(max_workers=workers, transport=transport)
+            wall_time = time.perf_counter() - start
+            transport.close()
+            results[scenario] = dict(
+                wall_time_s=round(wall_time, 4),
+                failed_form_types=sorted(k for k, v in forms.items() if 'error' in v),
+                **accounting.snapshot()
+            )
+    return results
+
+
+def summarize(runs: List[Dict[str, Dict[str, Any]]]) -> Dict[str, Any]:
+    """Médiane et min du temps total ; compteurs du premier passage (déterministes hors erreurs injectées)"""
+    summary = {}
+    for scenario in runs[0]:
+        wall_times = [run[scenario]['wall_time_s'] for run in runs]
+        summary[scenario] = dict(
+            runs[0][scenario],
+            wall_time_s=round(statistics.median(wall_times), 4),
+            wall_time_min_s=min(wall_times),
+            wall_time_runs_s=wall_times,
+            retries_runs=[run[scenario]['retries'] for run in runs]
+        )
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du provisionnement contre un NocoDB local")
+    parser.add_argument('--latency', type=float, default=0.05, help="Latence injectée par requête (secondes)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Proportion de réponses 503 injectées")
+    parser.add_argument('--workers', type=int, default=3, help="max_workers de create_all_forms()")
+    parser.add_argument('--repeat', type=int, default=3, help="Nombre de répétitions (médiane rapportée)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Fichier JSON de sortie (stdout par défaut)")
+    args = parser.parse_args()
+
+    # Le logging du script est verbeux : seul le rapport compte ici
+    setup_logging(logging.WARNING)
+    runs = [run_scenarios(args.latency, args.error_rate, args.workers, args.seed + i) for i in range(args.repeat)]
+
+    report = {
+        'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'params': vars(args),
+        'scenarios': summarize(runs),
+    }
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        sys.stdout.write(output + '\n')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""
+Générateur de charge « ouverture des inscriptions » sur les tables des formulaires festival.
+
+Des inscriptions valides sont synthétisées depuis `get_columns()` : textes dans les limites
+« N caractères max. », email, téléphone et URL bien formés, options des SingleSelect, pièces
+jointes factices (URL, nom, type MIME, taille). Un échantillon est vérifié par
+`festival_validation` avant l'envoi.
+
+Les inscriptions arrivent à un débit configurable (processus de Poisson ou intervalles
+réguliers) et sont envoyées par un pool de `--concurrency` connexions. La charge est en boucle
+ouverte : la latence est mesurée depuis l'instant d'arrivée prévu, attente dans le pool
+comprise, pour ne pas masquer une saturation (`service_ms` donne le temps de la seule requête).
+
+Cible : la base configurée dans l'environnement (staging), ou `--stub` pour un serveur local
+provisionné à la volée. Rapport JSON : débit atteint, percentiles de latence, taux d'erreur par
+statut, détail par type de formulaire.
+
+    python bench_registrations.py --stub --rate 50 --duration 20 --output load.json
+    python bench_registrations.py --only stands --rate 5 --duration 60 --concurrency 8
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+from festival_form_creator import FestivalFormCreator, NocoDBError, create_all_forms, parse_form_types, setup_logging
+from festival_validation import compile_rules, validate_rows
+from nocodb_transport import NocoDBTransport
+
+ARRIVALS = ('poisson', 'uniform')
+DEFAULT_RATE = 20.0
+DEFAULT_DURATION = 30.0
+DEFAULT_CONCURRENCY = 16
+# Longueur des textes longs sans limite déclarée
+DEFAULT_TEXT_LENGTH = 800
+VALIDATION_SAMPLE = 50
+
+_WORDS = (
+    "lecture atelier enfants livres classe jeu découverte album conte illustration partage "
+    "bibliothèque écriture histoire imaginaire élèves parcours animation créativité auteur"
+).split()
+
+
+class SubmissionFactory:
+    """Inscriptions synthétiques et valides pour un type de formulaire (clés = titres de colonne)"""
+
+    def __init__(self, form_type: str, seed: int = 0):
+        self.form_type = form_type
+        self.rng = random.Random(seed)
+        self.columns = FestivalFormCreator.columns_for(form_type)
+        self.max_lengths = {rule.column_name: rule.max_length for rule in compile_rules(form_type)}
+
+    def _text(self, limit: int) -> str:
+        words, size = [], 0
+        target = self.rng.randint(limit // 4, limit)
+        while True:
+            word = self.rng.choice(_WORDS)
+            if size + len(word) + 1 > target:
+                break
+            words.append(word)
+            size += len(word) + 1
+        return ' '.join(words).capitalize() or 'Lecture'
+
+    def _value(self, col: Dict[str, Any], index: int) -> Any:
+        uidt, column_name = col['uidt'], col['column_name']
+        limit = self.max_lengths.get(column_name)
+        if uidt == 'Email':
+            return f"inscription{index}@example.org"
+        if uidt == 'PhoneNumber':
+            return f"+32 4{self.rng.randint(70, 99)} {self.rng.randint(100000, 999999)}"
+        if uidt == 'URL':
+            return f"https://example.org/{self.form_type}/{index}"
+        if uidt in ('SingleSelect', 'MultiSelect'):
+            return self.rng.choice(col['colOptions']['options'])['title']
+        if uidt == 'Attachment':
+            size = self.rng.randint(20_000, 600_000)
+            return [{
+                'url': f"https://example.org/uploads/{self.form_type}/{index}/{column_name}.png",
+                'title': f"{column_name}-{index}.png",
+                'mimetype': 'image/png',
+                'size': size,
+            }]
+        if uidt == 'LongText':
+            return self._text(limit or DEFAULT_TEXT_LENGTH)
+        return f"{self._text(min(limit or 40, 40))} {index}"[:limit or None]
+
+    def make(self, index: int) -> Dict[str, Any]:
+        return {col['title']: self._value(col, index) for col in self.columns}
+
+    def check(self, sample: int = VALIDATION_SAMPLE):
+        """Les inscriptions générées passent la validation du schéma"""
+        errors = validate_rows(self.form_type, [self.make(index) for index in range(sample)])
+        if errors:
+            raise ValueError(f"Inscriptions synthétiques invalides pour {self.form_type}: {dict(errors)}")
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    values = sorted(values)
+
+    def at(fraction: float) -> float:
+        return round(values[min(len(values) - 1, int(fraction * len(values)))], 2)
+
+    return {'p50': at(0.50), 'p90': at(0.90), 'p99': at(0.99), 'max': round(values[-1], 2)}
+
+
+def summarize(samples: List[Dict[str, Any]], wall_time: float) -> Dict[str, Any]:
+    ok = [sample for sample in samples if sample['status'] is not None and sample['status'] < 400]
+    errors = Counter(
+        str(sample['status'] or sample['error'])
+        for sample in samples if sample['status'] is None or sample['status'] >= 400
+    )
+    return {
+        'sent': len(samples),
+        'ok': len(ok),
+        'error_rate': round(1 - len(ok) / len(samples), 4) if samples else 0.0,
+        'errors': dict(errors),
+        'throughput_rps': round(len(ok) / wall_time, 2) if wall_time else 0.0,
+        'latency_ms': _percentiles([(sample['end'] - sample['scheduled']) * 1000 for sample in samples]),
+        'service_ms': _percentiles([(sample['end'] - sample['start']) * 1000 for sample in samples]),
+        'queue_ms': _percentiles([(sample['start'] - sample['scheduled']) * 1000 for sample in samples]),
+    }
+
+
+def run_load(
+    form_types: List[str],
+    rate: float = DEFAULT_RATE,
+    duration: float = DEFAULT_DURATION,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    arrival: str = 'poisson',
+    retries: int = 0,
+    seed: int = 0
+) -> Dict[str, Any]:
+    """Envoie les inscriptions au débit demandé pendant `duration` secondes ; renvoie le rapport"""
+    rng = random.Random(seed)
+    factories = {form_type: SubmissionFactory(form_type, seed) for form_type in form_types}
+    for factory in factories.values():
+        factory.check()
+
+    # Sans tentatives par défaut (les 429 doivent apparaître) ni contrôle d'admission
+    transport = NocoDBTransport(pool_size=concurrency, max_retries=retries, backoff_base=0.05, backoff_max=1.0)
+    targets = {}
+    metadata = None
+    for form_type in form_types:
+        creator = FestivalFormCreator(form_type, transport=transport, metadata=metadata)
+        metadata = creator.metadata
+        table = creator.metadata.get_table(creator.form_config['table_name'])
+        if not table:
+            raise NocoDBError(f"La table {creator.form_config['table_name']} n'existe pas : provisionnez d'abord")
+        targets[form_type] = (f"{creator.base_url}/api/v2/tables/{table['id']}/records", creator.headers)
+
+    samples: List[Dict[str, Any]] = []
+    lock = threading.Lock()
+
+    def send(form_type: str, row: Dict[str, Any], scheduled: float):
+        url, headers = targets[form_type]
+        sample = {'form_type': form_type, 'scheduled': scheduled, 'start': time.perf_counter(), 'status': None, 'error': None}
+        try:
+            response = transport.request('POST', url, headers=headers, json=row)
+            sample['status'] = response.status_code
+            response.close()
+        except Exception as e:
+            sample['error'] = e.__class__.__name__
+        sample['end'] = time.perf_counter()
+        with lock:
+            samples.append(sample)
+
+    start = time.perf_counter()
+    offset, index = 0.0, 0
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        while True:
+            offset += rng.expovariate(rate) if arrival == 'poisson' else 1.0 / rate
+            if offset > duration:
+                break
+            form_type = rng.choice(form_types)
+            row = factories[form_type].make(index)
+            index += 1
+            scheduled = start + offset
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(send, form_type, row, scheduled)
+    wall_time = time.perf_counter() - start
+    transport.close()
+
+    report = summarize(samples, wall_time)
+    report.update(
+        offered_rate=rate,
+        wall_time_s=round(wall_time, 3),
+        by_form_type={
+            form_type: summarize([sample for sample in samples if sample['form_type'] == form_type], wall_time)
+            for form_type in form_types
+        },
+    )
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Charge d'ouverture des inscriptions sur les formulaires festival")
+    parser.add_argument('--only', type=parse_form_types, help="Types de formulaire, séparés par des virgules (défaut: tous)")
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE, help="Inscriptions par seconde (toutes tables)")
+    parser.add_argument('--duration', type=float, default=DEFAULT_DURATION, help="Durée de la charge (s)")
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help="Requêtes simultanées maximum")
+    parser.add_argument('--arrival', choices=ARRIVALS, default='poisson')
+    parser.add_argument('--retries', type=int, default=0, help="Tentatives sur 429/503 (0 : erreurs comptées telles quelles)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--stub', action='store_true', help="Serveur NocoDB local provisionné pour l'occasion")
+    parser.add_argument('--stub-latency', type=float, default=0.02, help="Latence du serveur local (s)")
+    parser.add_argument('--stub-error-rate', type=float, default=0.0, help="Proportion de réponses 503 du serveur local")
+    parser.add_argument('--output', help="Fichier JSON de sortie (stdout par défaut)")
+    args = parser.parse_args()
+
+    setup_logging(logging.WARNING)
+    form_types = args.only or list(FestivalFormCreator.FORM_TYPES)
+
+    stub = None
+    if args.stub:
+        from nocodb_stub import NocoDBStub
+
+        stub = NocoDBStub(latency=args.stub_latency, error_rate=args.stub_error_rate, seed=args.seed).start()
+        os.environ.update(stub.env())
+        create_all_forms(form_types=form_types)
+    try:
+        report = run_load(form_types, args.rate, args.duration, args.concurrency, args.arrival, args.retries, args.seed)
+        if stub is not None:
+            report['stub_records'] = {
+                form_type: len(stub.state.records[stub.state.table_by_name(
+                    FestivalFormCreator.FORM_TYPES[form_type]['table_name'])['id']])
+                for form_type in form_types
+            }
+    finally:
+        if stub is not None:
+            stub.stop()
+
+    report = {'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'), 'params': vars(args), **report}
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        sys.stdout.write(output + '\n')
+
+
+if __name__ == "__main__":
+    main()
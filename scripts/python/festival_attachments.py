@@ -0,0 +1,303 @@
+"""
+Récupération parallèle des pièces jointes (logo, photo) des inscriptions festival.
+
+- Téléchargements concurrents via le transport NocoDB partagé (pool borné)
+- Déduplication par contenu : chaque fichier est stocké une seule fois sous `objects/<sha256>`,
+  et une même URL n'est téléchargée qu'une fois même si plusieurs lignes la référencent
+- Reprise : le manifeste `attachments.json` est enregistré au fil de l'eau, les fichiers déjà
+  présents ne sont pas retéléchargés
+- Contrôle des dimensions (PNG/JPG, 600 px de large minimum, cf. aide des colonnes) et génération
+  des tailles dérivées en WebP dans un pool de processus (Pillow requis pour cette étape)
+
+Les lignes sont lues dans l'instantané produit par `festival_export.py`.
+
+    python festival_attachments.py --snapshot festival_snapshot --store festival_attachments
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from festival_export import iter_snapshot_rows, row_value
+from festival_form_creator import FestivalFormCreator, NocoDBError, parse_form_types, setup_logging
+from nocodb_transport import NocoDBTransport, get_shared_transport
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SNAPSHOT_DIR = 'festival_snapshot'
+DEFAULT_STORE_DIR = 'festival_attachments'
+DEFAULT_DOWNLOAD_WORKERS = 8
+# Largeur minimale demandée dans l'aide des colonnes Attachment
+MIN_WIDTH = 600
+ALLOWED_FORMATS = frozenset({'PNG', 'JPEG'})
+DERIVED_WIDTHS = (320, 640, 1200)
+MANIFEST_SAVE_EVERY = 20
+
+EXTENSIONS = {'image/png': '.png', 'image/jpeg': '.jpg', 'image/jpg': '.jpg', 'image/webp': '.webp'}
+
+
+def attachment_fields(form_type: str) -> List[Tuple[str, str]]:
+    """(column_name, title) des colonnes Attachment déclarées pour ce type de formulaire"""
+    return [
+        (col['column_name'], col['title'])
+        for col in FestivalFormCreator.columns_for(form_type)
+        if col['uidt'] == 'Attachment'
+    ]
+
+
+def attachment_key(attachment: Dict[str, Any]) -> Optional[str]:
+    """Clé stable d'une pièce jointe : chemin NocoDB, sinon URL sans paramètres signés"""
+    if attachment.get('path'):
+        return attachment['path']
+    url = attachment.get('url') or attachment.get('signedUrl')
+    return url.split('?', 1)[0] if url else None
+
+
+def attachment_url(attachment: Dict[str, Any], base_url: str) -> Optional[str]:
+    url = attachment.get('signedUrl') or attachment.get('url')
+    if url:
+        return url
+    path = attachment.get('signedPath') or attachment.get('path')
+    return f"{base_url}/{path.lstrip('/')}" if path else None
+
+
+def iter_attachments(snapshot_dir: str, form_types: List[str]) -> Iterator[Dict[str, Any]]:
+    """Références (table, ligne, champ, pièce jointe) trouvées dans l'instantané"""
+    for form_type in form_types:
+        table_name = FestivalFormCreator.FORM_TYPES[form_type]['table_name']
+        fields = attachment_fields(form_type)
+        for row in iter_snapshot_rows(snapshot_dir, form_type):
+            for column_name, title in fields:
+                value = row_value(row, column_name, title)
+                if isinstance(value, str):
+                    try:
+                        value = json.loads(value)
+                    except ValueError:
+                        continue
+                for attachment in value or []:
+                    if isinstance(attachment, dict):
+                        yield {
+                            'table_name': table_name,
+                            'row_id': row.get('Id'),
+                            'field': column_name,
+                            'attachment': attachment,
+                        }
+
+
+def process_image(object_path: str, derived_dir: str, widths: Tuple[int, ...] = DERIVED_WIDTHS) -> Dict[str, Any]:
+    """
+    Vérifie format et dimensions puis génère les tailles dérivées (exécuté dans un processus séparé).
+    Les tailles déjà générées ne sont pas recalculées.
+    """
+    from PIL import Image
+
+    sha256 = os.path.basename(object_path).split('.', 1)[0]
+    issues = []
+    derived = {}
+    with Image.open(object_path) as image:
+        width, height = image.size
+        if image.format not in ALLOWED_FORMATS:
+            issues.append(f"format {image.format} (PNG ou JPG attendu)")
+        if width < MIN_WIDTH:
+            issues.append(f"largeur {width}px < {MIN_WIDTH}px")
+        for target in widths:
+            if target >= width:
+                continue
+            target_path = os.path.join(derived_dir, f"{sha256}-{target}.webp")
+            if not os.path.exists(target_path):
+                resized = image.convert('RGBA' if image.mode in ('RGBA', 'LA', 'P') else 'RGB')
+                resized = resized.resize((target, round(height * target / width)), Image.LANCZOS)
+                resized.save(f"{target_path}.tmp", 'WEBP', quality=80)
+                os.replace(f"{target_path}.tmp", target_path)
+            derived[str(target)] = os.path.relpath(target_path, os.path.dirname(derived_dir))
+    return {'width': width, 'height': height, 'format': image.format, 'issues': issues, 'derived': derived}
+
+
+class AttachmentStore:
+    """Stockage adressé par contenu et manifeste de reprise"""
+
+    def __init__(self, store_dir: str):
+        self.store_dir = store_dir
+        self.objects_dir = os.path.join(store_dir, 'objects')
+        self.derived_dir = os.path.join(store_dir, 'derived')
+        self.manifest_path = os.path.join(store_dir, 'attachments.json')
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.derived_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._pending_saves = 0
+        self.manifest = self._load()
+
+    def _load(self) -> Dict[str, Any]:
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, encoding='utf-8') as f:
+                return json.load(f)
+        return {'downloads': {}, 'objects': {}}
+
+    def save(self):
+        with self._lock:
+            tmp_path = f"{self.manifest_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.manifest, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self.manifest_path)
+            self._pending_saves = 0
+
+    def is_done(self, key: str) -> bool:
+        entry = self.manifest['downloads'].get(key)
+        return bool(entry and entry.get('sha256') and os.path.exists(self.object_path(entry['sha256'], entry['ext'])))
+
+    def object_path(self, sha256: str, ext: str) -> str:
+        return os.path.join(self.objects_dir, f"{sha256}{ext}")
+
+    def put(self, key: str, content: bytes, mimetype: Optional[str]) -> str:
+        """Enregistre le contenu (une seule fois par empreinte) et renvoie son sha256"""
+        sha256 = hashlib.sha256(content).hexdigest()
+        ext = EXTENSIONS.get((mimetype or '').lower(), '')
+        path = self.object_path(sha256, ext)
+        if not os.path.exists(path):
+            # Deux téléchargements parallèles peuvent produire le même contenu
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        with self._lock:
+            self.manifest['downloads'][key] = {'sha256': sha256, 'ext': ext, 'size': len(content)}
+            self.manifest['objects'].setdefault(sha256, {'ext': ext})
+            self._pending_saves += 1
+            save_now = self._pending_saves >= MANIFEST_SAVE_EVERY
+        if save_now:
+            self.save()
+        return sha256
+
+    def record_error(self, key: str, error: str):
+        with self._lock:
+            self.manifest['downloads'][key] = {'error': error}
+
+
+def fetch_attachments(
+    snapshot_dir: str = DEFAULT_SNAPSHOT_DIR,
+    store_dir: str = DEFAULT_STORE_DIR,
+    form_types: Optional[List[str]] = None,
+    download_workers: int = DEFAULT_DOWNLOAD_WORKERS,
+    process_workers: Optional[int] = None,
+    base_url: Optional[str] = None,
+    transport: Optional[NocoDBTransport] = None
+) -> Dict[str, Any]:
+    """
+    Télécharge, déduplique et contrôle toutes les pièces jointes de l'instantané.
+    Écrit `report.json` (une entrée par référence ligne/champ) dans store_dir et le renvoie.
+    """
+    # Comme FestivalFormCreator : configuration NocoDB (URL, jeton, NOCODB_RATE_*) lue dans .env
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    form_types = form_types or list(FestivalFormCreator.FORM_TYPES.keys())
+    base_url = (base_url or os.getenv('NOCODB_BASE_URL') or '').rstrip('/')
+    api_token = os.getenv('NOCODB_API_TOKEN')
+    transport = transport or get_shared_transport()
+    store = AttachmentStore(store_dir)
+
+    references = list(iter_attachments(snapshot_dir, form_types))
+    todo: Dict[str, Dict[str, Any]] = {}
+    for ref in references:
+        key = attachment_key(ref['attachment'])
+        ref['key'] = key
+        if key and key not in todo and not store.is_done(key):
+            todo[key] = ref['attachment']
+    logger.info(f"{len(references)} pièce(s) jointe(s) référencée(s), {len(todo)} à télécharger")
+
+    def download(key: str, attachment: Dict[str, Any]):
+        url = attachment_url(attachment, base_url)
+        if not url:
+            raise NocoDBError("URL de pièce jointe manquante")
+        # Les fichiers servis par NocoDB lui-même exigent le jeton
+        headers = {'xc-token': api_token} if api_token and base_url and url.startswith(base_url) else None
+        response = transport.request('GET', url, headers=headers)
+        response.raise_for_status()
+        mimetype = attachment.get('mimetype') or response.headers.get('Content-Type', '').split(';')[0]
+        return store.put(key, response.content, mimetype)
+
+    with ThreadPoolExecutor(max_workers=max(1, download_workers)) as executor:
+        futures = {executor.submit(download, key, att): key for key, att in todo.items()}
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                logger.warning(f"Échec du téléchargement de {key}: {str(e)}")
+                store.record_error(key, str(e))
+    store.save()
+
+    # Contrôle et tailles dérivées : une fois par contenu, dans un pool de processus
+    objects = store.manifest['objects']
+    to_process = {sha: obj for sha, obj in objects.items() if 'width' not in obj and 'error' not in obj}
+    if to_process:
+        try:
+            import PIL  # noqa: F401
+        except ImportError:
+            logger.warning("Pillow n'est pas installé : contrôle des dimensions et tailles dérivées ignorés")
+            to_process = {}
+    with ProcessPoolExecutor(max_workers=process_workers) as executor:
+        futures = {
+            executor.submit(process_image, store.object_path(sha, obj['ext']), store.derived_dir): sha
+            for sha, obj in to_process.items()
+        }
+        for future in as_completed(futures):
+            sha = futures[future]
+            try:
+                objects[sha].update(future.result())
+            except Exception as e:
+                objects[sha]['error'] = str(e)
+    store.save()
+
+    report = []
+    for ref in references:
+        download_entry = store.manifest['downloads'].get(ref['key']) or {}
+        obj = objects.get(download_entry.get('sha256'), {})
+        issues = list(obj.get('issues', []))
+        if download_entry.get('error') or obj.get('error'):
+            issues.append(download_entry.get('error') or obj.get('error'))
+        report.append({
+            'table_name': ref['table_name'],
+            'row_id': ref['row_id'],
+            'field': ref['field'],
+            'sha256': download_entry.get('sha256'),
+            'width': obj.get('width'),
+            'height': obj.get('height'),
+            'derived': obj.get('derived', {}),
+            'ok': bool(download_entry.get('sha256')) and not issues,
+            'issues': issues,
+        })
+
+    summary = {
+        'references': len(report),
+        'unique_objects': len(objects),
+        'failed': sum(1 for entry in report if not entry['ok']),
+        'attachments': report,
+    }
+    with open(os.path.join(store_dir, 'report.json'), 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+    logger.info(f"{summary['unique_objects']} fichier(s) unique(s), {summary['failed']} référence(s) en erreur")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Téléchargement et contrôle des logos/photos des inscriptions")
+    parser.add_argument('--snapshot', default=DEFAULT_SNAPSHOT_DIR, help="Dossier produit par festival_export.py")
+    parser.add_argument('--store', default=DEFAULT_STORE_DIR)
+    parser.add_argument('--only', type=parse_form_types, help="Types de formulaire, séparés par des virgules")
+    parser.add_argument('--workers', type=int, default=DEFAULT_DOWNLOAD_WORKERS, help="Téléchargements simultanés")
+    parser.add_argument('--processes', type=int, default=None, help="Processus de traitement d'image")
+    args = parser.parse_args()
+    setup_logging()
+
+    form_types = args.only
+    fetch_attachments(args.snapshot, args.store, form_types, args.workers, args.processes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Provisionnement de plusieurs bases / éditions du festival à partir d'un seul fichier de configuration.
+
+    python festival_batch.py editions.json
+    python festival_batch.py editions.json --dry-run
+
+Format (voir `editions.example.json`) :
+- `defaults` : base_url, api_token_env, form_types et overrides communs à toutes les éditions
+- `editions` : liste de {name, base_id, [base_url], [api_token_env], [form_types], [overrides]}
+- `max_concurrent_bases` : nombre de bases provisionnées en même temps
+- `per_base_workers` : types de formulaire provisionnés en parallèle dans une même base
+
+Toutes les éditions partagent un seul pool de connexions HTTP. Les éditions d'une même base
+sont traitées l'une après l'autre (pas de créations concurrentes dans une même base) ; les
+bases différentes avancent en parallèle, dans la limite de `max_concurrent_bases`, ce qui borne
+le nombre de requêtes simultanées à max_concurrent_bases × per_base_workers.
+"""
+
+import argparse
+import json
+import logging
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from festival_form_creator import FestivalFormCreator, NocoDBError, _deep_merge, create_all_forms, setup_logging
+from nocodb_admission import AdmissionControl
+from nocodb_journal import DEFAULT_JOURNAL_PATH, ProvisioningJournal
+from nocodb_transport import DryRunTransport, NocoDBTransport
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENT_BASES = 2
+DEFAULT_PER_BASE_WORKERS = 3
+DEFAULT_API_TOKEN_ENV = 'NOCODB_API_TOKEN'
+
+
+def load_batch_config(path: str) -> Dict[str, Any]:
+    """Lit le fichier de configuration et résout chaque édition (défauts + surcharges)"""
+    with open(path, encoding='utf-8') as f:
+        raw = json.load(f)
+
+    defaults = raw.get('defaults', {})
+    editions = []
+    for index, entry in enumerate(raw.get('editions', [])):
+        edition = _deep_merge(defaults, entry)
+        edition.setdefault('name', f"edition_{index + 1}")
+        edition.setdefault('base_url', os.getenv('NOCODB_BASE_URL'))
+        if not edition.get('base_url') or not edition.get('base_id'):
+            raise NocoDBError(f"Édition {edition['name']}: base_url et base_id sont requis")
+        form_types = edition.get('form_types')
+        if form_types is not None:
+            if not isinstance(form_types, list):
+                raise NocoDBError(f"Édition {edition['name']}: form_types doit être une liste")
+            unknown = [form_type for form_type in form_types if form_type not in FestivalFormCreator.FORM_TYPES]
+            if unknown:
+                raise NocoDBError(
+                    f"Édition {edition['name']}: type(s) de formulaire inconnu(s) {', '.join(map(str, unknown))} "
+                    f"(attendus : {', '.join(FestivalFormCreator.FORM_TYPES)})"
+                )
+        editions.append(edition)
+
+    names = [edition['name'] for edition in editions]
+    if len(set(names)) != len(names):
+        raise NocoDBError("Les noms d'édition doivent être uniques")
+
+    return {
+        'editions': editions,
+        'max_concurrent_bases': raw.get('max_concurrent_bases', DEFAULT_MAX_CONCURRENT_BASES),
+        'per_base_workers': raw.get('per_base_workers', DEFAULT_PER_BASE_WORKERS),
+    }
+
+
+def _connection(edition: Dict[str, Any]) -> Dict[str, str]:
+    token_env = edition.get('api_token_env', DEFAULT_API_TOKEN_ENV)
+    api_token = os.getenv(token_env)
+    if not api_token:
+        raise NocoDBError(f"Édition {edition['name']}: variable d'environnement {token_env} manquante")
+    return {'base_url': edition['base_url'], 'base_id': edition['base_id'], 'api_token': api_token}
+
+
+def provision_batch(
+    config: Dict[str, Any],
+    transport: Optional[NocoDBTransport] = None,
+    journal: Optional[ProvisioningJournal] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Provisionne toutes les éditions ; renvoie {nom d'édition: résultats de create_all_forms}.
+    Une édition en erreur (configuration, jeton) n'interrompt pas les autres.
+    Le journal (indexé par base et table) est partagé par toutes les éditions.
+    """
+    max_bases = max(1, config['max_concurrent_bases'])
+    per_base_workers = max(1, config['per_base_workers'])
+    transport = transport or NocoDBTransport(
+        pool_size=max_bases * per_base_workers,
+        admission=AdmissionControl.from_env()
+    )
+
+    groups: Dict[tuple, List[Dict[str, Any]]] = OrderedDict()
+    for edition in config['editions']:
+        groups.setdefault((edition['base_url'].rstrip('/'), edition['base_id']), []).append(edition)
+
+    def provision_base(editions: List[Dict[str, Any]]) -> Dict[str, Any]:
+        results = {}
+        for edition in editions:
+            logger.info(f"Édition {edition['name']} (base {edition['base_id']})")
+            try:
+                results[edition['name']] = create_all_forms(
+                    max_workers=per_base_workers,
+                    transport=transport,
+                    form_types=edition.get('form_types'),
+                    overrides=edition.get('overrides'),
+                    connection=_connection(edition),
+                    journal=journal,
+                )
+            except NocoDBError as e:
+                logger.error(str(e))
+                results[edition['name']] = {'error': str(e)}
+        return results
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=min(max_bases, len(groups) or 1)) as executor:
+        futures = [executor.submit(provision_base, editions) for editions in groups.values()]
+        for future in as_completed(futures):
+            results.update(future.result())
+
+    # Ordre du fichier de configuration
+    return {edition['name']: results[edition['name']] for edition in config['editions']}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Provisionnement de plusieurs bases / éditions du festival")
+    parser.add_argument('config', help="Fichier JSON des éditions (voir editions.example.json)")
+    parser.add_argument('--dry-run', action='store_true', help="Affiche les requêtes prévues sans les envoyer")
+    parser.add_argument(
+        '--journal', default=DEFAULT_JOURNAL_PATH,
+        help="Journal des étapes terminées, pour reprendre une exécution interrompue ('' pour désactiver)"
+    )
+    args = parser.parse_args()
+    setup_logging()
+
+    load_dotenv()
+    config = load_batch_config(args.config)
+    transport = DryRunTransport() if args.dry_run else None
+    journal = ProvisioningJournal(args.journal) if args.journal and not args.dry_run else None
+    results = provision_batch(config, transport, journal)
+    if args.dry_run:
+        print(json.dumps(transport.planned_requests, indent=2, ensure_ascii=False))
+    else:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Point d'entrée en ligne de commande des scripts festival.
+
+    python festival_cli.py status [--metadata-cache .nocodb_metadata.json]
+    python festival_cli.py provision --only stands,ateliers [--dry-run] [--trace trace.json] [--journal FILE]
+    python festival_cli.py plan [--apply]
+    python festival_cli.py export --output-dir festival_snapshot
+    python festival_cli.py validate --snapshot festival_snapshot
+
+Au démarrage, seuls argparse et la bibliothèque standard sont chargés. requests, dotenv et
+coloredlogs sont importés par la sous-commande qui en a besoin (requests à la première requête).
+
+`status` vérifie que chaque table existe et porte l'empreinte du schéma courant (code de
+sortie 1 sinon). Avec `--metadata-cache`, l'instantané des métadonnées est relu sur disque :
+tant qu'il est frais, aucune requête n'est envoyée et requests n'est jamais importé.
+
+`provision` journalise chaque étape terminée (table, formulaire, empreinte, webhooks) : après
+une interruption, la commande relancée ne refait que les étapes manquantes.
+"""
+
+import argparse
+import json
+import logging
+import sys
+from typing import List, Optional
+
+from nocodb_journal import DEFAULT_JOURNAL_PATH, ProvisioningJournal
+from nocodb_tracing import TRACE_FORMATS
+
+
+def _form_types(value: str) -> List[str]:
+    """Valeur de --only (festival_form_creator n'est importé que si l'option est donnée)"""
+    from festival_form_creator import parse_form_types
+
+    return parse_form_types(value)
+
+
+def _print_json(value):
+    print(json.dumps(value, indent=2, ensure_ascii=False))
+
+
+# Sous-commandes
+
+
+def cmd_status(args) -> int:
+    from festival_form_creator import FestivalFormCreator
+    from festival_form_schema import FINGERPRINT_META_KEY, FORM_ID_META_KEY, table_meta
+    from nocodb_metadata import BaseMetadataSnapshot
+
+    form_types = args.only or list(FestivalFormCreator.FORM_TYPES)
+    first = FestivalFormCreator(form_types[0])
+    metadata = BaseMetadataSnapshot(first.base_id, first._make_request, args.metadata_cache, args.metadata_ttl)
+
+    report = {}
+    for form_type in form_types:
+        creator = FestivalFormCreator(form_type, metadata=metadata)
+        table = metadata.get_table(creator.form_config['table_name'])
+        meta = table_meta(table)
+        report[form_type] = {
+            'table_name': creator.form_config['table_name'],
+            'table_id': table['id'] if table else None,
+            'form_id': meta.get(FORM_ID_META_KEY),
+            'fingerprint': creator.schema.fingerprint,
+            'deployed_fingerprint': meta.get(FINGERPRINT_META_KEY),
+            'up_to_date': bool(table) and creator.is_up_to_date(table),
+        }
+    _print_json(report)
+    return 0 if all(entry['up_to_date'] for entry in report.values()) else 1
+
+
+def cmd_provision(args) -> int:
+    from festival_form_creator import create_all_forms
+    from nocodb_transport import DryRunTransport
+
+    transport = DryRunTransport() if args.dry_run else None
+    # Les identifiants d'un essai à blanc sont fictifs : rien n'est journalisé
+    journal = ProvisioningJournal(args.journal) if args.journal and not args.dry_run else None
+    results = create_all_forms(
+        max_workers=args.workers,
+        metadata_cache=args.metadata_cache,
+        transport=transport,
+        form_types=args.only,
+        trace_output=args.trace,
+        trace_format=args.trace_format,
+        journal=journal,
+    )
+    _print_json(transport.planned_requests if args.dry_run else results)
+    return 1 if any('error' in result for result in results.values()) else 0
+
+
+def cmd_plan(args) -> int:
+    from festival_form_creator import migrate_all_forms
+
+    results = migrate_all_forms(apply=args.apply, max_workers=args.workers, form_types=args.only)
+    _print_json(results)
+    return 1 if any(isinstance(result, dict) and 'error' in result for result in results.values()) else 0
+
+
+def cmd_export(args) -> int:
+    from festival_export import DEFAULT_CONCURRENCY, DEFAULT_OUTPUT_DIR, DEFAULT_PAGE_SIZE, export_all
+
+    manifest = export_all(
+        args.output_dir or DEFAULT_OUTPUT_DIR,
+        args.only,
+        args.page_size or DEFAULT_PAGE_SIZE,
+        args.concurrency or DEFAULT_CONCURRENCY,
+    )
+    _print_json(manifest)
+    return 0
+
+
+def cmd_validate(args) -> int:
+    from festival_export import DEFAULT_OUTPUT_DIR
+    from festival_validation import validate_snapshot
+
+    report = validate_snapshot(args.snapshot or DEFAULT_OUTPUT_DIR, args.only)
+    _print_json(report)
+    return 0 if report['valid'] else 1
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Formulaires et inscriptions du festival OOTB")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        '--only', type=_form_types,
+        help="Types de formulaire séparés par des virgules, ex: stands,ateliers (défaut: tous)"
+    )
+    common.add_argument('-v', '--verbose', action='store_true', help="Journal détaillé")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    status = subparsers.add_parser('status', parents=[common], help="Tables à jour ? (code de sortie 1 sinon)")
+    status.add_argument('--metadata-cache', help="Instantané des métadonnées sur disque (réutilisé s'il est frais)")
+    status.add_argument('--metadata-ttl', type=float, default=300.0, help="Durée de validité de l'instantané (s)")
+    status.set_defaults(handler=cmd_status, log_level=logging.WARNING)
+
+    provision = subparsers.add_parser('provision', parents=[common], help="Crée tables et formulaires")
+    provision.add_argument('--dry-run', action='store_true', help="Enregistre les requêtes prévues sans les envoyer")
+    provision.add_argument('--workers', type=int, default=3, help="Types de formulaire provisionnés en parallèle")
+    provision.add_argument('--metadata-cache', help="Instantané des métadonnées sur disque")
+    provision.add_argument('--trace', help="Fichier de trace (spans et histogrammes de latence)")
+    provision.add_argument('--trace-format', choices=TRACE_FORMATS, default='json')
+    provision.add_argument(
+        '--journal', default=DEFAULT_JOURNAL_PATH,
+        help="Journal des étapes terminées, pour reprendre une exécution interrompue ('' pour désactiver)"
+    )
+    provision.set_defaults(handler=cmd_provision, log_level=logging.INFO)
+
+    plan = subparsers.add_parser('plan', parents=[common], help="Plan de migration des colonnes")
+    plan.add_argument('--apply', action='store_true', help="Applique le plan")
+    plan.add_argument('--workers', type=int, default=3)
+    plan.set_defaults(handler=cmd_plan, log_level=logging.INFO)
+
+    export = subparsers.add_parser('export', parents=[common], help="Export des inscriptions vers un instantané local")
+    export.add_argument('--output-dir')
+    export.add_argument('--page-size', type=int)
+    export.add_argument('--concurrency', type=int, help="Pages récupérées en parallèle")
+    export.set_defaults(handler=cmd_export, log_level=logging.INFO)
+
+    validate = subparsers.add_parser('validate', parents=[common], help="Valide l'instantané contre le schéma déclaré")
+    validate.add_argument('--snapshot', help="Dossier produit par la commande export")
+    validate.set_defaults(handler=cmd_validate, log_level=logging.INFO)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    from festival_form_creator import NocoDBError, setup_logging
+
+    setup_logging(logging.DEBUG if args.verbose else args.log_level)
+    try:
+        return args.handler(args)
+    except NocoDBError as e:
+        logging.getLogger(__name__).error(str(e))
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,312 @@
+"""
+Détection des inscriptions en double, par lot, sur les trois formulaires festival.
+
+La détection du site (`calculateSimilarity` dans `src/config/nocodb.ts`) compare toutes les paires
+(O(n²·L²)). Ici, les paires candidates sont d'abord regroupées par blocs :
+- MinHash/LSH sur les trigrammes du titre (titres proches -> même seau dans au moins une bande)
+- email normalisé identique
+- nom normalisé identique
+
+Un bloc de plus de MAX_BLOCK_SIZE lignes (titre très courant, email d'une structure...) n'est
+pas comparé paire par paire : chaque ligne l'est à ses SORTED_WINDOW voisines dans l'ordre du
+titre normalisé, puis du titre inversé (voisinage trié), ce qui garde les quasi-doublons dont le
+début ou la fin diffère. Les lignes sans titre ne sont jamais appariées.
+
+La similarité exacte (Levenshtein normalisée, identique à `calculateSimilarity`) n'est calculée
+qu'à l'intérieur des blocs, et seulement pour les paires qui passent le filtre des q-grammes
+(deux chaînes à distance d partagent au moins max(|Ga|, |Gb|) - q·d trigrammes distincts). Les paires retenues sont regroupées en clusters (union-find), par table
+et entre tables.
+
+    python festival_dedup.py --snapshot festival_snapshot --output duplicates.json
+"""
+
+import argparse
+import json
+import logging
+import random
+import re
+import time
+import unicodedata
+import zlib
+from collections import defaultdict
+from itertools import combinations
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from festival_export import DEFAULT_OUTPUT_DIR, iter_snapshot_rows, row_value
+from festival_form_creator import FestivalFormCreator, parse_form_types, setup_logging
+
+logger = logging.getLogger(__name__)
+
+# Même seuil que la détection côté site
+DEFAULT_THRESHOLD = 0.9
+# Seuil sur le titre quand l'email est identique
+SAME_EMAIL_THRESHOLD = 0.7
+NGRAM_SIZE = 3
+# 32 fonctions de hachage en 8 bandes de 4 : paires de Jaccard ~0.5 détectées avec une probabilité > 0.9
+MINHASH_BANDS = 8
+MINHASH_ROWS = 4
+MAX_BLOCK_SIZE = 200
+# Voisines comparées à chaque ligne d'un bloc trop grand, par ordre de titre
+SORTED_WINDOW = 20
+
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+
+def normalize(value: Any) -> str:
+    """Minuscules, sans accents ni ponctuation"""
+    if not value:
+        return ''
+    text = unicodedata.normalize('NFKD', str(value)).encode('ascii', 'ignore').decode('ascii')
+    return _NON_ALNUM.sub(' ', text.lower()).strip()
+
+
+def ngrams(text: str, size: int = NGRAM_SIZE) -> FrozenSet[str]:
+    """N-grammes distincts du texte entouré d'espaces"""
+    padded = f" {text} "
+    return frozenset(padded[i:i + size] for i in range(max(1, len(padded) - size + 1)))
+
+
+def passes_ngram_filter(a: str, b: str, grams_a: FrozenSet[str], grams_b: FrozenSet[str], minimum: float) -> bool:
+    """
+    Filtre sans calcul de Levenshtein : chaque édition détruit au plus q n-grammes, donc
+    à distance d, au moins max(|Ga|, |Gb|) - q·d n-grammes distincts sont communs.
+    """
+    longest = max(len(a), len(b))
+    max_distance = int((1 - minimum) * longest + 1e-9)
+    if abs(len(a) - len(b)) > max_distance:
+        return False
+    required = max(len(grams_a), len(grams_b)) - NGRAM_SIZE * max_distance
+    return required <= 0 or len(grams_a & grams_b) >= required
+
+
+def similarity(a: str, b: str, minimum: float = 0.0) -> float:
+    """
+    Levenshtein normalisée : 1 - distance / longueur max.
+    Seule la bande diagonale compatible avec `minimum` est calculée (Ukkonen) ; renvoie 0
+    dès que `minimum` n'est plus atteignable.
+    """
+    if a == b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+    if len(a) < len(b):
+        a, b = b, a
+    longest, length_b = len(a), len(b)
+    max_distance = int((1 - minimum) * longest + 1e-9)
+    if longest - length_b > max_distance:
+        return 0.0
+    out_of_band = max_distance + 1
+    previous = [j if j <= max_distance else out_of_band for j in range(length_b + 1)]
+    for i in range(1, longest + 1):
+        char_a = a[i - 1]
+        low, high = max(1, i - max_distance), min(length_b, i + max_distance)
+        current = [out_of_band] * (length_b + 1)
+        current[0] = i if i <= max_distance else out_of_band
+        for j in range(low, high + 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != b[j - 1]))
+        if min(current[low - 1:high + 1]) > max_distance:
+            return 0.0
+        previous = current
+    distance = previous[length_b]
+    return 0.0 if distance > max_distance else 1 - distance / longest
+
+
+class MinHasher:
+    """Signatures MinHash sur les n-grammes de caractères, hachages stables (crc32) entre exécutions"""
+
+    def __init__(self, bands: int = MINHASH_BANDS, rows: int = MINHASH_ROWS, seed: int = 42):
+        self.bands = bands
+        self.rows = rows
+        rng = random.Random(seed)
+        self.salts = [rng.getrandbits(32) for _ in range(bands * rows)]
+
+    def band_keys(self, grams: Iterable[str]) -> List[Tuple[int, Tuple[int, ...]]]:
+        hashes = {zlib.crc32(gram.encode()) for gram in grams}
+        signature = [min(map(salt.__xor__, hashes)) for salt in self.salts]
+        return [
+            (band, tuple(signature[band * self.rows:(band + 1) * self.rows]))
+            for band in range(self.bands)
+        ]
+
+
+def load_records(snapshot_dir: str, form_types: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Champs utiles à la détection, normalisés, pour chaque ligne de l'instantané"""
+    records = []
+    for form_type in form_types or list(FestivalFormCreator.FORM_TYPES.keys()):
+        table_name = FestivalFormCreator.FORM_TYPES[form_type]['table_name']
+        titles = {col['column_name']: col['title'] for col in FestivalFormCreator.columns_for(form_type)}
+        for row in iter_snapshot_rows(snapshot_dir, form_type):
+            title = normalize(row_value(row, 'title', titles.get('title')))
+            records.append({
+                'table_name': table_name,
+                'id': row.get('Id'),
+                'title': title,
+                'grams': ngrams(title),
+                'email': normalize(row_value(row, 'email', titles.get('email'))).replace(' ', ''),
+                'lastname': normalize(row_value(row, 'lastname', titles.get('lastname'))),
+            })
+    return records
+
+
+def _window_pairs(members: List[int], key, window: int) -> Set[Tuple[int, int]]:
+    """Paires (i, j) de lignes à moins de `window` rangs l'une de l'autre dans l'ordre de `key`"""
+    ordered = sorted(members, key=key)
+    return {
+        (min(a, b), max(a, b))
+        for position, a in enumerate(ordered)
+        for b in ordered[position + 1:position + window]
+    }
+
+
+def candidate_pairs(
+    records: List[Dict[str, Any]],
+    max_block_size: int = MAX_BLOCK_SIZE,
+    window: int = SORTED_WINDOW
+) -> Tuple[Set[Tuple[int, int]], Dict[str, int]]:
+    """Paires d'indices partageant au moins un bloc, et nombre de blocs trop grands"""
+    blocks: Dict[Any, List[int]] = defaultdict(list)
+    hasher = MinHasher()
+    for index, record in enumerate(records):
+        # Deux titres vides auraient une similarité de 1
+        if not record['title']:
+            continue
+        for key in hasher.band_keys(record['grams']):
+            blocks[('title', key)].append(index)
+        if record['email']:
+            blocks[('email', record['email'])].append(index)
+        if record['lastname']:
+            blocks[('lastname', record['lastname'])].append(index)
+
+    pairs = set()
+    oversized = 0
+    for key, members in blocks.items():
+        if len(members) < 2:
+            continue
+        if len(members) <= max_block_size:
+            pairs.update(combinations(members, 2))
+            continue
+        oversized += 1
+        before = len(pairs)
+        pairs.update(_window_pairs(members, lambda i: (records[i]['title'], i), window))
+        pairs.update(_window_pairs(members, lambda i: (records[i]['title'][::-1], i), window))
+        logger.warning(
+            f"Bloc {key[0]} de {len(members)} lignes (> {max_block_size}) comparé par voisinage trié "
+            f"({window} voisines) : {len(pairs) - before} paire(s)"
+        )
+    return pairs, {'oversized_blocks': oversized}
+
+
+def score_pair(a: Dict[str, Any], b: Dict[str, Any], threshold: float) -> Optional[Dict[str, Any]]:
+    """Score d'une paire candidate, ou None si ce n'est pas un doublon"""
+    if not a['title'] or not b['title']:
+        return None
+    same_email = bool(a['email']) and a['email'] == b['email']
+    required = min(threshold, SAME_EMAIL_THRESHOLD) if same_email else threshold
+    if not passes_ngram_filter(a['title'], b['title'], a['grams'], b['grams'], required):
+        return None
+    score = similarity(a['title'], b['title'], required)
+    if score < required:
+        return None
+    return {'score': round(score, 3), 'same_email': same_email, 'same_lastname': a['lastname'] == b['lastname']}
+
+
+def find_clusters(
+    records: List[Dict[str, Any]],
+    pairs: Iterable[Tuple[int, int]],
+    threshold: float = DEFAULT_THRESHOLD
+) -> List[Dict[str, Any]]:
+    """Regroupe les paires confirmées en clusters (union-find)"""
+    parent = list(range(len(records)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    matches = []
+    for i, j in pairs:
+        match = score_pair(records[i], records[j], threshold)
+        if match:
+            matches.append((i, j, match))
+            parent[find(i)] = find(j)
+
+    matched = {index for i, j, _ in matches for index in (i, j)}
+    groups: Dict[int, List[int]] = defaultdict(list)
+    for index in sorted(matched):
+        groups[find(index)].append(index)
+
+    group_matches: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+    for i, j, match in matches:
+        group_matches[find(i)].append(dict(match, pair=[_ref(records[i]), _ref(records[j])]))
+
+    clusters = []
+    for root, members in groups.items():
+        tables = sorted({records[i]['table_name'] for i in members})
+        clusters.append({
+            'tables': tables,
+            'cross_table': len(tables) > 1,
+            'rows': [_ref(records[i]) for i in members],
+            'matches': group_matches[root],
+        })
+    clusters.sort(key=lambda c: (-len(c['rows']), c['rows'][0]['table_name'], c['rows'][0]['id'] or 0))
+    return clusters
+
+
+def _ref(record: Dict[str, Any]) -> Dict[str, Any]:
+    return {'table_name': record['table_name'], 'id': record['id'], 'title': record['title']}
+
+
+def detect_duplicates(
+    snapshot_dir: str = DEFAULT_OUTPUT_DIR,
+    form_types: Optional[List[str]] = None,
+    threshold: float = DEFAULT_THRESHOLD
+) -> Dict[str, Any]:
+    """Clusters de doublons, par table et entre tables"""
+    start = time.perf_counter()
+    records = load_records(snapshot_dir, form_types)
+    pairs, block_stats = candidate_pairs(records)
+    clusters = find_clusters(records, pairs, threshold)
+
+    by_table: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for cluster in clusters:
+        if not cluster['cross_table']:
+            by_table[cluster['tables'][0]].append(cluster)
+
+    report = {
+        'records': len(records),
+        'candidate_pairs': len(pairs),
+        **block_stats,
+        'threshold': threshold,
+        'elapsed_s': round(time.perf_counter() - start, 3),
+        'by_table': dict(by_table),
+        'cross_table': [cluster for cluster in clusters if cluster['cross_table']],
+    }
+    logger.info(
+        f"{len(records)} lignes, {len(pairs)} paires candidates, {len(clusters)} cluster(s) "
+        f"en {report['elapsed_s']}s"
+    )
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Détection des inscriptions en double")
+    parser.add_argument('--snapshot', default=DEFAULT_OUTPUT_DIR, help="Dossier produit par festival_export.py")
+    parser.add_argument('--only', type=parse_form_types, help="Types de formulaire, séparés par des virgules")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument('--output', help="Fichier JSON de sortie (stdout par défaut)")
+    args = parser.parse_args()
+    setup_logging()
+
+    form_types = args.only
+    report = detect_duplicates(args.snapshot, form_types, args.threshold)
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""
+Export en flux des inscriptions festival vers un instantané local.
+
+Pour chaque table (`Stands_Festival`, `Ateliers_Festival`, `Conferences_Festival`) :
+- `<table>.ndjson` : un enregistrement JSON par ligne, écrit au fil de l'eau
+- `<table>.columns.json.gz` : format colonnaire compact {"columns": [...], "rows": n, "data": {colonne: [valeurs]}}
+- `manifest.json` : nombre de lignes et date d'export par table
+
+Les pages (tranches de 1000 Id consécutifs, donc 1000 lignes au plus) sont récupérées en
+parallèle avec une fenêtre bornée : seules `concurrency` pages sont en mémoire à la fois, quel
+que soit le volume de la table. Découpées par Id et non par offset, elles ne se décalent pas si
+des lignes sont ajoutées ou supprimées pendant l'export.
+
+    python festival_export.py --output-dir festival_snapshot --concurrency 4
+"""
+
+import argparse
+import gzip
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional
+
+from festival_form_creator import FestivalFormCreator, parse_form_types, setup_logging
+from nocodb_metadata import BaseMetadataSnapshot
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = 1000
+DEFAULT_CONCURRENCY = 4
+DEFAULT_OUTPUT_DIR = 'festival_snapshot'
+
+
+def iter_table_rows(
+    creator: FestivalFormCreator,
+    table_id: str,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    params: Optional[Dict[str, Any]] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Parcourt toutes les lignes d'une table, triées par Id (`params` accepte aussi `where` et `fields`).
+    Chaque page est une tranche de page_size Id consécutifs plutôt qu'un offset : elle contient au
+    plus page_size lignes, et une ligne insérée ou supprimée pendant la lecture ne décale pas les
+    autres pages. Le plus grand Id est lu d'abord ; les tranches jusqu'à lui sont demandées en
+    parallèle et restituées dans l'ordre (les lignes créées ensuite ne sont pas exportées).
+    """
+    params = dict(params or {})
+    where = params.pop('where', None)
+    base_params = dict(params, sort='Id', limit=page_size)
+    endpoint = f'/tables/{table_id}/records'
+
+    last = creator._make_request(
+        'GET', endpoint, params=dict({'sort': '-Id', 'limit': 1, 'fields': 'Id'}, **({'where': where} if where else {}))
+    ).get('list', [])
+    if not last:
+        return
+    max_id = last[0]['Id']
+
+    def fetch(start: int) -> Dict[str, Any]:
+        clause = f"(Id,gt,{start})~and(Id,lte,{start + page_size})"
+        if where:
+            clause = f"({where})~and{clause}"
+        return creator._make_request('GET', endpoint, params=dict(base_params, where=clause))
+
+    starts = iter(range(0, max_id, page_size))
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        window = deque(executor.submit(fetch, start) for start in islice(starts, concurrency))
+        while window:
+            page = window.popleft().result().get('list', [])
+            next_start = next(starts, None)
+            if next_start is not None:
+                window.append(executor.submit(fetch, next_start))
+            yield from page
+
+
+def iter_snapshot_rows(snapshot_dir: str, form_type: str) -> Iterator[Dict[str, Any]]:
+    """Relit les lignes NDJSON exportées pour un type de formulaire"""
+    table_name = FestivalFormCreator.FORM_TYPES[form_type]['table_name']
+    path = os.path.join(snapshot_dir, f"{table_name}.ndjson")
+    if not os.path.exists(path):
+        logger.warning(f"{path} introuvable, lancez d'abord festival_export.py")
+        return
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def load_columnar(snapshot_dir: str, form_type: str) -> Optional[Dict[str, Any]]:
+    """Relit le fichier colonnaire exporté : {"columns": [...], "rows": n, "data": {colonne: [valeurs]}}"""
+    table_name = FestivalFormCreator.FORM_TYPES[form_type]['table_name']
+    path = os.path.join(snapshot_dir, f"{table_name}.columns.json.gz")
+    if not os.path.exists(path):
+        logger.warning(f"{path} introuvable, lancez d'abord festival_export.py")
+        return None
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def row_value(row: Dict[str, Any], column_name: str, title: Optional[str] = None) -> Any:
+    """L'API de données indexe les lignes par titre de colonne ; accepte aussi column_name"""
+    if title is not None and title in row:
+        return row[title]
+    return row.get(column_name)
+
+
+class ColumnarWriter:
+    """
+    Écrit un fichier colonnaire sans garder les lignes en mémoire : chaque colonne est d'abord
+    déversée dans un fichier temporaire (une valeur JSON par ligne), puis les colonnes sont
+    concaténées dans le fichier final.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.rows = 0
+        self._spool_dir = tempfile.mkdtemp(prefix='festival_export_')
+        self._spools: Dict[str, Any] = {}
+        self._counts: Dict[str, int] = {}
+
+    def _spool(self, column: str):
+        spool = self._spools.get(column)
+        if spool is None:
+            spool = open(os.path.join(self._spool_dir, f"{len(self._spools)}.jsonl"), 'w+', encoding='utf-8')
+            self._spools[column] = spool
+            self._counts[column] = 0
+        return spool
+
+    def _pad(self, column: str, rows: int):
+        """Complète avec null une colonne apparue tardivement ou absente de certaines lignes"""
+        spool = self._spool(column)
+        missing = rows - self._counts[column]
+        if missing > 0:
+            spool.write('null\n' * missing)
+            self._counts[column] = rows
+
+    def write(self, row: Dict[str, Any]):
+        for column, value in row.items():
+            self._pad(column, self.rows)
+            self._spools[column].write(json.dumps(value, ensure_ascii=False) + '\n')
+            self._counts[column] += 1
+        self.rows += 1
+
+    def close(self):
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with gzip.open(tmp_path, 'wt', encoding='utf-8') as out:
+                out.write('{"columns": ' + json.dumps(list(self._spools), ensure_ascii=False))
+                out.write(f', "rows": {self.rows}, "data": {{')
+                for index, column in enumerate(self._spools):
+                    self._pad(column, self.rows)
+                    spool = self._spools[column]
+                    spool.seek(0)
+                    out.write((', ' if index else '') + json.dumps(column, ensure_ascii=False) + ': [')
+                    for line_index, line in enumerate(spool):
+                        out.write((',' if line_index else '') + line.rstrip('\n'))
+                    out.write(']')
+                out.write('}}\n')
+            os.replace(tmp_path, self.path)
+        finally:
+            self._cleanup()
+
+    def discard(self):
+        """Abandonne l'écriture : fichiers temporaires supprimés, fichier final inchangé"""
+        self._cleanup()
+        if os.path.exists(f"{self.path}.tmp"):
+            os.remove(f"{self.path}.tmp")
+
+    def _cleanup(self):
+        for spool in self._spools.values():
+            spool.close()
+        shutil.rmtree(self._spool_dir, ignore_errors=True)
+
+
+def export_table(
+    creator: FestivalFormCreator,
+    output_dir: str,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    concurrency: int = DEFAULT_CONCURRENCY
+) -> Optional[Dict[str, Any]]:
+    """Exporte une table en NDJSON et en colonnaire ; renvoie son entrée de manifeste"""
+    table_name = creator.form_config['table_name']
+    table = creator.metadata.get_table(table_name)
+    if not table:
+        logger.warning(f"La table {table_name} n'existe pas, export ignoré")
+        return None
+
+    logger.info(f"Export de la table {table_name}...")
+    start = time.perf_counter()
+    ndjson_path = os.path.join(output_dir, f"{table_name}.ndjson")
+    columnar = ColumnarWriter(os.path.join(output_dir, f"{table_name}.columns.json.gz"))
+    rows = 0
+    try:
+        with open(f"{ndjson_path}.tmp", 'w', encoding='utf-8') as ndjson:
+            for row in iter_table_rows(creator, table['id'], page_size, concurrency):
+                ndjson.write(json.dumps(row, ensure_ascii=False) + '\n')
+                columnar.write(row)
+                rows += 1
+        columnar.close()
+        os.replace(f"{ndjson_path}.tmp", ndjson_path)
+    except BaseException:
+        # Export interrompu : ni fichier partiel ni répertoire temporaire laissés derrière
+        columnar.discard()
+        if os.path.exists(f"{ndjson_path}.tmp"):
+            os.remove(f"{ndjson_path}.tmp")
+        raise
+
+    logger.info(f"{table_name}: {rows} lignes exportées en {time.perf_counter() - start:.2f}s")
+    return {
+        'form_type': creator.form_type,
+        'table_id': table['id'],
+        'rows': rows,
+        'ndjson': os.path.basename(ndjson_path),
+        'columnar': os.path.basename(columnar.path),
+    }
+
+
+def export_all(
+    output_dir: str = DEFAULT_OUTPUT_DIR,
+    form_types: Optional[List[str]] = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    concurrency: int = DEFAULT_CONCURRENCY
+) -> Dict[str, Any]:
+    """Exporte toutes les tables festival et écrit le manifeste"""
+    os.makedirs(output_dir, exist_ok=True)
+    form_types = form_types or list(FestivalFormCreator.FORM_TYPES.keys())
+    first = FestivalFormCreator(form_types[0])
+    metadata = BaseMetadataSnapshot(first.base_id, first._make_request)
+
+    tables = {}
+    for form_type in form_types:
+        creator = FestivalFormCreator(form_type, metadata=metadata)
+        entry = export_table(creator, output_dir, page_size, concurrency)
+        if entry:
+            tables[creator.form_config['table_name']] = entry
+
+    manifest = {
+        'exported_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'base_id': first.base_id,
+        'tables': tables,
+    }
+    with open(os.path.join(output_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export des inscriptions festival vers un instantané local")
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR)
+    parser.add_argument('--only', type=parse_form_types, help="Types de formulaire à exporter, séparés par des virgules (ex: stands,ateliers)")
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE)
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help="Pages récupérées en parallèle")
+    args = parser.parse_args()
+    setup_logging()
+
+    form_types = args.only
+    export_all(args.output_dir, form_types, args.page_size, args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Index de facettes précalculé sur les trois questions standardisées (public, niveau, type d'enseignement).
+
+Pour chaque type de formulaire et chaque combinaison de `audience_type` × `teaching_level` ×
+`teaching_type`, le fichier donne le nombre de lignes et la liste triée de leurs Id. Chaque
+dimension accepte aussi le joker `*` : tout filtre partiel du programme correspond donc à une
+seule clé, sans parcourir les inscriptions.
+
+Format (JSON compact) :
+
+    {
+      "version": 1,
+      "hash": "<sha256 du reste de l'index>",
+      "dimensions": {"audience_type": [...], "teaching_level": [...], "teaching_type": [...]},
+      "rows": {"stands": 42, ...},
+      "facets": {"stands": {"0.2.*": {"n": 3, "ids": [4, 9, 17]}, ...}, ...},
+      "unclassified": {"stands": [Id des lignes dont une valeur est absente ou hors options]}
+    }
+
+Les clés sont les indices des options dans `dimensions` (ordre de `get_columns()`), séparés par
+des points. Seules les combinaisons non vides sont écrites.
+
+`hash` est une empreinte du contenu : le même instantané donne le même fichier, octet pour
+octet, et le fichier n'est pas réécrit si `hash` n'a pas changé.
+
+    python festival_facets.py --snapshot festival_snapshot --output ../../public/data/festival_facets.json
+"""
+
+import argparse
+import json
+import logging
+import os
+from collections import defaultdict
+from itertools import product
+from typing import Any, Dict, List, Optional
+
+from festival_export import DEFAULT_OUTPUT_DIR, load_columnar
+from festival_form_artifact import content_hash, read_hash
+from festival_form_creator import FestivalFormCreator, parse_form_types, setup_logging
+
+logger = logging.getLogger(__name__)
+
+FACET_DIMENSIONS = ('audience_type', 'teaching_level', 'teaching_type')
+WILDCARD = '*'
+DEFAULT_FACETS_PATH = 'festival_facets.json'
+FORMAT_VERSION = 1
+
+
+def facet_options(form_type: str) -> Dict[str, List[str]]:
+    """Options déclarées de chaque dimension, dans l'ordre de `get_columns()`"""
+    schema = FestivalFormCreator.schema_for(form_type)
+    return {
+        dimension: [option['title'] for option in schema.column(dimension)['colOptions']['options']]
+        for dimension in FACET_DIMENSIONS
+    }
+
+
+def facet_key(indices) -> str:
+    return '.'.join(str(index) for index in indices)
+
+
+def build_facets(
+    ids: List[Any],
+    columns: Dict[str, List[Any]],
+    options: Dict[str, List[str]]
+) -> Dict[str, Any]:
+    """
+    Listes d'Id par clé de facette pour un type de formulaire.
+    `columns` donne, pour chaque dimension, la colonne de valeurs alignée sur `ids`.
+    """
+    positions = {
+        dimension: {title: index for index, title in enumerate(options[dimension])}
+        for dimension in FACET_DIMENSIONS
+    }
+    postings: Dict[str, List[Any]] = defaultdict(list)
+    unclassified = []
+    for row_index, row_id in enumerate(ids):
+        indices = [positions[dimension].get(columns[dimension][row_index]) for dimension in FACET_DIMENSIONS]
+        if None in indices:
+            unclassified.append(row_id)
+            continue
+        # La ligne appartient aux 2^3 clés obtenues en remplaçant chaque dimension par le joker
+        for key in product(*((index, WILDCARD) for index in indices)):
+            postings[facet_key(key)].append(row_id)
+
+    facets = {}
+    for key in sorted(postings):
+        row_ids = sorted(postings[key])
+        facets[key] = {'n': len(row_ids), 'ids': row_ids}
+    return {'facets': facets, 'unclassified': sorted(unclassified)}
+
+
+def build_index(snapshot_dir: str = DEFAULT_OUTPUT_DIR, form_types: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Index complet à partir des fichiers colonnaires de l'instantané"""
+    form_types = form_types or list(FestivalFormCreator.FORM_TYPES.keys())
+    dimensions = facet_options(form_types[0])
+    index = {
+        'dimensions': dimensions,
+        'rows': {},
+        'facets': {},
+        'unclassified': {},
+    }
+    for form_type in form_types:
+        if facet_options(form_type) != dimensions:
+            raise ValueError(f"Les options de {form_type} diffèrent des autres types de formulaire")
+        columnar = load_columnar(snapshot_dir, form_type)
+        if columnar is None:
+            continue
+        data, row_count = columnar['data'], columnar['rows']
+        schema = FestivalFormCreator.schema_for(form_type)
+        columns = {}
+        for dimension in FACET_DIMENSIONS:
+            # L'API de données indexe par titre de colonne ; column_name en secours
+            title = schema.column(dimension)['title']
+            columns[dimension] = data.get(title, data.get(dimension, [None] * row_count))
+        result = build_facets(data.get('Id', list(range(row_count))), columns, dimensions)
+        index['rows'][form_type] = row_count
+        index['facets'][form_type] = result['facets']
+        index['unclassified'][form_type] = result['unclassified']
+        logger.info(
+            f"{form_type}: {row_count} lignes, {len(result['facets'])} combinaison(s), "
+            f"{len(result['unclassified'])} non classée(s)"
+        )
+    return {'version': FORMAT_VERSION, 'hash': content_hash(index), **index}
+
+
+def write_index(index: Dict[str, Any], path: str = DEFAULT_FACETS_PATH):
+    """Écriture atomique en JSON compact, seulement si le contenu a changé"""
+    if read_hash(path) == index['hash']:
+        logger.info(f"{path} à jour (hash {index['hash'][:16]})")
+        return
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, path)
+    logger.info(f"Index de facettes écrit dans {path} ({os.path.getsize(path)} octets)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index de facettes public / niveau / type d'enseignement")
+    parser.add_argument('--snapshot', default=DEFAULT_OUTPUT_DIR, help="Dossier produit par festival_export.py")
+    parser.add_argument('--only', type=parse_form_types, help="Types de formulaire, séparés par des virgules")
+    parser.add_argument('--output', default=DEFAULT_FACETS_PATH)
+    args = parser.parse_args()
+    setup_logging()
+
+    form_types = args.only
+    write_index(build_index(args.snapshot, form_types), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Artefact JSON des schémas de formulaire pour le build Astro.
+
+Les libellés, options, aides et sections des formulaires sont définis par `get_columns()` et
+`build_form_data()`. Ce script les écrit dans un fichier JSON local, lu par les composants du
+site (`src/components/forms/`, vues du programme) à la place de l'API meta de NocoDB.
+
+Format :
+
+    {
+      "version": 1,
+      "hash": "<sha256 du contenu de 'forms'>",
+      "forms": {
+        "stands": {
+          "hash": "<empreinte du schéma>",
+          "table_name": ..., "title": ..., "form_title": ..., "description": ..., "help_text": ...,
+          "success_msg": ..., "banner_image": {...},
+          "fields": [{"name", "label", "type", "required", "help", "options"}, ...],
+          "sections": [{"title", "fields": [column_name, ...]}, ...]
+        }, ...
+      }
+    }
+
+`hash` global et `hash` par formulaire sont des empreintes de contenu : le fichier n'est réécrit
+que si `hash` change (mtime inchangé sinon), et un build incrémental peut comparer le `hash` d'un
+formulaire pour ne régénérer que les pages concernées. `--check` vérifie seulement que le
+fichier est à jour (code de sortie 1 sinon), par exemple en CI.
+
+    python festival_form_artifact.py --output ../../src/data/festival/form_schemas.json
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+from typing import Any, Dict, List, Optional
+
+from festival_form_creator import FestivalFormCreator, parse_form_types, setup_logging
+from festival_form_schema import canonical_json
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ARTIFACT_PATH = 'festival_form_schemas.json'
+FORMAT_VERSION = 1
+
+
+def form_artifact(form_type: str) -> Dict[str, Any]:
+    """Description d'un formulaire, dans l'ordre des colonnes déclarées"""
+    schema = FestivalFormCreator.schema_for(form_type)
+    form = schema.form_payload()
+    fields = []
+    for col in schema.columns_payload():
+        options = (col.get('colOptions') or {}).get('options')
+        fields.append({
+            'name': col['column_name'],
+            'label': col['title'],
+            'type': col['uidt'],
+            'required': bool(col.get('rqd')),
+            'help': (col.get('meta') or {}).get('help'),
+            'options': [option['title'] for option in options] if options else None,
+        })
+    return {
+        'hash': schema.fingerprint,
+        'table_name': schema.table_name,
+        'title': schema.title,
+        'form_title': form.get('heading'),
+        'description': form.get('subheading'),
+        'help_text': form.get('helpText'),
+        'success_msg': form.get('success_msg'),
+        'banner_image': form.get('banner_image_url'),
+        'fields': fields,
+        'sections': (form.get('meta') or {}).get('sections', []),
+    }
+
+
+def content_hash(forms: Dict[str, Any]) -> str:
+    return hashlib.sha256(canonical_json(forms).encode('utf-8')).hexdigest()
+
+
+def build_artifact(form_types: Optional[List[str]] = None) -> Dict[str, Any]:
+    forms = {
+        form_type: form_artifact(form_type)
+        for form_type in form_types or list(FestivalFormCreator.FORM_TYPES.keys())
+    }
+    return {'version': FORMAT_VERSION, 'hash': content_hash(forms), 'forms': forms}
+
+
+def read_hash(path: str) -> Optional[str]:
+    """hash de l'artefact existant, None s'il est absent ou illisible"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f).get('hash')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def write_artifact(artifact: Dict[str, Any], path: str = DEFAULT_ARTIFACT_PATH) -> bool:
+    """Écriture atomique, seulement si le contenu a changé ; renvoie True si le fichier a été écrit"""
+    if read_hash(path) == artifact['hash']:
+        logger.info(f"{path} à jour (hash {artifact['hash'][:16]})")
+        return False
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(artifact, f, indent=2, ensure_ascii=False)
+        f.write('\n')
+    os.replace(tmp_path, path)
+    logger.info(f"Schémas écrits dans {path} (hash {artifact['hash'][:16]})")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Artefact JSON des schémas de formulaire pour le site")
+    parser.add_argument('--output', default=DEFAULT_ARTIFACT_PATH)
+    parser.add_argument('--only', type=parse_form_types, help="Types de formulaire, séparés par des virgules")
+    parser.add_argument('--check', action='store_true', help="Vérifie seulement que l'artefact est à jour")
+    args = parser.parse_args()
+    setup_logging()
+
+    form_types = args.only
+    artifact = build_artifact(form_types)
+    if args.check:
+        up_to_date = read_hash(args.output) == artifact['hash']
+        if not up_to_date:
+            logger.error(f"{args.output} n'est pas à jour : relancez festival_form_artifact.py")
+        return 0 if up_to_date else 1
+    write_artifact(artifact, args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -31,37 +31,81 @@ Avantages de cette standardisation :
 - Possibilité de proposer des parcours personnalisés aux visiteurs
 """
 
-import requests
+import argparse
 import os
-from dotenv import load_dotenv
-from typing import Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import TYPE_CHECKING, Dict, Any, FrozenSet, List, Optional
 import logging
-import coloredlogs
-
-# Configuration du logging avec couleurs
-coloredlogs.install(
-    level=logging.INFO,
-    fmt='%(asctime)s - %(levelname)s - %(message)s',
-    level_styles={
-        'debug': {'color': 'green'},
-        'info': {'color': 'blue'},
-        'warning': {'color': 'yellow', 'bold': True},
-        'error': {'color': 'red', 'bold': True},
-        'critical': {'color': 'red', 'bold': True, 'background': 'white'}
-    },
-    field_styles={
-        'asctime': {'color': 'green'},
-        'levelname': {'color': 'white', 'bold': True},
-        'message': {'color': 'white'}
-    }
+from festival_form_schema import (
+    FINGERPRINT_META_KEY, FORM_ID_META_KEY, WEBHOOK_META_KEY, FormSchema, get_schema, table_meta
 )
+from nocodb_journal import ProvisioningJournal
+from nocodb_metadata import BaseMetadataSnapshot
+from nocodb_schema_migration import apply_migration, format_plan, plan_migration
+from nocodb_tracing import NULL_TRACER, Tracer, traced_phase
+
+if TYPE_CHECKING:
+    # requests n'est importé qu'à la première requête (via nocodb_transport)
+    from nocodb_transport import NocoDBTransport
 
 logger = logging.getLogger(__name__)
 
+# Nombre de types de formulaire provisionnés en parallèle par create_all_forms()
+DEFAULT_MAX_WORKERS = 3
+
+# Webhooks NocoDB (v2) enregistrés par table quand NOCODB_WEBHOOK_URL est défini
+WEBHOOK_OPERATIONS = ('insert', 'update', 'delete', 'bulkInsert', 'bulkUpdate', 'bulkDelete')
+WEBHOOK_TITLE_PREFIX = 'ootb-sync'
+WEBHOOK_SECRET_HEADER = 'x-ootb-webhook-secret'
+# Champs de la section « À propos de vous » ; les autres colonnes vont dans la seconde section
+CONTACT_FIELDS = ('firstname', 'lastname', 'email', 'phone', 'website')
+
+def setup_logging(level: int = logging.INFO):
+    """Configuration du logging avec couleurs, appelée par les points d'entrée CLI (pas à l'import)"""
+    import coloredlogs
+
+    coloredlogs.install(
+        level=level,
+        fmt='%(asctime)s - %(levelname)s - %(message)s',
+        level_styles={
+            'debug': {'color': 'green'},
+            'info': {'color': 'blue'},
+            'warning': {'color': 'yellow', 'bold': True},
+            'error': {'color': 'red', 'bold': True},
+            'critical': {'color': 'red', 'bold': True, 'background': 'white'}
+        },
+        field_styles={
+            'asctime': {'color': 'green'},
+            'levelname': {'color': 'white', 'bold': True},
+            'message': {'color': 'white'}
+        }
+    )
+
+def parse_form_types(value: str) -> List[str]:
+    """Valeur d'une option --only : types séparés par des virgules, vérifiés contre FORM_TYPES"""
+    known = list(FestivalFormCreator.FORM_TYPES)
+    form_types = [form_type.strip() for form_type in value.split(',') if form_type.strip()]
+    unknown = [form_type for form_type in form_types if form_type not in known]
+    if unknown or not form_types:
+        raise argparse.ArgumentTypeError(
+            f"type(s) inconnu(s): {', '.join(unknown) or repr(value)} (attendu: {', '.join(known)})"
+        )
+    return form_types
+
 class NocoDBError(Exception):
     """Classe personnalisée pour les erreurs NocoDB"""
     pass
 
+def _deep_merge(base: Dict[str, Any], overrides: Dict[str, Any]) -> Dict[str, Any]:
+    """Copie de base où les dictionnaires imbriqués de overrides sont fusionnés récursivement"""
+    merged = dict(base)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _deep_merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
 class FestivalFormCreator:
     FORM_TYPES = {
         'stands': {
@@ -122,23 +166,49 @@ class FestivalFormCreator:
         }
     }
 
-    def __init__(self, form_type='stands'):
+    def __init__(
+        self,
+        form_type='stands',
+        transport: Optional['NocoDBTransport'] = None,
+        metadata: Optional[BaseMetadataSnapshot] = None,
+        base_url: Optional[str] = None,
+        base_id: Optional[str] = None,
+        api_token: Optional[str] = None,
+        form_overrides: Optional[Dict[str, Any]] = None,
+        tracer: Optional[Tracer] = None,
+        webhook_url: Optional[str] = None,
+        webhook_secret: Optional[str] = None
+    ):
         # Charger les variables d'environnement
+        from dotenv import load_dotenv
         load_dotenv()
         
-        # Vérifier les variables d'environnement requises
-        self.base_url = self._get_required_env('NOCODB_BASE_URL').rstrip('/')
-        self.base_id = self._get_required_env('NOCODB_BASE_ID')
-        self.api_token = self._get_required_env('NOCODB_API_TOKEN')
+        # Paramètres explicites (mode batch), sinon variables d'environnement requises
+        self.base_url = (base_url or self._get_required_env('NOCODB_BASE_URL')).rstrip('/')
+        self.base_id = base_id or self._get_required_env('NOCODB_BASE_ID')
+        self.api_token = api_token or self._get_required_env('NOCODB_API_TOKEN')
         
+        # Récepteur de webhooks (festival_webhooks.py), optionnel
+        self.webhook_url = webhook_url or os.getenv('NOCODB_WEBHOOK_URL')
+        self.webhook_secret = webhook_secret or os.getenv('NOCODB_WEBHOOK_SECRET')
+
         # Configuration des headers
         self.headers = {
             'xc-token': self.api_token,
             'Content-Type': 'application/json'
         }
 
+        # Transport HTTP partagé (pool de connexions, timeouts, backoff), créé à la première requête
+        self._transport = transport
+        # Spans des requêtes et des phases (inactif par défaut)
+        self.tracer = tracer or NULL_TRACER
+
+        # Instantané des métadonnées de la base, partagé entre créateurs par create_all_forms()
+        self.metadata = metadata or BaseMetadataSnapshot(self.base_id, self._make_request)
+
         self.form_type = form_type
-        self.form_config = self.FORM_TYPES[form_type]
+        # Textes et noms de table propres à une édition : surcharge de FORM_TYPES
+        self.form_config = _deep_merge(self.FORM_TYPES[form_type], form_overrides or {})
 
     @staticmethod
     def _get_required_env(var_name: str) -> str:
@@ -150,26 +220,64 @@ class FestivalFormCreator:
             raise NocoDBError(f"Variable d'environnement {var_name} manquante")
         return value
 
-    def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None) -> Dict[str, Any]:
+    @property
+    def transport(self) -> 'NocoDBTransport':
+        if self._transport is None:
+            from nocodb_transport import get_shared_transport
+            self._transport = get_shared_transport()
+        return self._transport
+
+    def _make_request(
+        self,
+        method: str,
+        endpoint: str,
+        data: Optional[Any] = None,
+        params: Optional[Dict[str, Any]] = None,
+        retry_statuses: Optional[FrozenSet[int]] = None
+    ) -> Dict[str, Any]:
         """
         Effectue une requête HTTP vers l'API NocoDB
+        (retry_statuses : statuts rejoués par le transport, cf. NocoDBTransport.request)
         """
+        import requests
+
         url = f"{self.base_url}/api/v2{endpoint}"
         try:
-            response = requests.request(
+            response = self.transport.request(
                 method=method,
                 url=url,
                 headers=self.headers,
-                json=data if data else None
+                json=data if data else None,
+                params=params,
+                tracer=self.tracer,
+                retry_statuses=retry_statuses
             )
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
             logger.error(f"Erreur lors de la requête {method} vers {endpoint}: {str(e)}")
-            if response := getattr(e, 'response', None):
+            if (response := getattr(e, 'response', None)) is not None:
                 logger.error(f"Réponse de l'API: {response.text}")
             raise NocoDBError(f"Erreur API NocoDB: {str(e)}")
 
+    @property
+    def schema(self) -> FormSchema:
+        """Schéma compilé une fois par processus (colonnes, formulaire, empreinte)"""
+        return get_schema(self)
+
+    @classmethod
+    def schema_for(cls, form_type: str) -> FormSchema:
+        """Schéma d'un type de formulaire, sans configuration NocoDB"""
+        creator = cls.__new__(cls)
+        creator.form_type = form_type
+        creator.form_config = cls.FORM_TYPES[form_type]
+        return get_schema(creator)
+
+    @classmethod
+    def columns_for(cls, form_type: str):
+        """Colonnes déclarées pour un type de formulaire, sans configuration NocoDB"""
+        return cls.schema_for(form_type).columns_payload()
+
     def get_columns(self):
         """Retourne les colonnes selon le type de formulaire"""
         # Champs communs à tous les formulaires
@@ -422,73 +530,136 @@ class FestivalFormCreator:
 
         return common_fields + specific_fields
 
+    @traced_phase('create_table')
     def create_table(self):
         """Crée la table selon le type de formulaire"""
         logger.info(f"Création de la table {self.form_config['table_name']}...")
         
         # Vérifier si la table existe déjà
         try:
-            response = self._make_request('GET', f'/meta/bases/{self.base_id}/tables')
-            # La réponse peut être soit une liste directement, soit dans une clé 'list'
-            existing_tables = response.get('list', response) if isinstance(response, dict) else response
-            
-            if isinstance(existing_tables, list):
-                for table in existing_tables:
-                    if isinstance(table, dict) and table.get('table_name') == self.form_config['table_name']:
-                        logger.info(f"La table {self.form_config['table_name']} existe déjà (ID: {table['id']})")
-                        return table
+            table = self.metadata.get_table(self.form_config['table_name'])
+            if table:
+                logger.info(f"La table {self.form_config['table_name']} existe déjà (ID: {table['id']})")
+                return table
         except Exception as e:
             logger.warning(f"Impossible de vérifier l'existence de la table: {str(e)}")
         
         # Si la table n'existe pas, la créer
-        table_data = {
-            "table_name": self.form_config['table_name'],
-            "title": self.form_config['title'],
-            "columns": self.get_columns()
-        }
+        table_data = self.schema.table_payload()
 
         try:
             response = self._make_request('POST', f'/meta/bases/{self.base_id}/tables', table_data)
             if isinstance(response, dict):
+                self.metadata.add_table(response)
                 return response
             logger.warning(f"Réponse inattendue lors de la création de la table: {response}")
             return {"id": response} if isinstance(response, str) else {"id": "unknown"}
         except NocoDBError as e:
             if "Table already exists" in str(e):
                 logger.info(f"La table {self.form_config['table_name']} existe déjà")
-                # Récupérer l'ID de la table existante
+                # L'instantané était périmé (table créée entre-temps) : le recharger une fois
                 try:
-                    response = self._make_request('GET', f'/meta/bases/{self.base_id}/tables')
-                    existing_tables = response.get('list', response) if isinstance(response, dict) else response
-                    if isinstance(existing_tables, list):
-                        for table in existing_tables:
-                            if isinstance(table, dict) and table.get('table_name') == self.form_config['table_name']:
-                                return table
+                    self.metadata.refresh()
+                    table = self.metadata.get_table(self.form_config['table_name'])
+                    if table:
+                        return table
                 except Exception as inner_e:
                     logger.error(f"Erreur lors de la récupération de la table existante: {str(inner_e)}")
             raise e
 
-    def create_form_view(self, table_id):
-        """Crée la vue formulaire personnalisée"""
-        logger.info(f"Vérification/Création du formulaire {self.form_config['form_title']}...")
-        
-        # Vérifier si une vue formulaire existe déjà
-        try:
-            existing_forms = self._make_request('GET', f'/meta/tables/{table_id}/views')
-            forms_list = existing_forms.get('list', [])
-            
-            if isinstance(forms_list, list):
-                for form in forms_list:
-                    if isinstance(form, dict) and form.get('title') == self.form_config['form_title'] and form.get('type') == 1:
-                        logger.info(f"Le formulaire existe déjà (ID: {form['id']})")
-                        return form
-        except Exception as e:
-            logger.warning(f"Impossible de vérifier l'existence du formulaire: {str(e)}")
+    def migrate_table(self, apply: bool = False):
+        """
+        Compare les colonnes déclarées à la table existante (mode plan).
+        Avec apply=True, envoie uniquement les créations/mises à jour de colonnes nécessaires.
+        Renvoie le plan, ou None si la table n'existe pas encore.
+        """
+        table_name = self.form_config['table_name']
+        table = self.metadata.get_table(table_name)
+        if not table:
+            logger.warning(f"La table {table_name} n'existe pas encore, utilisez create_table()")
+            return None
+
+        plan = plan_migration(self.schema.columns_payload(), self.metadata.get_columns(table['id']))
+        logger.info(format_plan(table_name, plan))
+
+        if apply:
+            if plan:
+                apply_migration(self._make_request, table['id'], plan)
+                self.metadata.invalidate_columns(table['id'])
+                logger.info(f"Migration de {table_name} appliquée")
+            # Colonnes à jour : l'empreinte peut être enregistrée si le formulaire existe
+            form = self.metadata.get_view(table['id'], self.form_config['form_title'], view_type=1)
+            if form:
+                self.record_fingerprint(table, form['id'])
+        return plan
+
+    def is_up_to_date(self, table: Optional[Dict[str, Any]]) -> bool:
+        """La table porte l'empreinte du schéma courant et l'identifiant de son formulaire"""
+        meta = table_meta(table)
+        return meta.get(FINGERPRINT_META_KEY) == self.schema.fingerprint and bool(meta.get(FORM_ID_META_KEY))
+
+    def record_fingerprint(self, table: Dict[str, Any], form_id: str):
+        """Enregistre l'empreinte du schéma et l'ID du formulaire dans la meta de la table"""
+        if self.is_up_to_date(table) and table_meta(table).get(FORM_ID_META_KEY) == form_id:
+            return
+        self._update_meta(table, {FINGERPRINT_META_KEY: self.schema.fingerprint, FORM_ID_META_KEY: form_id})
+        logger.info(f"Empreinte {self.schema.fingerprint} enregistrée sur {table.get('table_name')}")
+
+    def _update_meta(self, table: Dict[str, Any], values: Dict[str, Any]) -> Dict[str, Any]:
+        """Fusionne values dans la meta de la table (API puis instantané) ; renvoie la table à jour"""
+        meta = dict(table_meta(table), **values)
+        self._make_request('PATCH', f"/meta/tables/{table['id']}", {'meta': meta})
+        table = dict(table, meta=meta)
+        self.metadata.add_table(table)
+        return table
+
+    def webhooks_up_to_date(self, table: Optional[Dict[str, Any]]) -> bool:
+        """Aucun webhook demandé, ou webhooks déjà enregistrés vers la même URL"""
+        return not self.webhook_url or table_meta(table).get(WEBHOOK_META_KEY) == self.webhook_url
+
+    def webhook_payload(self, operation: str) -> Dict[str, Any]:
+        """Webhook NocoDB « after <operation> » qui POSTe l'événement v2 vers webhook_url"""
+        headers = []
+        if self.webhook_secret:
+            headers.append({'enabled': True, 'name': WEBHOOK_SECRET_HEADER, 'value': self.webhook_secret})
+        return {
+            'title': f"{WEBHOOK_TITLE_PREFIX} {operation}",
+            'event': 'after',
+            'operation': operation,
+            'active': True,
+            'version': 'v2',
+            'notification': {
+                'type': 'URL',
+                'payload': {'method': 'POST', 'path': self.webhook_url, 'headers': headers, 'body': '{{ json data }}'},
+            },
+        }
 
-        # Si aucun formulaire n'existe, en créer un nouveau
-        logger.info("Création d'une nouvelle vue formulaire...")
-        
-        # Configuration complète du formulaire
+    def create_webhooks(self, table: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Enregistre (ou redirige) les webhooks insert/update/delete de la table vers webhook_url,
+        puis note l'URL dans la meta de la table pour que les exécutions suivantes s'arrêtent tôt.
+        """
+        table = self.metadata.get_table(table.get('table_name')) or table
+        if self.webhooks_up_to_date(table):
+            return table
+        logger.info(f"Enregistrement des webhooks de {table.get('table_name')} vers {self.webhook_url}...")
+        response = self._make_request('GET', f"/meta/tables/{table['id']}/hooks")
+        existing = {
+            hook.get('title'): hook
+            for hook in (response.get('list', []) if isinstance(response, dict) else response or [])
+        }
+        for operation in WEBHOOK_OPERATIONS:
+            payload = self.webhook_payload(operation)
+            hook = existing.get(payload['title'])
+            if hook is None:
+                self._make_request('POST', f"/meta/tables/{table['id']}/hooks", payload)
+            else:
+                self._make_request('PATCH', f"/meta/hooks/{hook['id']}", payload)
+        return self._update_meta(table, {WEBHOOK_META_KEY: self.webhook_url})
+
+    def build_form_data(self, columns):
+        """Configuration complète de la vue formulaire"""
+        sections = self.form_config['sections']
         form_data = {
             "title": self.form_config['form_title'],
             "type": 1,
@@ -505,7 +676,7 @@ class FestivalFormCreator:
                     "required": 1 if col.get('rqd') else 0,
                     "show": 1
                 }
-                for col in self.get_columns()
+                for col in columns
             ],
             "show_blank_form": True,
             "submit_another_form": False,
@@ -514,21 +685,39 @@ class FestivalFormCreator:
             "subheading": self.form_config['description'],
             "helpText": self.form_config['help_text'],
             "meta": {
+                # Sections construites depuis les colonnes déclarées, dans leur ordre
                 "sections": [
                     {
-                        "title": self.form_config['sections']['about_you'],
-                        "fields": ["firstname", "lastname", "email", "phone", "website"]
+                        "title": sections['about_you'],
+                        "fields": [col['column_name'] for col in columns if col['column_name'] in CONTACT_FIELDS]
                     },
                     {
-                        "title": self.form_config['sections'].get(f'about_{self.form_type[:-1]}'),
-                        "fields": ["title", "target_audience", "teaching_type", "description", "about_you", "logo"]
+                        "title": next(title for key, title in sections.items() if key != 'about_you'),
+                        "fields": [col['column_name'] for col in columns if col['column_name'] not in CONTACT_FIELDS]
                     }
                 ]
             }
         }
+        return form_data
 
-        if self.form_type == 'conferences':
-            form_data['meta']['sections'][1]['fields'].append('photo')
+    @traced_phase('create_form_view')
+    def create_form_view(self, table_id):
+        """Crée la vue formulaire personnalisée"""
+        logger.info(f"Vérification/Création du formulaire {self.form_config['form_title']}...")
+        
+        # Vérifier si une vue formulaire existe déjà
+        try:
+            form = self.metadata.get_view(table_id, self.form_config['form_title'], view_type=1)
+            if form:
+                logger.info(f"Le formulaire existe déjà (ID: {form['id']})")
+                return form
+        except Exception as e:
+            logger.warning(f"Impossible de vérifier l'existence du formulaire: {str(e)}")
+
+        # Si aucun formulaire n'existe, en créer un nouveau
+        logger.info("Création d'une nouvelle vue formulaire...")
+        
+        form_data = self.schema.form_payload()
 
         try:
             # Créer le formulaire
@@ -537,6 +726,8 @@ class FestivalFormCreator:
                 f'/meta/tables/{table_id}/forms',
                 form_data
             )
+            if isinstance(form_view, dict):
+                self.metadata.add_view(table_id, form_view)
 
             return form_view
 
@@ -544,54 +735,237 @@ class FestivalFormCreator:
             logger.error(f"Erreur lors de la création du formulaire: {str(e)}")
             raise
 
-def create_all_forms():
-    """Crée tous les formulaires du festival"""
+def create_all_forms(
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    metadata_cache: Optional[str] = None,
+    metadata_ttl: float = 300.0,
+    transport: Optional['NocoDBTransport'] = None,
+    form_types: Optional[List[str]] = None,
+    overrides: Optional[Dict[str, Dict[str, Any]]] = None,
+    connection: Optional[Dict[str, str]] = None,
+    trace_output: Optional[str] = None,
+    trace_format: str = 'json',
+    journal: Optional[ProvisioningJournal] = None
+):
+    """
+    Crée tous les formulaires du festival (ou seulement form_types).
+    Les types de formulaire sont indépendants : avec max_workers > 1 ils sont provisionnés en parallèle.
+    Les métadonnées de la base sont chargées une seule fois et partagées (optionnellement
+    persistées dans metadata_cache pendant metadata_ttl secondes).
+    Avec transport=DryRunTransport(), les requêtes sont enregistrées sans être envoyées.
+    overrides ({form_type: {...}}) et connection (base_url, base_id, api_token) permettent de
+    provisionner une autre base ou une autre édition sans passer par l'environnement.
+    Avec trace_output, chaque requête et chaque phase est mesurée et les histogrammes de latence
+    sont écrits à la fin dans ce fichier (trace_format='json' ou 'chrome').
+    Avec journal, les étapes terminées sont journalisées : une exécution interrompue reprend
+    à la première étape manquante de chaque table.
+    En cas d'échec, results[form_type] contient {'error': message}.
+    """
+    form_types = form_types or list(FestivalFormCreator.FORM_TYPES.keys())
+    overrides = overrides or {}
+    connection = connection or {}
     results = {}
-    
-    for form_type in FestivalFormCreator.FORM_TYPES.keys():
+    metadata = None
+    tracer = Tracer() if trace_output else None
+
+    try:
+        first = FestivalFormCreator(form_types[0], transport=transport, tracer=tracer, **connection)
+        metadata = BaseMetadataSnapshot(first.base_id, first._make_request, metadata_cache, metadata_ttl)
+    except NocoDBError as e:
+        # Configuration manquante : chaque type remontera l'erreur ci-dessous
+        logger.error(str(e))
+
+    def provision(form_type):
         logger.info(f"\nCréation du formulaire type: {form_type}")
-        try:
-            creator = FestivalFormCreator(form_type)
-            result = create_festival_form(creator)
-            if result:
-                results[form_type] = result
+        creator = FestivalFormCreator(
+            form_type,
+            transport=transport,
+            metadata=metadata,
+            form_overrides=overrides.get(form_type),
+            tracer=tracer,
+            **connection
+        )
+        with creator.tracer.span('provision', 'phase', form_type=form_type):
+            return _create_festival_form(creator, journal)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {executor.submit(provision, form_type): form_type for form_type in form_types}
+        for future in as_completed(futures):
+            form_type = futures[future]
+            try:
+                results[form_type] = future.result()
                 logger.info(f"Formulaire {form_type} créé avec succès!")
-        except Exception as e:
-            logger.error(f"Erreur lors de la création du formulaire {form_type}: {str(e)}")
-    
-    return results
+            except Exception as e:
+                logger.error(f"Erreur lors de la création du formulaire {form_type}: {str(e)}")
+                results[form_type] = {'error': str(e)}
+
+    # Transport passé en paramètre, ou transport partagé si des requêtes ont été envoyées
+    admission = getattr(first._transport, 'admission', None) if metadata is not None else None
+    if admission is not None:
+        admission.log_metrics()
+
+    if tracer is not None:
+        tracer.export(trace_output, trace_format)
+        slowest = sorted(tracer.histograms().items(), key=lambda item: -item[1]['total_ms'])[:5]
+        for key, histogram in slowest:
+            logger.info(f"{key}: {histogram['count']} appel(s), p50 {histogram['p50_ms']:.1f}ms, total {histogram['total_ms']:.1f}ms")
+        logger.info(f"Trace écrite dans {trace_output}")
+
+    # Ordre stable, indépendant de l'ordre de fin des tâches
+    return {form_type: results[form_type] for form_type in form_types}
+
+def migrate_all_forms(
+    apply: bool = False,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    transport: Optional['NocoDBTransport'] = None,
+    form_types: Optional[List[str]] = None
+):
+    """
+    Plan (apply=False) ou application (apply=True) des migrations de schéma pour tous les types
+    (ou seulement form_types).
+    results[form_type] contient le plan, None si la table est absente, ou {'error': message}.
+    """
+    form_types = form_types or list(FestivalFormCreator.FORM_TYPES.keys())
+    first = FestivalFormCreator(form_types[0], transport=transport)
+    metadata = BaseMetadataSnapshot(first.base_id, first._make_request)
+    results = {}
+
+    def migrate(form_type):
+        return FestivalFormCreator(form_type, transport=transport, metadata=metadata).migrate_table(apply=apply)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {executor.submit(migrate, form_type): form_type for form_type in form_types}
+        for future in as_completed(futures):
+            form_type = futures[future]
+            try:
+                results[form_type] = future.result()
+            except Exception as e:
+                logger.error(f"Erreur lors de la migration du formulaire {form_type}: {str(e)}")
+                results[form_type] = {'error': str(e)}
+
+    return {form_type: results[form_type] for form_type in form_types}
 
 def create_festival_form(creator=None):
     """Création d'un formulaire spécifique"""
     try:
         if creator is None:
             creator = FestivalFormCreator()
+        return _create_festival_form(creator)
+    except Exception as e:
+        logger.error(f"Erreur inattendue: {str(e)}")
+        return None
 
+def _create_festival_form(creator, journal: Optional[ProvisioningJournal] = None):
+    """
+    Enchaîne création de la table puis de la vue formulaire ; les erreurs sur la table sont propagées.
+    Avec un journal, chaque étape terminée y est enregistrée et les étapes déjà journalisées
+    (exécution précédente interrompue) ne sont pas refaites.
+    """
+    table_name = creator.form_config['table_name']
+    existing = creator.metadata.get_table(table_name)
+    done = journal.steps(creator.base_id, table_name) if journal else {}
+    if done and done.get('table', {}).get('table_id') != (existing or {}).get('id'):
+        # Table supprimée ou recréée depuis : le journal ne décrit plus la base
+        logger.warning(f"Journal de {table_name} obsolète, reprise depuis l'état de la base")
+        journal.discard([(creator.base_id, table_name)])
+        done = {}
+
+    def completed(step: str, **data):
+        if journal is not None:
+            journal.record(creator.base_id, table_name, step, **data)
+
+    if existing and creator.is_up_to_date(existing) and creator.webhooks_up_to_date(existing):
+        # Même empreinte : rien à créer ni à vérifier
+        logger.info(f"{table_name} à jour (empreinte {creator.schema.fingerprint})")
+        if journal is not None:
+            journal.discard([(creator.base_id, table_name)])
+        table_id = existing['id']
+        form_id = table_meta(existing)[FORM_ID_META_KEY]
+        return {
+            'table_id': table_id,
+            'form_id': form_id,
+            'form_url': f"{creator.base_url}/dashboard/#/nc/form/{form_id}"
+        }
+    if existing and FINGERPRINT_META_KEY in table_meta(existing) and not creator.is_up_to_date(existing):
+        logger.warning(
+            f"Le schéma de {table_name} a changé depuis le dernier provisionnement : "
+            f"lancez migrate_all_forms() pour l'appliquer"
+        )
+
+    if 'table' in done:
+        table = existing
+        table_id = table['id']
+        created = done['table'].get('created', False)
+        logger.info(f"Table {table_name} déjà créée (journal, ID: {table_id})")
+    else:
         table = creator.create_table()
         table_id = table.get('id')
+        created = existing is None
         logger.info(f"Table créée avec succès (ID: {table_id})")
-
+        completed('table', table_id=table_id, created=created)
+
+    form_created = False
+    if 'form_view' in done:
+        form_id = done['form_view']['form_id']
+        form_created = True
+        logger.info(f"Formulaire déjà créé (journal, ID: {form_id})")
+    else:
         try:
             form = creator.create_form_view(table_id)
             form_id = form.get('id') if isinstance(form, dict) else table_id
+            if isinstance(form, dict) and form.get('id'):
+                form_created = True
+                completed(
+                    'form_view',
+                    table_id=table_id,
+                    form_id=form_id,
+                    form_url=f"{creator.base_url}/dashboard/#/nc/form/{form_id}"
+                )
         except Exception as e:
             logger.warning(f"Erreur mineure lors de la création du formulaire: {str(e)}")
             form_id = table_id
 
-        form_url = f"{creator.base_url}/dashboard/#/nc/form/{form_id}"
-        
-        result = {
-            'table_id': table_id,
-            'form_id': form_id,
-            'form_url': form_url
-        }
-        
-        logger.info(f"URL du formulaire: {form_url}")
-        return result
+    if created and form_created and done.get('fingerprint', {}).get('fingerprint') != creator.schema.fingerprint:
+        # Table et formulaire créés (par cette exécution ou celle qui a été interrompue) depuis le schéma courant
+        creator.record_fingerprint(table, form_id)
+        completed('fingerprint', fingerprint=creator.schema.fingerprint, form_id=form_id)
+    elif (
+        not created and form_created and FINGERPRINT_META_KEY not in table_meta(table)
+        and not plan_migration(creator.schema.columns_payload(), creator.metadata.get_columns(table_id))
+    ):
+        # Table existante sans empreinte (antérieure aux empreintes) dont les colonnes sont
+        # conformes : l'empreinte permet de sauter cette vérification aux exécutions suivantes.
+        # Une empreinte périmée n'est pas remplacée ici : c'est le rôle de migrate_all_forms()
+        creator.record_fingerprint(table, form_id)
+        completed('fingerprint', fingerprint=creator.schema.fingerprint, form_id=form_id)
+
+    webhooks_done = not creator.webhook_url or done.get('webhooks', {}).get('url') == creator.webhook_url
+    if not webhooks_done:
+        try:
+            creator.create_webhooks(table)
+            completed('webhooks', url=creator.webhook_url)
+            webhooks_done = True
+        except Exception as e:
+            logger.warning(f"Erreur lors de l'enregistrement des webhooks: {str(e)}")
 
-    except Exception as e:
-        logger.error(f"Erreur inattendue: {str(e)}")
-        return None
+    if journal is not None and form_created and webhooks_done:
+        # Table entièrement provisionnée : plus rien à reprendre
+        journal.discard([(creator.base_id, table_name)])
+
+    form_url = f"{creator.base_url}/dashboard/#/nc/form/{form_id}"
+
+    result = {
+        'table_id': table_id,
+        'form_id': form_id,
+        'form_url': form_url
+    }
+
+    logger.info(f"URL du formulaire: {form_url}")
+    return result
 
 if __name__ == "__main__":
-    results = create_all_forms()
\ No newline at end of file
+    # Ancien point d'entrée : équivaut à `python festival_cli.py provision [options]`
+    import sys
+    from festival_cli import main
+
+    sys.exit(main(['provision', *sys.argv[1:]]))
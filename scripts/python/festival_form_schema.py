@@ -0,0 +1,117 @@
+"""
+Registre des schémas de formulaire compilés.
+
+Le schéma d'un type de formulaire (colonnes, options, sections, bannière, textes) est construit
+une seule fois par processus à partir de `get_columns()` et `build_form_data()`, figé, puis identifié
+par une empreinte de contenu stable (sha256 du JSON canonique).
+
+L'empreinte est enregistrée dans la meta de la table NocoDB avec l'identifiant du formulaire :
+une nouvelle exécution dont l'empreinte correspond se termine après une seule lecture des métadonnées,
+sans aucune écriture.
+"""
+
+import hashlib
+import json
+import threading
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from nocodb_schema_migration import parse_meta
+
+# Clés utilisées dans la meta de la table NocoDB
+FINGERPRINT_META_KEY = 'ootb_schema_fingerprint'
+FORM_ID_META_KEY = 'ootb_form_id'
+WEBHOOK_META_KEY = 'ootb_webhook_url'
+
+
+def canonical_json(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+@dataclass(frozen=True)
+class FormSchema:
+    """Schéma figé d'un type de formulaire ; les *_payload() renvoient des copies modifiables pour l'API"""
+
+    form_type: str
+    table_name: str
+    title: str
+    fingerprint: str
+    columns: Tuple[Mapping[str, Any], ...]
+    form: Mapping[str, Any]
+    _columns_json: str = field(repr=False)
+    _form_json: str = field(repr=False)
+
+    def column(self, column_name: str) -> Optional[Mapping[str, Any]]:
+        return next((col for col in self.columns if col['column_name'] == column_name), None)
+
+    def columns_payload(self) -> List[Dict[str, Any]]:
+        return json.loads(self._columns_json)
+
+    def form_payload(self) -> Dict[str, Any]:
+        return json.loads(self._form_json)
+
+    def table_payload(self) -> Dict[str, Any]:
+        return {'table_name': self.table_name, 'title': self.title, 'columns': self.columns_payload()}
+
+
+def compile_schema(
+    form_type: str,
+    form_config: Dict[str, Any],
+    columns: List[Dict[str, Any]],
+    form_data: Dict[str, Any]
+) -> FormSchema:
+    columns_json = canonical_json(columns)
+    form_json = canonical_json(form_data)
+    fingerprint = hashlib.sha256(
+        canonical_json({
+            'table_name': form_config['table_name'],
+            'title': form_config['title'],
+            'columns': columns,
+            'form': form_data,
+        }).encode('utf-8')
+    ).hexdigest()[:16]
+    return FormSchema(
+        form_type=form_type,
+        table_name=form_config['table_name'],
+        title=form_config['title'],
+        fingerprint=fingerprint,
+        columns=_freeze(columns),
+        form=_freeze(form_data),
+        _columns_json=columns_json,
+        _form_json=form_json,
+    )
+
+
+_registry: Dict[Tuple[str, str], FormSchema] = {}
+_registry_lock = threading.Lock()
+
+
+def get_schema(creator) -> FormSchema:
+    """
+    Schéma compilé pour un FestivalFormCreator, mis en cache par type et configuration
+    (deux éditions avec des textes différents ont donc des schémas distincts).
+    """
+    key = (creator.form_type, canonical_json(creator.form_config))
+    schema = _registry.get(key)
+    if schema is None:
+        with _registry_lock:
+            schema = _registry.get(key)
+            if schema is None:
+                columns = creator.get_columns()
+                schema = compile_schema(creator.form_type, creator.form_config, columns, creator.build_form_data(columns))
+                _registry[key] = schema
+    return schema
+
+
+def table_meta(table: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Meta d'une table NocoDB (renvoyée selon les versions sous forme d'objet ou de chaîne JSON)"""
+    return parse_meta((table or {}).get('meta'))
@@ -0,0 +1,276 @@
+"""
+Import en flux d'inscriptions (éditions précédentes, tableurs des partenaires) dans une table festival.
+
+- Lecture en flux d'un CSV (séparateur `,` ou `;`, détecté) ou d'un NDJSON (une ligne JSON par inscription,
+  par exemple `festival_snapshot/<table>.ndjson`)
+- Correspondance des colonnes source avec `get_columns()` : column_name, titre ou libellé proche
+  (casse, accents et ponctuation ignorés), plus les correspondances explicites `--map`
+- Normalisation des valeurs SingleSelect vers les options déclarées (« primaire » -> « Primaire »)
+- Insertion par l'endpoint bulk `POST /tables/{id}/records`, par lots bornés en nombre de lignes et en
+  taille de corps JSON, avec plusieurs lots en vol
+
+Seuls `concurrency` lots sont en mémoire à la fois : la mémoire reste constante quelle que soit la
+taille du fichier.
+
+Un lot n'est renvoyé que sur 429 (refusé avant traitement). Après un 5xx, NocoDB peut avoir déjà
+inséré le lot : il est signalé dans `failed_batches` (ligne de départ, taille, erreur) sans être
+rejoué, pour ne pas créer d'inscriptions en double ; vérifiez la table avant de le réimporter.
+
+    python festival_import.py stands stands_2025.csv --map "Nom complet=lastname"
+    python festival_import.py ateliers festival_snapshot/Ateliers_Festival.ndjson --dry-run
+"""
+
+import argparse
+import csv
+import json
+import logging
+import os
+import re
+import time
+import unicodedata
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional
+
+from festival_form_creator import FestivalFormCreator, NocoDBError, setup_logging
+from nocodb_transport import THROTTLED_STATUSES
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_ROWS = 500
+# Corps JSON maximal d'un lot (la limite par défaut des corps de requête NocoDB est bien plus haute)
+DEFAULT_BATCH_BYTES = 1024 * 1024
+DEFAULT_CONCURRENCY = 4
+# Colonnes gérées par NocoDB, jamais importées
+SYSTEM_FIELDS = frozenset({'id', 'createdat', 'updatedat', 'created_at', 'updated_at'})
+MAX_REPORTED_VALUES = 50
+
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+
+def _key(value: Any) -> str:
+    """Clé de comparaison : minuscules, sans accents ni ponctuation"""
+    text = unicodedata.normalize('NFKD', str(value)).encode('ascii', 'ignore').decode('ascii')
+    return _NON_ALNUM.sub(' ', text.lower()).strip()
+
+
+def iter_source(path: str, source_format: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Lignes du fichier source, une à une"""
+    source_format = source_format or ('csv' if path.lower().endswith('.csv') else 'ndjson')
+    if source_format == 'csv':
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            sample = f.read(4096)
+            f.seek(0)
+            try:
+                dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+            except csv.Error:
+                dialect = csv.excel
+            yield from csv.DictReader(f, dialect=dialect)
+    elif source_format == 'ndjson':
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        raise ValueError(f"Format source inconnu: {source_format}")
+
+
+class ColumnMapper:
+    """Transforme une ligne source en ligne NocoDB (clés = titres de colonne) pour un type de formulaire"""
+
+    def __init__(self, form_type: str, explicit: Optional[Dict[str, str]] = None):
+        self.columns = {col['column_name']: col for col in FestivalFormCreator.columns_for(form_type)}
+        self._by_key: Dict[str, str] = {}
+        for column_name, col in self.columns.items():
+            self._by_key[_key(column_name)] = column_name
+            self._by_key[_key(col['title'])] = column_name
+        self._explicit = {_key(source): target for source, target in (explicit or {}).items()}
+        unknown_targets = set(self._explicit.values()) - set(self.columns)
+        if unknown_targets:
+            raise ValueError(f"Colonne(s) cible(s) inconnue(s): {', '.join(sorted(unknown_targets))}")
+        self._options = {
+            column_name: {_key(option['title']): option['title'] for option in col['colOptions']['options']}
+            for column_name, col in self.columns.items()
+            if col['uidt'] in ('SingleSelect', 'MultiSelect')
+        }
+        self._resolved: Dict[str, Optional[str]] = {}
+        self.unknown_fields: Counter = Counter()
+        self.unmapped_options: Dict[str, Counter] = {}
+
+    def target(self, field: str) -> Optional[str]:
+        """column_name correspondant à un champ source (mis en cache par en-tête)"""
+        if field not in self._resolved:
+            key = _key(field)
+            self._resolved[field] = None if key in SYSTEM_FIELDS else self._explicit.get(key, self._by_key.get(key))
+        return self._resolved[field]
+
+    def _select(self, column_name: str, value: Any) -> Optional[str]:
+        options = self._options[column_name]
+        if self.columns[column_name]['uidt'] == 'MultiSelect':
+            items = [options.get(_key(item)) for item in str(value).split(',') if item.strip()]
+            return ','.join(item for item in items if item) or None
+        option = options.get(_key(value))
+        if option is None:
+            counter = self.unmapped_options.setdefault(column_name, Counter())
+            if value in counter or len(counter) < MAX_REPORTED_VALUES:
+                counter[value] += 1
+        return option
+
+    def _attachment(self, value: Any) -> Any:
+        if isinstance(value, list):
+            return value
+        text = str(value).strip()
+        if text.startswith('['):
+            try:
+                return json.loads(text)
+            except ValueError:
+                pass
+        return [{'url': url.strip(), 'title': os.path.basename(url.strip().split('?', 1)[0])} for url in text.split(',')]
+
+    def map_row(self, source: Dict[str, Any]) -> Dict[str, Any]:
+        row = {}
+        for field, value in source.items():
+            if field is None:
+                continue
+            column_name = self.target(field)
+            if column_name is None:
+                if _key(field) not in SYSTEM_FIELDS:
+                    self.unknown_fields[field] += 1
+                continue
+            if value is None or (isinstance(value, str) and not value.strip()):
+                continue
+            uidt = self.columns[column_name]['uidt']
+            if column_name in self._options:
+                value = self._select(column_name, value)
+            elif uidt == 'Attachment':
+                value = self._attachment(value)
+            elif isinstance(value, str):
+                value = value.strip()
+            if value is not None:
+                row[self.columns[column_name]['title']] = value
+        return row
+
+
+def iter_batches(
+    rows: Iterator[Dict[str, Any]],
+    max_rows: int = DEFAULT_BATCH_ROWS,
+    max_bytes: int = DEFAULT_BATCH_BYTES
+) -> Iterator[List[Dict[str, Any]]]:
+    """Regroupe les lignes en lots d'au plus max_rows lignes et max_bytes octets de JSON"""
+    batch: List[Dict[str, Any]] = []
+    size = 2
+    for row in rows:
+        row_size = len(json.dumps(row, ensure_ascii=False).encode('utf-8')) + 1
+        if batch and (len(batch) >= max_rows or size + row_size > max_bytes):
+            yield batch
+            batch, size = [], 2
+        batch.append(row)
+        size += row_size
+    if batch:
+        yield batch
+
+
+def import_file(
+    form_type: str,
+    path: str,
+    source_format: Optional[str] = None,
+    mapping: Optional[Dict[str, str]] = None,
+    batch_rows: int = DEFAULT_BATCH_ROWS,
+    batch_bytes: int = DEFAULT_BATCH_BYTES,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    dry_run: bool = False,
+    creator: Optional[FestivalFormCreator] = None
+) -> Dict[str, Any]:
+    """Importe le fichier dans la table du type de formulaire ; renvoie le rapport d'import"""
+    start = time.perf_counter()
+    mapper = ColumnMapper(form_type, mapping)
+    table_id = None
+    if not dry_run:
+        creator = creator or FestivalFormCreator(form_type)
+        table = creator.metadata.get_table(creator.form_config['table_name'])
+        if not table:
+            raise NocoDBError(
+                f"La table {creator.form_config['table_name']} n'existe pas : lancez d'abord le provisionnement"
+            )
+        table_id = table['id']
+
+    def insert(batch: List[Dict[str, Any]]):
+        # Rejoué seulement sur 429 : après un 503, le lot peut déjà avoir été inséré
+        creator._make_request('POST', f'/tables/{table_id}/records', batch, retry_statuses=THROTTLED_STATUSES)
+
+    report: Dict[str, Any] = {
+        'form_type': form_type,
+        'table_id': table_id,
+        'rows_read': 0,
+        'rows_inserted': 0,
+        'batches': 0,
+        'failed_batches': [],
+    }
+
+    def settle(first_row: int, size: int, future):
+        try:
+            future.result()
+            report['rows_inserted'] += size
+        except NocoDBError as e:
+            report['failed_batches'].append({'first_row': first_row, 'rows': size, 'error': str(e)})
+
+    rows = (mapper.map_row(source) for source in iter_source(path, source_format))
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        window: deque = deque()
+        for batch in iter_batches(rows, batch_rows, batch_bytes):
+            first_row = report['rows_read']
+            report['rows_read'] += len(batch)
+            report['batches'] += 1
+            if dry_run:
+                continue
+            if len(window) >= concurrency:
+                settle(*window.popleft())
+            window.append((first_row, len(batch), executor.submit(insert, batch)))
+            if report['batches'] % 10 == 0:
+                logger.info(f"{report['rows_read']} lignes lues, {report['rows_inserted']} insérées")
+        while window:
+            settle(*window.popleft())
+
+    report['unknown_fields'] = dict(mapper.unknown_fields)
+    report['unmapped_options'] = {column: dict(counter) for column, counter in mapper.unmapped_options.items()}
+    report['elapsed_s'] = round(time.perf_counter() - start, 3)
+    logger.info(
+        f"{form_type}: {report['rows_inserted']}/{report['rows_read']} lignes importées en "
+        f"{report['batches']} lot(s), {len(report['failed_batches'])} lot(s) en échec, {report['elapsed_s']}s"
+    )
+    return report
+
+
+def parse_mapping(values: Optional[List[str]]) -> Dict[str, str]:
+    """--map "Champ source=column_name" (option répétable)"""
+    mapping = {}
+    for value in values or []:
+        source, sep, target = value.partition('=')
+        if not sep:
+            raise ValueError(f"Correspondance invalide: {value!r} (attendu: source=column_name)")
+        mapping[source.strip()] = target.strip()
+    return mapping
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import en flux d'inscriptions dans une table festival")
+    parser.add_argument('form_type', choices=list(FestivalFormCreator.FORM_TYPES))
+    parser.add_argument('path', help="Fichier CSV ou NDJSON")
+    parser.add_argument('--format', choices=('csv', 'ndjson'), help="Déduit de l'extension par défaut")
+    parser.add_argument('--map', action='append', help="Correspondance explicite « Champ source=column_name »")
+    parser.add_argument('--batch-rows', type=int, default=DEFAULT_BATCH_ROWS)
+    parser.add_argument('--batch-bytes', type=int, default=DEFAULT_BATCH_BYTES)
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help="Lots envoyés en parallèle")
+    parser.add_argument('--dry-run', action='store_true', help="Vérifie la correspondance sans rien insérer")
+    args = parser.parse_args()
+    setup_logging()
+
+    report = import_file(
+        args.form_type, args.path, args.format, parse_mapping(args.map),
+        args.batch_rows, args.batch_bytes, args.concurrency, args.dry_run
+    )
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,447 @@
+"""
+Planification du programme : répartition des ateliers et conférences acceptés par jour, salle et créneau.
+
+Entrées : l'instantané de `festival_export.py` et un fichier programme (voir `programme.example.json`) :
+- `days` : jours du festival ({id, label}, id = valeur du champ `Jours`, cf. `dayMapping` du site)
+- `slots` : créneaux horaires d'une journée (« 9h00 », ...)
+- `rooms` : salles {name, capacity, form_types}
+- `attendance` : public attendu par type de formulaire (une salle plus petite est exclue)
+- `accepted_status` : valeurs de `Statut` retenues (toutes les lignes si absent)
+- `fields` : champs NocoDB du jour, de l'heure, de la salle et du statut (null pour ne pas
+  écrire un champ, par exemple `room` quand `Espaces` est un lien vers une autre table)
+
+Contraintes et objectifs :
+- capacité et type de salle (strict : seules les salles compatibles sont proposées)
+- un même intervenant (email) ne peut pas être dans deux sessions au même créneau
+- sessions en parallèle destinées à des publics / niveaux différents
+- chaque jour reçoit sa part de chaque public et de chaque niveau
+- en replanification, les sessions déjà placées bougent le moins possible
+
+Construction gloutonne (sessions les plus contraintes d'abord), puis recuit simulé par
+déplacements et échanges dont le coût est mis à jour incrémentalement (compteurs par créneau
+et par jour) : quelques centaines de sessions sont planifiées en quelques secondes.
+Avec `--apply`, jour, heure et salle des sessions modifiées sont écrits par lots (PATCH bulk).
+
+    python festival_scheduler.py programme.json --snapshot festival_snapshot --output plan.json
+    python festival_scheduler.py programme.json --apply
+"""
+
+import argparse
+import json
+import logging
+import math
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from festival_export import DEFAULT_OUTPUT_DIR, load_columnar
+from festival_form_creator import FestivalFormCreator, NocoDBError, setup_logging
+from festival_import import DEFAULT_BATCH_ROWS, iter_batches
+
+logger = logging.getLogger(__name__)
+
+SESSION_FORM_TYPES = ('ateliers', 'conferences')
+SPREAD_DIMENSIONS = ('audience_type', 'teaching_level')
+DEFAULT_FIELDS = {'day': 'Jours', 'time': 'Heure', 'room': 'Espaces', 'status': 'Statut'}
+DEFAULT_ITERATIONS = 50_000
+
+# Poids de la fonction de coût
+SPEAKER_CONFLICT_WEIGHT = 1000.0
+UNPLACED_WEIGHT = 100.0
+PARALLEL_WEIGHT = 3.0
+DAY_BALANCE_WEIGHT = 1.0
+MOVE_WEIGHT = 2.0
+
+# Température du recuit (décroissance géométrique)
+INITIAL_TEMPERATURE = 2.0
+FINAL_TEMPERATURE = 0.05
+
+
+@dataclass(frozen=True)
+class Slot:
+    day: int
+    day_index: int
+    time: str
+    time_index: int
+    room: str
+
+
+@dataclass
+class Session:
+    form_type: str
+    row_id: Any
+    title: str
+    email: Optional[str]
+    spread: Tuple[Optional[str], ...]
+    attendance: int
+    current_day: Optional[int] = None
+    current_slot: Optional[int] = None
+    stored: Optional[Dict[str, Any]] = None
+
+
+def load_programme(path: str) -> Dict[str, Any]:
+    with open(path, encoding='utf-8') as f:
+        programme = json.load(f)
+    for key in ('days', 'slots', 'rooms'):
+        if not programme.get(key):
+            raise ValueError(f"{path}: '{key}' manquant ou vide")
+    programme['fields'] = dict(DEFAULT_FIELDS, **programme.get('fields', {}))
+    programme.setdefault('attendance', {})
+    return programme
+
+
+def build_slots(programme: Dict[str, Any]) -> List[Slot]:
+    return [
+        Slot(day['id'], day_index, slot_time, time_index, room['name'])
+        for day_index, day in enumerate(programme['days'])
+        for time_index, slot_time in enumerate(programme['slots'])
+        for room in programme['rooms']
+    ]
+
+
+def _day_id(value: Any) -> Optional[int]:
+    """Jours : entier, chaîne numérique ou lien {Id, Title} ; 0 (« les trois jours ») = non placé"""
+    if isinstance(value, dict):
+        value = value.get('Id')
+    try:
+        day = int(value)
+    except (TypeError, ValueError):
+        return None
+    return day or None
+
+
+def _title(value: Any) -> Optional[str]:
+    if isinstance(value, dict):
+        value = value.get('Title')
+    return str(value).strip() if value not in (None, '') else None
+
+
+def load_sessions(programme: Dict[str, Any], slots: List[Slot], snapshot_dir: str = DEFAULT_OUTPUT_DIR) -> List[Session]:
+    """Sessions acceptées de l'instantané, avec leur placement actuel éventuel"""
+    fields = programme['fields']
+    accepted = set(programme.get('accepted_status') or ())
+    slot_index = {(slot.day, slot.time, slot.room): index for index, slot in enumerate(slots)}
+    sessions = []
+    for form_type in SESSION_FORM_TYPES:
+        columnar = load_columnar(snapshot_dir, form_type)
+        if columnar is None:
+            continue
+        data, row_count = columnar['data'], columnar['rows']
+        schema = FestivalFormCreator.schema_for(form_type)
+        missing = [None] * row_count
+
+        def column(column_name: str) -> List[Any]:
+            return data.get(schema.column(column_name)['title'], data.get(column_name, missing))
+
+        ids, titles, emails = data.get('Id', list(range(row_count))), column('title'), column('email')
+        spread = [column(dimension) for dimension in SPREAD_DIMENSIONS]
+        status = data.get(fields['status'], missing)
+        days = data.get(fields['day'], missing)
+        times = data.get(fields['time'], missing)
+        rooms = data.get(fields['room'], missing)
+        attendance = int(programme['attendance'].get(form_type, 0))
+
+        for index in range(row_count):
+            if accepted and status[index] not in accepted:
+                continue
+            day, slot_time, room = _day_id(days[index]), _title(times[index]), _title(rooms[index])
+            sessions.append(Session(
+                form_type=form_type,
+                row_id=ids[index],
+                title=titles[index] or f"{form_type} #{ids[index]}",
+                email=(emails[index] or '').strip().lower() or None,
+                spread=tuple(values[index] for values in spread),
+                attendance=attendance,
+                current_day=day,
+                current_slot=slot_index.get((day, slot_time, room)),
+                stored={'day': day, 'time': slot_time, 'room': room},
+            ))
+    logger.info(f"{len(sessions)} session(s) à planifier sur {len(slots)} créneau(x)")
+    return sessions
+
+
+class Scheduler:
+    """État d'un planning et coût maintenu incrémentalement à chaque placement / retrait"""
+
+    def __init__(self, sessions: List[Session], slots: List[Slot], programme: Dict[str, Any], seed: int = 0):
+        self.sessions = sessions
+        self.slots = slots
+        self.rng = random.Random(seed)
+        rooms = {room['name']: room for room in programme['rooms']}
+        self.feasible = [
+            [
+                index for index, slot in enumerate(slots)
+                if session.form_type in rooms[slot.room].get('form_types', SESSION_FORM_TYPES)
+                and rooms[slot.room].get('capacity', 0) >= session.attendance
+            ]
+            for session in sessions
+        ]
+        self.feasible_sets = [set(indices) for indices in self.feasible]
+        self.assign: List[Optional[int]] = [None] * len(sessions)
+        self.occupant: List[Optional[int]] = [None] * len(slots)
+
+        # Part attendue de chaque valeur (public, niveau) par jour
+        day_count = len(programme['days'])
+        totals = Counter(
+            (dimension, value)
+            for session in sessions
+            for dimension, value in enumerate(session.spread) if value
+        )
+        self.targets = {key: count / day_count for key, count in totals.items()}
+        self.band_speakers: Counter = Counter()
+        self.band_values: Counter = Counter()
+        self.day_values: Counter = Counter()
+        self.cost = 0.0
+        # Départ : toutes les sessions non placées
+        for (dimension, value), target in self.targets.items():
+            self.cost += DAY_BALANCE_WEIGHT * target * target * day_count
+        for index in range(len(sessions)):
+            self.cost += self._unplaced_cost(index)
+
+    # Coût incrémental
+
+    def _moved(self, index: int, slot_index: Optional[int]) -> bool:
+        session = self.sessions[index]
+        if slot_index is None:
+            return session.current_day is not None
+        if session.current_slot is not None:
+            return slot_index != session.current_slot
+        return session.current_day is not None and self.slots[slot_index].day != session.current_day
+
+    def _unplaced_cost(self, index: int) -> float:
+        return UNPLACED_WEIGHT + (MOVE_WEIGHT if self._moved(index, None) else 0.0)
+
+    def _update(self, index: int, slot_index: int, step: int) -> float:
+        """Ajoute (step=1) ou retire (step=-1) la session du créneau ; renvoie la variation de coût"""
+        session, slot = self.sessions[index], self.slots[slot_index]
+        band = (slot.day_index, slot.time_index)
+        delta = MOVE_WEIGHT if self._moved(index, slot_index) else 0.0
+        if session.email:
+            key = (band, session.email)
+            count = self.band_speakers[key] if step > 0 else self.band_speakers[key] - 1
+            delta += SPEAKER_CONFLICT_WEIGHT * count
+            self.band_speakers[key] += step
+        for dimension, value in enumerate(session.spread):
+            if not value:
+                continue
+            key = (band, dimension, value)
+            count = self.band_values[key] if step > 0 else self.band_values[key] - 1
+            delta += PARALLEL_WEIGHT * count
+            self.band_values[key] += step
+
+            key = (slot.day_index, dimension, value)
+            target = self.targets[(dimension, value)]
+            low = self.day_values[key] if step > 0 else self.day_values[key] - 1
+            delta += DAY_BALANCE_WEIGHT * ((low + 1 - target) ** 2 - (low - target) ** 2)
+            self.day_values[key] += step
+        return delta if step > 0 else -delta
+
+    def add(self, index: int, slot_index: Optional[int]) -> float:
+        self.assign[index] = slot_index
+        if slot_index is None:
+            delta = self._unplaced_cost(index)
+        else:
+            self.occupant[slot_index] = index
+            delta = self._update(index, slot_index, 1)
+        self.cost += delta
+        return delta
+
+    def remove(self, index: int) -> float:
+        slot_index = self.assign[index]
+        if slot_index is None:
+            delta = -self._unplaced_cost(index)
+        else:
+            self.occupant[slot_index] = None
+            delta = self._update(index, slot_index, -1)
+        self.assign[index] = None
+        self.cost += delta
+        return delta
+
+    def load(self, assignment: List[Optional[int]]):
+        for index in range(len(self.sessions)):
+            self.remove(index)
+            self.add(index, assignment[index])
+
+    # Recherche
+
+    def construct(self):
+        """Placements actuels conservés s'ils restent possibles, puis les plus contraintes d'abord"""
+        pending = []
+        for index, session in enumerate(self.sessions):
+            slot_index = session.current_slot
+            if slot_index in self.feasible_sets[index] and self.occupant[slot_index] is None:
+                self.remove(index)
+                self.add(index, slot_index)
+            else:
+                pending.append(index)
+        for index in sorted(pending, key=lambda index: len(self.feasible[index])):
+            best, best_delta = None, 0.0
+            for slot_index in self.feasible[index]:
+                if self.occupant[slot_index] is not None:
+                    continue
+                delta = self.remove(index) + self.add(index, slot_index)
+                self.remove(index)
+                self.add(index, None)
+                if delta < best_delta:
+                    best, best_delta = slot_index, delta
+            if best is not None:
+                self.remove(index)
+                self.add(index, best)
+
+    def anneal(self, iterations: int = DEFAULT_ITERATIONS, time_limit: Optional[float] = None):
+        """Recuit simulé : déplacement vers un créneau libre ou échange avec l'occupant"""
+        if not self.sessions:
+            return
+        deadline = time.perf_counter() + time_limit if time_limit else None
+        best, best_cost = list(self.assign), self.cost
+        cooling = (FINAL_TEMPERATURE / INITIAL_TEMPERATURE) ** (1.0 / max(1, iterations))
+        temperature = INITIAL_TEMPERATURE
+        for iteration in range(iterations):
+            temperature *= cooling
+            if deadline and iteration % 1000 == 0 and time.perf_counter() > deadline:
+                break
+            index = self.rng.randrange(len(self.sessions))
+            if not self.feasible[index]:
+                continue
+            target = self.rng.choice(self.feasible[index])
+            origin = self.assign[index]
+            if target == origin:
+                continue
+            other = self.occupant[target]
+            if other is not None and origin is not None and origin not in self.feasible_sets[other]:
+                continue
+
+            delta = self.remove(index)
+            if other is not None:
+                delta += self.remove(other)
+            delta += self.add(index, target)
+            if other is not None:
+                delta += self.add(other, origin)
+
+            if delta <= 0 or self.rng.random() < math.exp(-delta / temperature):
+                if self.cost < best_cost - 1e-9:
+                    best, best_cost = list(self.assign), self.cost
+                continue
+            # Refusé : retour à l'état précédent
+            self.remove(index)
+            if other is not None:
+                self.remove(other)
+                self.add(other, target)
+            self.add(index, origin)
+        if best_cost < self.cost - 1e-9:
+            self.load(best)
+
+    # Résultat
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'cost': round(self.cost, 3),
+            'placed': sum(slot_index is not None for slot_index in self.assign),
+            'unplaced': sum(slot_index is None for slot_index in self.assign),
+            'moved': sum(self._moved(index, slot_index) for index, slot_index in enumerate(self.assign)),
+            'speaker_conflicts': sum(count * (count - 1) // 2 for count in self.band_speakers.values()),
+            'parallel_duplicates': sum(count * (count - 1) // 2 for count in self.band_values.values()),
+        }
+
+    def assignments(self) -> List[Dict[str, Any]]:
+        result = []
+        for index, session in enumerate(self.sessions):
+            slot_index = self.assign[index]
+            slot = self.slots[slot_index] if slot_index is not None else None
+            result.append({
+                'form_type': session.form_type,
+                'id': session.row_id,
+                'title': session.title,
+                'day': slot.day if slot else None,
+                'time': slot.time if slot else None,
+                'room': slot.room if slot else None,
+                'moved': self._moved(index, slot_index),
+                'previous': session.stored,
+            })
+        return result
+
+
+def schedule(
+    programme: Dict[str, Any],
+    snapshot_dir: str = DEFAULT_OUTPUT_DIR,
+    iterations: int = DEFAULT_ITERATIONS,
+    time_limit: Optional[float] = None,
+    seed: int = 0
+) -> Dict[str, Any]:
+    start = time.perf_counter()
+    slots = build_slots(programme)
+    sessions = load_sessions(programme, slots, snapshot_dir)
+    scheduler = Scheduler(sessions, slots, programme, seed)
+    scheduler.construct()
+    initial = scheduler.summary()
+    scheduler.anneal(iterations, time_limit)
+    summary = scheduler.summary()
+    summary['initial_cost'] = initial['cost']
+    summary['elapsed_s'] = round(time.perf_counter() - start, 3)
+    logger.info(
+        f"{summary['placed']} session(s) placée(s), {summary['unplaced']} non placée(s), "
+        f"{summary['speaker_conflicts']} conflit(s) d'intervenant, coût {initial['cost']} -> {summary['cost']} "
+        f"en {summary['elapsed_s']}s"
+    )
+    return {'summary': summary, 'assignments': scheduler.assignments()}
+
+
+def write_back(
+    assignments: List[Dict[str, Any]],
+    programme: Dict[str, Any],
+    batch_rows: int = DEFAULT_BATCH_ROWS
+) -> Dict[str, int]:
+    """Écrit jour, heure et salle des sessions dont le placement a changé (PATCH bulk par table)"""
+    fields = programme['fields']
+    updates: Dict[str, List[Dict[str, Any]]] = {}
+    for assignment in assignments:
+        if assignment['day'] is None:
+            continue
+        row = {'Id': assignment['id']}
+        for key in ('day', 'time', 'room'):
+            if fields.get(key) and assignment['previous'].get(key) != assignment[key]:
+                row[fields[key]] = assignment[key]
+        if len(row) > 1:
+            updates.setdefault(assignment['form_type'], []).append(row)
+
+    written = {}
+    for form_type, rows in updates.items():
+        creator = FestivalFormCreator(form_type)
+        table = creator.metadata.get_table(creator.form_config['table_name'])
+        if not table:
+            raise NocoDBError(f"La table {creator.form_config['table_name']} n'existe pas")
+        for batch in iter_batches(iter(rows), batch_rows):
+            creator._make_request('PATCH', f"/tables/{table['id']}/records", batch)
+        written[form_type] = len(rows)
+        logger.info(f"{creator.form_config['table_name']}: {len(rows)} placement(s) écrit(s)")
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Planification des ateliers et conférences par jour, salle et créneau")
+    parser.add_argument('programme', help="Fichier programme JSON (voir programme.example.json)")
+    parser.add_argument('--snapshot', default=DEFAULT_OUTPUT_DIR, help="Dossier produit par festival_export.py")
+    parser.add_argument('--iterations', type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument('--time-limit', type=float, help="Durée maximale de la recherche (s)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Fichier JSON du planning (stdout par défaut)")
+    parser.add_argument('--apply', action='store_true', help="Écrit les placements modifiés dans NocoDB")
+    args = parser.parse_args()
+    setup_logging()
+
+    programme = load_programme(args.programme)
+    plan = schedule(programme, args.snapshot, args.iterations, args.time_limit, args.seed)
+    if args.apply:
+        plan['summary']['written'] = write_back(plan['assignments'], programme)
+    output = json.dumps(plan, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
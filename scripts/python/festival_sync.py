@@ -0,0 +1,277 @@
+"""
+Synchronisation incrémentale des tables festival vers un miroir SQLite local.
+
+Chaque table garde un filigrane (watermark) : la plus grande valeur `UpdatedAt` déjà reçue.
+Une synchronisation ne demande que les lignes modifiées depuis ce filigrane (et les lignes
+jamais modifiées, `UpdatedAt` nul, créées depuis), page après page en repartant de la dernière
+clé `(UpdatedAt, Id)` reçue, puis compare le nombre de lignes distant au nombre local :
+- égalité : aucune suppression possible (après l'upsert, le miroir contient toutes les lignes distantes)
+- différence : la liste des Id est relue pour supprimer les lignes disparues et récupérer
+  celles qui manquent au miroir (lignes manquées par une synchronisation antérieure)
+
+En régime permanent, une synchronisation coûte donc deux petites requêtes par table au lieu
+d'un rechargement complet.
+
+    python festival_sync.py --db festival_mirror.sqlite
+    python festival_sync.py --db festival_mirror.sqlite --full   # Oublie les filigranes
+"""
+
+import argparse
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from festival_export import DEFAULT_PAGE_SIZE
+from festival_form_creator import FestivalFormCreator, parse_form_types, setup_logging
+from nocodb_metadata import BaseMetadataSnapshot
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = 'festival_mirror.sqlite'
+WATERMARK_FIELD = 'UpdatedAt'
+# Id demandés par requête pour récupérer les lignes manquantes
+MISSING_CHUNK = 100
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    table_name TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    updated_at TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (table_name, id)
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    table_name TEXT PRIMARY KEY,
+    table_id TEXT NOT NULL,
+    watermark TEXT,
+    synced_at REAL
+);
+"""
+
+
+class FestivalMirror:
+    """Miroir SQLite des tables festival (une ligne JSON par enregistrement)"""
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    # État
+
+    def get_watermark(self, table_name: str) -> Optional[str]:
+        row = self.conn.execute('SELECT watermark FROM sync_state WHERE table_name = ?', (table_name,)).fetchone()
+        return row[0] if row else None
+
+    def set_state(self, table_name: str, table_id: str, watermark: Optional[str]):
+        self.conn.execute(
+            'INSERT INTO sync_state (table_name, table_id, watermark, synced_at) VALUES (?, ?, ?, ?) '
+            'ON CONFLICT(table_name) DO UPDATE SET table_id = excluded.table_id, '
+            'watermark = excluded.watermark, synced_at = excluded.synced_at',
+            (table_name, table_id, watermark, time.time())
+        )
+
+    def table_ids(self) -> Dict[str, str]:
+        """{table_id: table_name} des tables déjà synchronisées"""
+        return dict(self.conn.execute('SELECT table_id, table_name FROM sync_state'))
+
+    def reset(self, table_name: str):
+        """Oublie le filigrane : la prochaine synchronisation relira toute la table"""
+        with self._lock, self.conn:
+            self.conn.execute('UPDATE sync_state SET watermark = NULL WHERE table_name = ?', (table_name,))
+
+    # Lignes
+
+    def upsert(self, table_name: str, rows: List[Dict[str, Any]]):
+        self.conn.executemany(
+            'INSERT INTO records (table_name, id, updated_at, data) VALUES (?, ?, ?, ?) '
+            'ON CONFLICT(table_name, id) DO UPDATE SET updated_at = excluded.updated_at, data = excluded.data',
+            [
+                (table_name, row['Id'], row.get(WATERMARK_FIELD), json.dumps(row, ensure_ascii=False))
+                for row in rows
+            ]
+        )
+
+    def count(self, table_name: str) -> int:
+        return self.conn.execute('SELECT COUNT(*) FROM records WHERE table_name = ?', (table_name,)).fetchone()[0]
+
+    def ids(self, table_name: str) -> set:
+        return {row[0] for row in self.conn.execute('SELECT id FROM records WHERE table_name = ?', (table_name,))}
+
+    def delete(self, table_name: str, ids: List[int]):
+        self.conn.executemany('DELETE FROM records WHERE table_name = ? AND id = ?', [(table_name, i) for i in ids])
+
+    def get(self, table_name: str, record_id: int) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute(
+            'SELECT data FROM records WHERE table_name = ? AND id = ?', (table_name, record_id)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def rows(self, table_name: str) -> Iterator[Dict[str, Any]]:
+        """Lignes du miroir, triées par Id"""
+        for (data,) in self.conn.execute('SELECT data FROM records WHERE table_name = ? ORDER BY id', (table_name,)):
+            yield json.loads(data)
+
+
+def _iter_keyset(
+    creator: FestivalFormCreator,
+    table_id: str,
+    where: str,
+    cursor,
+    sort: str,
+    page_size: int,
+    fields: Optional[str] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Parcourt les lignes qui vérifient `where`, page par page et dans l'ordre de `sort`.
+    Chaque page repart de la dernière ligne reçue (`cursor(row)` donne la condition « après
+    cette ligne ») plutôt que d'un offset : une ligne modifiée ou supprimée pendant la lecture
+    ne décale pas les pages suivantes.
+    """
+    params = {'sort': sort, 'limit': page_size}
+    if fields:
+        params['fields'] = fields
+    after = None
+    while True:
+        clause = f"{where}~and{after}" if after else where
+        page = creator._make_request(
+            'GET', f'/tables/{table_id}/records', params=dict(params, where=clause)
+        ).get('list', [])
+        yield from page
+        if len(page) < page_size:
+            return
+        after = cursor(page[-1])
+
+
+def iter_changed_rows(
+    creator: FestivalFormCreator,
+    table_id: str,
+    watermark: Optional[str],
+    page_size: int = DEFAULT_PAGE_SIZE
+) -> Iterator[Dict[str, Any]]:
+    """Lignes modifiées depuis `watermark` (toutes si None), lues séquentiellement par clé"""
+    # gte plutôt que gt : plusieurs lignes peuvent partager le même horodatage ; l'upsert est idempotent
+    since = f"({WATERMARK_FIELD},gte,exactDate,{watermark})" if watermark else f"({WATERMARK_FIELD},isnot,null)"
+    yield from _iter_keyset(
+        creator, table_id, f"({since})",
+        lambda row: (
+            f"(({WATERMARK_FIELD},gt,exactDate,{row[WATERMARK_FIELD]})"
+            f"~or(({WATERMARK_FIELD},eq,exactDate,{row[WATERMARK_FIELD]})~and(Id,gt,{row['Id']})))"
+        ),
+        f"{WATERMARK_FIELD},Id", page_size
+    )
+    # Lignes jamais modifiées (UpdatedAt nul) : filtrées sur CreatedAt
+    never = f"({WATERMARK_FIELD},is,null)"
+    if watermark:
+        never += f"~and(CreatedAt,gte,exactDate,{watermark})"
+    yield from _iter_keyset(creator, table_id, f"({never})", lambda row: f"(Id,gt,{row['Id']})", 'Id', page_size)
+
+
+def iter_remote_ids(creator: FestivalFormCreator, table_id: str, page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[int]:
+    for row in _iter_keyset(
+        creator, table_id, '(Id,gt,0)', lambda row: f"(Id,gt,{row['Id']})", 'Id', page_size, fields='Id'
+    ):
+        yield row['Id']
+
+
+def fetch_rows(creator: FestivalFormCreator, table_id: str, ids: List[int]) -> Iterator[Dict[str, Any]]:
+    """Lignes complètes des Id demandés, MISSING_CHUNK par requête"""
+    for start in range(0, len(ids), MISSING_CHUNK):
+        chunk = ids[start:start + MISSING_CHUNK]
+        where = '~or'.join(f"(Id,eq,{record_id})" for record_id in chunk)
+        yield from _iter_keyset(creator, table_id, f"({where})", lambda row: f"(Id,gt,{row['Id']})", 'Id', len(chunk))
+
+
+def sync_table(
+    mirror: FestivalMirror,
+    creator: FestivalFormCreator,
+    page_size: int = DEFAULT_PAGE_SIZE
+) -> Optional[Dict[str, Any]]:
+    """Synchronise une table ; renvoie le nombre de lignes reçues, récupérées et supprimées"""
+    table_name = creator.form_config['table_name']
+    table = creator.metadata.get_table(table_name)
+    if not table:
+        logger.warning(f"La table {table_name} n'existe pas, synchronisation ignorée")
+        return None
+    table_id = table['id']
+
+    watermark = mirror.get_watermark(table_name)
+    changed = 0
+    new_watermark = watermark
+    batch: List[Dict[str, Any]] = []
+    with mirror._lock, mirror.conn:
+        for row in iter_changed_rows(creator, table_id, watermark, page_size):
+            batch.append(row)
+            stamp = row.get(WATERMARK_FIELD) or row.get('CreatedAt')
+            if stamp and (new_watermark is None or stamp > new_watermark):
+                new_watermark = stamp
+            if len(batch) >= page_size:
+                mirror.upsert(table_name, batch)
+                changed += len(batch)
+                batch = []
+        mirror.upsert(table_name, batch)
+        changed += len(batch)
+
+        deleted = recovered = 0
+        remote_count = creator._make_request('GET', f'/tables/{table_id}/records/count').get('count', 0)
+        if remote_count != mirror.count(table_name):
+            remote_ids = set(iter_remote_ids(creator, table_id, page_size))
+            local_ids = mirror.ids(table_name)
+            stale = sorted(local_ids - remote_ids)
+            mirror.delete(table_name, stale)
+            deleted = len(stale)
+            missing = list(fetch_rows(creator, table_id, sorted(remote_ids - local_ids)))
+            mirror.upsert(table_name, missing)
+            recovered = len(missing)
+
+        mirror.set_state(table_name, table_id, new_watermark)
+
+    logger.info(f"{table_name}: {changed} ligne(s) reçue(s), {recovered} récupérée(s), {deleted} supprimée(s)")
+    return {'changed': changed, 'recovered': recovered, 'deleted': deleted, 'watermark': new_watermark}
+
+
+def sync_all(
+    db_path: str = DEFAULT_DB_PATH,
+    form_types: Optional[List[str]] = None,
+    full: bool = False,
+    page_size: int = DEFAULT_PAGE_SIZE
+) -> Dict[str, Any]:
+    """Synchronise toutes les tables festival dans le miroir SQLite"""
+    form_types = form_types or list(FestivalFormCreator.FORM_TYPES.keys())
+    first = FestivalFormCreator(form_types[0])
+    metadata = BaseMetadataSnapshot(first.base_id, first._make_request)
+    mirror = FestivalMirror(db_path)
+    results = {}
+    try:
+        for form_type in form_types:
+            creator = FestivalFormCreator(form_type, metadata=metadata)
+            if full:
+                mirror.reset(creator.form_config['table_name'])
+            results[form_type] = sync_table(mirror, creator, page_size)
+    finally:
+        mirror.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synchronisation incrémentale vers un miroir SQLite")
+    parser.add_argument('--db', default=DEFAULT_DB_PATH)
+    parser.add_argument('--only', type=parse_form_types, help="Types de formulaire à synchroniser, séparés par des virgules")
+    parser.add_argument('--full', action='store_true', help="Ignore les filigranes et relit toutes les lignes")
+    args = parser.parse_args()
+    setup_logging()
+
+    form_types = args.only
+    sync_all(args.db, form_types, full=args.full)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Validation par lot des inscriptions festival contre le schéma déclaré dans `get_columns()`.
+
+Les règles sont compilées une fois par type de formulaire à partir du schéma :
+- `required` : colonne `rqd` (texte vide, liste de pièces jointes vide ou valeur absente)
+- `max_length` : limite « N caractères max. » lue dans l'aide de la colonne
+- `option` : valeur hors de la liste fermée d'une colonne SingleSelect
+- `format` : colonnes Email et URL
+
+Chaque règle s'applique à une colonne entière à la fois (fichier colonnaire produit par
+`festival_export.py`), sans reconstruire les lignes ; les erreurs sont ensuite regroupées par ligne.
+Des lignes ajoutées par l'API, qui échappent à la validation du formulaire, sont ainsi détectées
+avant la génération du site (code de sortie 1).
+
+    python festival_validation.py --snapshot festival_snapshot --output validation.json
+"""
+
+import argparse
+import json
+import logging
+import re
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence
+
+from festival_export import DEFAULT_OUTPUT_DIR, load_columnar
+from festival_form_creator import FestivalFormCreator, parse_form_types, setup_logging
+
+logger = logging.getLogger(__name__)
+
+# « 500 caractères max. », « (500 caractères maximum) »
+_MAX_LENGTH = re.compile(r'(\d+)\s*caract[eè]res?\s*max', re.IGNORECASE)
+_EMAIL = re.compile(r'[^@\s]+@[^@\s]+\.[^@\s]+')
+_URL = re.compile(r'(https?://)?[^\s/$.?#][^\s]*\.[^\s]+', re.IGNORECASE)
+FORMAT_PATTERNS = {'Email': _EMAIL, 'URL': _URL}
+
+
+@dataclass(frozen=True)
+class ColumnRules:
+    """Règles d'une colonne, compilées depuis sa déclaration"""
+
+    column_name: str
+    title: str
+    uidt: str
+    required: bool
+    max_length: Optional[int]
+    options: Optional[FrozenSet[str]]
+
+
+def compile_rules(form_type: str) -> List[ColumnRules]:
+    """Règles de toutes les colonnes déclarées pour ce type de formulaire"""
+    rules = []
+    for col in FestivalFormCreator.schema_for(form_type).columns:
+        help_text = (col.get('meta') or {}).get('help') or ''
+        match = _MAX_LENGTH.search(help_text)
+        options = None
+        if col['uidt'] in ('SingleSelect', 'MultiSelect'):
+            options = frozenset(option['title'] for option in (col.get('colOptions') or {}).get('options', ()))
+        rules.append(ColumnRules(
+            column_name=col['column_name'],
+            title=col['title'],
+            uidt=col['uidt'],
+            required=bool(col.get('rqd')),
+            max_length=int(match.group(1)) if match else None,
+            options=options,
+        ))
+    return rules
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or value == [] or (isinstance(value, str) and not value.strip())
+
+
+def _select_values(value: Any, uidt: str) -> List[str]:
+    if uidt == 'MultiSelect' and isinstance(value, str):
+        return [item.strip() for item in value.split(',') if item.strip()]
+    if isinstance(value, list):
+        return [str(item) for item in value]
+    return [str(value)]
+
+
+def check_column(rule: ColumnRules, values: Sequence[Any]) -> List[tuple]:
+    """
+    Applique les règles d'une colonne à toutes ses valeurs ;
+    renvoie (indice de ligne, règle, détail) pour chaque violation.
+    """
+    errors = []
+    filled = [(index, value) for index, value in enumerate(values) if not _is_empty(value)]
+
+    if rule.required and len(filled) < len(values):
+        present = {index for index, _ in filled}
+        errors.extend((index, 'required', None) for index in range(len(values)) if index not in present)
+
+    if rule.max_length is not None:
+        limit = rule.max_length
+        errors.extend(
+            (index, 'max_length', f"{len(value)} > {limit}")
+            for index, value in filled
+            if isinstance(value, str) and len(value) > limit
+        )
+
+    if rule.options is not None:
+        options, uidt = rule.options, rule.uidt
+        for index, value in filled:
+            invalid = [item for item in _select_values(value, uidt) if item not in options]
+            if invalid:
+                errors.append((index, 'option', ', '.join(invalid)))
+
+    pattern = FORMAT_PATTERNS.get(rule.uidt)
+    if pattern is not None:
+        errors.extend(
+            (index, 'format', value)
+            for index, value in filled
+            if not (isinstance(value, str) and pattern.fullmatch(value.strip()))
+        )
+    return errors
+
+
+def validate_columns(
+    rules: List[ColumnRules],
+    data: Dict[str, List[Any]],
+    row_count: int
+) -> Dict[int, List[Dict[str, Any]]]:
+    """
+    Valide des données colonnaires {colonne: [valeurs]} (clés = titres NocoDB ou column_name) ;
+    renvoie les erreurs indexées par numéro de ligne.
+    """
+    by_row: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+    missing = [None] * row_count
+    for rule in rules:
+        values = data.get(rule.title, data.get(rule.column_name, missing))
+        for index, kind, detail in check_column(rule, values):
+            error = {'column': rule.column_name, 'rule': kind}
+            if detail is not None:
+                error['detail'] = detail
+            by_row[index].append(error)
+    return by_row
+
+
+def validate_rows(form_type: str, rows: List[Dict[str, Any]]) -> Dict[int, List[Dict[str, Any]]]:
+    """Même validation pour des lignes déjà en mémoire (transposées en colonnes)"""
+    columns: Dict[str, List[Any]] = defaultdict(lambda: [None] * len(rows))
+    for index, row in enumerate(rows):
+        for key, value in row.items():
+            columns[key][index] = value
+    return validate_columns(compile_rules(form_type), columns, len(rows))
+
+
+def validate_snapshot(snapshot_dir: str = DEFAULT_OUTPUT_DIR, form_types: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Rapport de validation de l'instantané : erreurs par ligne (Id), par table"""
+    start = time.perf_counter()
+    tables = {}
+    for form_type in form_types or list(FestivalFormCreator.FORM_TYPES.keys()):
+        columnar = load_columnar(snapshot_dir, form_type)
+        if columnar is None:
+            continue
+        row_count = columnar['rows']
+        by_row = validate_columns(compile_rules(form_type), columnar['data'], row_count)
+        ids = columnar['data'].get('Id', [None] * row_count)
+        tables[form_type] = {
+            'table_name': FestivalFormCreator.FORM_TYPES[form_type]['table_name'],
+            'rows': row_count,
+            'invalid_rows': len(by_row),
+            'errors': [{'id': ids[index], 'errors': by_row[index]} for index in sorted(by_row)],
+        }
+
+    report = {
+        'elapsed_s': round(time.perf_counter() - start, 3),
+        'valid': all(not table['invalid_rows'] for table in tables.values()),
+        'tables': tables,
+    }
+    for table in tables.values():
+        logger.info(f"{table['table_name']}: {table['invalid_rows']} ligne(s) invalide(s) sur {table['rows']}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validation des inscriptions contre le schéma déclaré")
+    parser.add_argument('--snapshot', default=DEFAULT_OUTPUT_DIR, help="Dossier produit par festival_export.py")
+    parser.add_argument('--only', type=parse_form_types, help="Types de formulaire, séparés par des virgules")
+    parser.add_argument('--output', help="Fichier JSON de sortie (stdout par défaut)")
+    args = parser.parse_args()
+    setup_logging()
+
+    form_types = args.only
+    report = validate_snapshot(args.snapshot, form_types)
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+    return 0 if report['valid'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+"""
+Récepteur de webhooks NocoDB (asyncio) qui tient à jour le miroir SQLite de `festival_sync.py`.
+
+Les webhooks sont enregistrés par `FestivalFormCreator` avec les tables et les vues formulaire
+quand `NOCODB_WEBHOOK_URL` (et `NOCODB_WEBHOOK_SECRET`) sont définis : un webhook « after » par
+opération (insert, update, delete et leurs variantes bulk) sur chacune des trois tables.
+
+Chaque événement v2 (`records.after.insert`, `records.after.update`, ...) est appliqué au miroir :
+- insert / update : upsert des lignes reçues (fusionnées avec la ligne connue pour update)
+- delete : suppression des Id reçus
+- bulkInsert : NocoDB n'envoie que le nombre de lignes (`row_inserted`) ; la table est
+  resynchronisée par filigrane (`sync_table`)
+
+La table est identifiée par `data.table_id` (`data.table_name` contient son titre) : Id connus
+du miroir (`sync_state`), sinon résolus une fois via les métadonnées de la base. Le miroir suit
+ainsi les inscriptions en quelques secondes, l'API n'étant interrogée que pour les imports en
+masse. Au démarrage, `--sync-on-start` rattrape par filigrane les événements manqués pendant un
+arrêt du récepteur.
+
+    python festival_webhooks.py --db festival_mirror.sqlite --port 8787 --sync-on-start
+"""
+
+import argparse
+import asyncio
+import hmac
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from festival_form_creator import WEBHOOK_SECRET_HEADER, FestivalFormCreator, setup_logging
+from festival_sync import DEFAULT_DB_PATH, FestivalMirror, sync_all, sync_table
+from nocodb_metadata import BaseMetadataSnapshot
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8787
+WEBHOOK_PATH = '/nocodb/webhook'
+MAX_BODY_SIZE = 10 * 1024 * 1024
+UPSERT_OPERATIONS = frozenset({'insert', 'bulkInsert', 'update', 'bulkUpdate'})
+DELETE_OPERATIONS = frozenset({'delete', 'bulkDelete'})
+
+HTTP_REASONS = {
+    200: 'OK',
+    400: 'Bad Request',
+    401: 'Unauthorized',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    413: 'Payload Too Large',
+}
+
+
+class WebhookReceiver:
+    """Applique les événements NocoDB au miroir ; `serve()` expose l'endpoint HTTP"""
+
+    def __init__(
+        self,
+        mirror: FestivalMirror,
+        secret: Optional[str] = None,
+        path: str = WEBHOOK_PATH,
+        metadata: Optional[BaseMetadataSnapshot] = None
+    ):
+        self.mirror = mirror
+        self.secret = secret
+        self.path = path
+        # Sans métadonnées : seules les tables déjà synchronisées sont reconnues, pas de resynchronisation
+        self.metadata = metadata
+        form_types = {config['table_name']: form_type for form_type, config in FestivalFormCreator.FORM_TYPES.items()}
+        self.form_types = {
+            table_id: form_types[table_name]
+            for table_id, table_name in mirror.table_ids().items() if table_name in form_types
+        }
+        self._unresolved = set()
+        self._resolve_lock = threading.Lock()
+        self.applied = 0
+        self.ignored = 0
+
+    def resolve(self, table_id: Optional[str]) -> Optional[str]:
+        """Type de formulaire de la table `table_id`, None si ce n'est pas une table festival"""
+        if not table_id or table_id in self.form_types or self.metadata is None:
+            return self.form_types.get(table_id)
+        with self._resolve_lock:
+            if table_id in self.form_types or table_id in self._unresolved:
+                return self.form_types.get(table_id)
+            # Table créée après le chargement des métadonnées : une seule relecture
+            for refresh in (False, True):
+                if refresh:
+                    self.metadata.refresh()
+                for form_type, config in FestivalFormCreator.FORM_TYPES.items():
+                    table = self.metadata.get_table(config['table_name'])
+                    if table:
+                        self.form_types[table['id']] = form_type
+                if table_id in self.form_types:
+                    return self.form_types[table_id]
+            self._unresolved.add(table_id)
+            return None
+
+    # Application des événements
+
+    def apply(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Applique un événement v2 au miroir ; renvoie le nombre de lignes écrites / supprimées"""
+        operation = str(event.get('type', '')).rsplit('.', 1)[-1]
+        data = event.get('data') or {}
+        form_type = self.resolve(data.get('table_id'))
+        rows = [row for row in data.get('rows') or [] if isinstance(row, dict) and row.get('Id') is not None]
+
+        if form_type is None or operation not in UPSERT_OPERATIONS | DELETE_OPERATIONS:
+            self.ignored += 1
+            logger.debug(f"Événement ignoré: {event.get('type')} sur {data.get('table_name')} ({data.get('table_id')})")
+            return {'ignored': True}
+        table_name = FestivalFormCreator.FORM_TYPES[form_type]['table_name']
+
+        if operation in UPSERT_OPERATIONS and not rows:
+            # bulkInsert (import en masse) : NocoDB n'envoie que le nombre de lignes
+            if self.metadata is None:
+                logger.warning(f"{table_name}: {operation} sans lignes, lancez festival_sync.py pour rattraper")
+                self.ignored += 1
+                return {'ignored': True}
+            result = sync_table(self.mirror, FestivalFormCreator(form_type, metadata=self.metadata))
+            self.applied += 1
+            return {'table_name': table_name, 'operation': operation, 'rows': (result or {}).get('changed', 0)}
+
+        with self.mirror._lock, self.mirror.conn:
+            if operation in DELETE_OPERATIONS:
+                self.mirror.delete(table_name, [row['Id'] for row in rows])
+            else:
+                if operation in ('update', 'bulkUpdate'):
+                    # Certains événements ne portent que les champs modifiés
+                    rows = [dict(self.mirror.get(table_name, row['Id']) or {}, **row) for row in rows]
+                self.mirror.upsert(table_name, rows)
+        self.applied += 1
+        logger.info(f"{table_name}: {operation} de {len(rows)} ligne(s)")
+        return {'table_name': table_name, 'operation': operation, 'rows': len(rows)}
+
+    # HTTP
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            status, payload = await self._dispatch(reader)
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            writer.close()
+            return
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        writer.write(
+            f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n"
+            .encode('latin-1') + body
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _dispatch(self, reader: asyncio.StreamReader) -> Tuple[int, Dict[str, Any]]:
+        head = await reader.readuntil(b'\r\n\r\n')
+        request_line, *header_lines = head.decode('latin-1').split('\r\n')
+        method, target, _ = (request_line.split(' ', 2) + ['', ''])[:3]
+        headers = {}
+        for line in header_lines:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+
+        length = int(headers.get('content-length') or 0)
+        if length > MAX_BODY_SIZE:
+            return 413, {'msg': 'Payload too large'}
+        raw_body = await reader.readexactly(length) if length else b''
+
+        path = target.split('?', 1)[0]
+        if path == '/health':
+            return 200, {'status': 'ok', 'applied': self.applied, 'ignored': self.ignored}
+        if path != self.path:
+            return 404, {'msg': f'Route {path} not found'}
+        if method != 'POST':
+            return 405, {'msg': 'POST attendu'}
+        if self.secret and not hmac.compare_digest(headers.get(WEBHOOK_SECRET_HEADER, ''), self.secret):
+            return 401, {'msg': 'Secret invalide'}
+        try:
+            event = json.loads(raw_body or b'{}')
+        except ValueError:
+            return 400, {'msg': 'Invalid JSON body'}
+        if not isinstance(event, dict):
+            return 400, {'msg': 'Objet JSON attendu'}
+
+        # SQLite est synchrone : l'écriture se fait hors de la boucle d'événements
+        result = await asyncio.get_running_loop().run_in_executor(None, self.apply, event)
+        return 200, result
+
+    async def serve(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        server = await asyncio.start_server(self.handle, host, port)
+        addresses = ', '.join(f"{sock.getsockname()[0]}:{sock.getsockname()[1]}" for sock in server.sockets)
+        logger.info(f"Récepteur de webhooks à l'écoute sur {addresses}{self.path}")
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Récepteur de webhooks NocoDB vers le miroir SQLite")
+    parser.add_argument('--db', default=DEFAULT_DB_PATH)
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--sync-on-start', action='store_true', help="Rattrape les modifications manquées (filigrane)")
+    args = parser.parse_args()
+    setup_logging()
+
+    from dotenv import load_dotenv
+    load_dotenv()
+    if args.sync_on_start:
+        sync_all(args.db)
+    secret = os.getenv('NOCODB_WEBHOOK_SECRET')
+    if not secret:
+        logger.warning("NOCODB_WEBHOOK_SECRET non défini : les événements ne sont pas authentifiés")
+    first = FestivalFormCreator(next(iter(FestivalFormCreator.FORM_TYPES)))
+    metadata = BaseMetadataSnapshot(first.base_id, first._make_request)
+    mirror = FestivalMirror(args.db)
+    try:
+        asyncio.run(WebhookReceiver(mirror, secret, metadata=metadata).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        mirror.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""
+Contrôle d'admission des requêtes NocoDB : un seau à jetons (token bucket) par jeton d'API,
+partagé par tous les threads et tous les processus de la machine.
+
+NocoDB cloud applique un quota de requêtes par jeton. Sans coordination, un export, une
+synchronisation et un provisionnement lancés en même temps dépassent ensemble ce quota et
+sont tous ralentis par des 429. Ici, chaque requête réserve d'abord un jeton :
+- l'état du seau (jetons, débit courant, blocage) est stocké dans un petit fichier par jeton
+  d'API (nommé par empreinte sha256, le jeton n'est jamais écrit) et modifié sous verrou
+  `fcntl.flock` : tous les processus puisent dans le même seau
+- un jeton manquant est réservé à crédit : l'appelant attend exactement le temps nécessaire
+  pour qu'il soit produit (pas d'attente active, ordre d'arrivée respecté)
+- sur 429, le débit partagé est divisé par deux et le seau bloqué pendant `Retry-After` ;
+  il remonte ensuite progressivement jusqu'au débit configuré
+
+Activé par `NOCODB_RATE_LIMIT` (requêtes/s ; environ 5 pour NocoDB cloud), avec
+`NOCODB_RATE_BURST` (rafale, 10 par défaut) et `NOCODB_RATE_STATE_DIR`.
+`metrics()` donne, par seau, les attentes (total, max, p50/p99) et la saturation (part des
+requêtes qui ont dû attendre).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows : le seau n'est partagé qu'entre les threads du processus
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BURST = 10
+DEFAULT_STATE_DIR = os.path.join(tempfile.gettempdir(), 'nocodb-admission')
+# Après un 429 : débit multiplié par BACKOFF_FACTOR, sans descendre sous MIN_RATE_FACTOR × débit configuré
+BACKOFF_FACTOR = 0.5
+MIN_RATE_FACTOR = 0.1
+# Part du débit configuré regagnée par seconde sans 429
+RECOVERY_PER_SECOND = 0.05
+# Attentes conservées pour les percentiles
+MAX_SAMPLES = 10_000
+
+
+def _percentile(sorted_values, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+class TokenBucket:
+    """Seau à jetons d'un jeton d'API, état partagé via un fichier verrouillé"""
+
+    def __init__(self, key: str, rate: float, burst: int = DEFAULT_BURST, state_dir: str = DEFAULT_STATE_DIR):
+        if rate <= 0:
+            raise ValueError("Le débit doit être positif")
+        self.key = key
+        self.rate = rate
+        self.burst = max(1, burst)
+        os.makedirs(state_dir, exist_ok=True)
+        self.path = os.path.join(state_dir, f"{key}.json")
+        self._file = open(self.path, 'a+', encoding='utf-8')
+        # flock ne sépare pas les threads qui partagent le descripteur
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=MAX_SAMPLES)
+        self.requests = 0
+        self.waited = 0
+        self.throttled = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    @contextmanager
+    def _state(self):
+        """État à jour (jetons produits depuis la dernière lecture), réécrit à la sortie"""
+        with self._lock:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            try:
+                self._file.seek(0)
+                try:
+                    state = json.loads(self._file.read() or '{}')
+                except ValueError:
+                    state = {}
+                now = time.time()
+                blocked_until = state.get('blocked_until', 0.0)
+                # Aucun jeton produit pendant un blocage : sinon tous les appelants en attente
+                # seraient libérés ensemble à sa levée
+                elapsed = max(0.0, now - max(state.get('updated', now), blocked_until))
+                rate = state.get('rate', self.rate)
+                state = {
+                    'tokens': min(self.burst, state.get('tokens', self.burst) + elapsed * rate),
+                    'rate': min(self.rate, rate + self.rate * RECOVERY_PER_SECOND * elapsed),
+                    'blocked_until': blocked_until,
+                    'updated': now,
+                }
+                yield state
+                self._file.seek(0)
+                self._file.truncate()
+                self._file.write(json.dumps(state))
+                self._file.flush()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+
+    def acquire(self) -> float:
+        """Réserve un jeton et attend qu'il soit disponible ; renvoie l'attente (s)"""
+        with self._state() as state:
+            state['tokens'] -= 1
+            # Fin du blocage, puis le temps de produire les jetons déjà réservés : les appelants
+            # sont libérés à 1/débit d'intervalle
+            wait = max(0.0, state['blocked_until'] - state['updated']) + max(0.0, -state['tokens']) / state['rate']
+        if wait > 0:
+            time.sleep(wait)
+        with self._lock:
+            self.requests += 1
+            self._waits.append(wait)
+            if wait > 0:
+                self.waited += 1
+                self.wait_total += wait
+                self.wait_max = max(self.wait_max, wait)
+        return wait
+
+    def penalize(self, retry_after: float):
+        """429 reçu : débit partagé réduit et seau bloqué pendant retry_after secondes"""
+        with self._state() as state:
+            state['rate'] = max(self.rate * MIN_RATE_FACTOR, state['rate'] * BACKOFF_FACTOR)
+            state['tokens'] = min(state['tokens'], 0.0)
+            state['blocked_until'] = max(state['blocked_until'], state['updated'] + retry_after)
+            rate = state['rate']
+        with self._lock:
+            self.throttled += 1
+        logger.warning(f"Quota NocoDB atteint (seau {self.key}) : débit partagé réduit à {rate:.2f} req/s")
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._state() as state:
+            current_rate, tokens = state['rate'], state['tokens']
+        with self._lock:
+            waits = sorted(self._waits)
+            return {
+                'rate_limit': self.rate,
+                'current_rate': round(current_rate, 3),
+                'burst': self.burst,
+                'tokens': round(tokens, 3),
+                'requests': self.requests,
+                'waited': self.waited,
+                'saturation': round(self.waited / self.requests, 3) if self.requests else 0.0,
+                'throttled': self.throttled,
+                'wait_total_s': round(self.wait_total, 3),
+                'wait_max_ms': round(self.wait_max * 1000, 1),
+                'wait_p50_ms': round(_percentile(waits, 0.50) * 1000, 1),
+                'wait_p99_ms': round(_percentile(waits, 0.99) * 1000, 1),
+            }
+
+    def close(self):
+        self._file.close()
+
+
+class AdmissionControl:
+    """Un TokenBucket par jeton d'API, créé au premier usage"""
+
+    def __init__(self, rate: float, burst: int = DEFAULT_BURST, state_dir: str = DEFAULT_STATE_DIR):
+        self.rate = rate
+        self.burst = burst
+        self.state_dir = state_dir
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> Optional['AdmissionControl']:
+        """Contrôle configuré par NOCODB_RATE_LIMIT ; None si la variable est absente"""
+        rate = os.getenv('NOCODB_RATE_LIMIT')
+        if not rate:
+            return None
+        return cls(
+            float(rate),
+            int(os.getenv('NOCODB_RATE_BURST') or DEFAULT_BURST),
+            os.getenv('NOCODB_RATE_STATE_DIR') or DEFAULT_STATE_DIR,
+        )
+
+    @staticmethod
+    def bucket_key(api_token: str) -> str:
+        return hashlib.sha256(api_token.encode('utf-8')).hexdigest()[:16]
+
+    def bucket(self, api_token: str) -> TokenBucket:
+        key = self.bucket_key(api_token)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    bucket = self._buckets[key] = TokenBucket(key, self.rate, self.burst, self.state_dir)
+        return bucket
+
+    def acquire(self, api_token: str) -> float:
+        return self.bucket(api_token).acquire()
+
+    def penalize(self, api_token: str, retry_after: float):
+        self.bucket(api_token).penalize(retry_after)
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        return {key: bucket.metrics() for key, bucket in list(self._buckets.items())}
+
+    def log_metrics(self):
+        for key, metrics in self.metrics().items():
+            logger.info(
+                f"Admission {key}: {metrics['requests']} requête(s), saturation {metrics['saturation']:.0%}, "
+                f"attente p50 {metrics['wait_p50_ms']}ms / p99 {metrics['wait_p99_ms']}ms, "
+                f"{metrics['throttled']} 429, débit {metrics['current_rate']}/{metrics['rate_limit']} req/s"
+            )
@@ -0,0 +1,93 @@
+"""
+Journal d'écriture anticipée (write-ahead) du provisionnement.
+
+Chaque étape terminée (`table`, `form_view`, `fingerprint`, `webhooks`) est ajoutée au journal,
+avec les identifiants renvoyés par l'API, avant de passer à l'étape suivante. Une ligne JSON
+par étape, écrite puis synchronisée sur disque (fsync) : après une interruption, le journal
+contient exactement les étapes terminées.
+
+Au redémarrage, `_create_festival_form()` relit les étapes de chaque table et ne refait que
+celles qui manquent. Les étapes sont indexées par (base_id, table_name), ce qui permet de
+partager un même journal entre éditions et bases (`festival_batch.py`). Dès qu'une table est
+entièrement provisionnée, ses entrées sont retirées du journal : il ne contient que du travail
+inachevé, et une exécution suivante repart de l'état réel de la base.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOURNAL_PATH = '.nocodb_provisioning.journal'
+PROVISIONING_STEPS = ('table', 'form_view', 'fingerprint', 'webhooks')
+
+Scope = Tuple[str, str]
+
+
+class ProvisioningJournal:
+    """Étapes terminées par (base_id, table_name), persistées en ajout seul"""
+
+    def __init__(self, path: str = DEFAULT_JOURNAL_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._steps: Dict[Scope, Dict[str, Dict[str, Any]]] = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                try:
+                    entry = json.loads(line)
+                    scope, step = (entry['base_id'], entry['table_name']), entry['step']
+                except (ValueError, KeyError, TypeError):
+                    # Dernière ligne tronquée par l'interruption : l'étape n'était pas terminée
+                    logger.warning(f"Entrée de journal illisible ignorée ({self.path}:{line_number})")
+                    continue
+                self._steps.setdefault(scope, {})[step] = entry.get('data') or {}
+        if self._steps:
+            logger.info(f"Journal de provisionnement {self.path}: {len(self._steps)} table(s) à reprendre")
+
+    def steps(self, base_id: str, table_name: str) -> Dict[str, Dict[str, Any]]:
+        """Étapes déjà terminées pour cette table : {étape: données enregistrées}"""
+        with self._lock:
+            return dict(self._steps.get((base_id, table_name), {}))
+
+    def record(self, base_id: str, table_name: str, step: str, **data: Any):
+        """Ajoute une étape terminée ; elle est sur disque au retour"""
+        if step not in PROVISIONING_STEPS:
+            raise ValueError(f"Étape de provisionnement inconnue: {step}")
+        entry = {'base_id': base_id, 'table_name': table_name, 'step': step, 'data': data, 'at': time.time()}
+        line = json.dumps(entry, ensure_ascii=False) + '\n'
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self._steps.setdefault((base_id, table_name), {})[step] = data
+        logger.debug(f"Journal: {table_name} {step} {data}")
+
+    def discard(self, scopes: Iterable[Scope]):
+        """Retire les tables terminées ; supprime le fichier s'il ne reste rien à reprendre"""
+        with self._lock:
+            removed = [scope for scope in set(scopes) if self._steps.pop(scope, None) is not None]
+            if not removed:
+                return
+            if not self._steps:
+                if os.path.exists(self.path):
+                    os.remove(self.path)
+                return
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for (base_id, table_name), steps in self._steps.items():
+                    for step, data in steps.items():
+                        entry = {'base_id': base_id, 'table_name': table_name, 'step': step, 'data': data}
+                        f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
@@ -0,0 +1,204 @@
+"""
+Instantané des métadonnées d'une base NocoDB (tables, vues, colonnes).
+
+La liste des tables est récupérée une seule fois par exécution et partagée par tous les
+`FestivalFormCreator` ; vues et colonnes sont chargées au premier accès, une fois par table.
+Les recherches par `table_name` et par titre de vue se font via des index (O(1)).
+L'instantané peut être persisté sur disque et réutilisé tant qu'il a moins de `ttl` secondes.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Signature de FestivalFormCreator._make_request : (method, endpoint) -> réponse JSON
+RequestFn = Callable[..., Any]
+
+
+def _as_list(response: Any) -> List[Dict[str, Any]]:
+    """La réponse peut être soit une liste directement, soit dans une clé 'list'"""
+    items = response.get('list', response) if isinstance(response, dict) else response
+    if not isinstance(items, list):
+        return []
+    return [item for item in items if isinstance(item, dict)]
+
+
+class BaseMetadataSnapshot:
+    """Vue indexée et partagée des métadonnées d'une base"""
+
+    def __init__(
+        self,
+        base_id: str,
+        request: RequestFn,
+        cache_path: Optional[str] = None,
+        ttl: float = 300.0,
+    ):
+        self.base_id = base_id
+        self._request = request
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        self._loaded = False
+        # True si l'instantané vient du disque : un échec de recherche déclenche une revalidation
+        self._from_cache = False
+        self.fetched_at = 0.0
+        self._tables_by_name: Dict[str, Dict[str, Any]] = {}
+        self._views: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._columns: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+    # Chargement
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            if not self._load_from_disk():
+                self._fetch_tables()
+            self._loaded = True
+
+    def _fetch_tables(self):
+        logger.info(f"Chargement des métadonnées de la base {self.base_id}...")
+        response = self._request('GET', f'/meta/bases/{self.base_id}/tables')
+        self._tables_by_name = {
+            table['table_name']: table for table in _as_list(response) if table.get('table_name')
+        }
+        self._views.clear()
+        self._columns.clear()
+        self.fetched_at = time.time()
+        self._from_cache = False
+        self._save()
+
+    def refresh(self):
+        """Recharge la liste des tables depuis l'API et oublie vues et colonnes"""
+        with self._lock:
+            self._fetch_tables()
+            self._loaded = True
+
+    def _revalidate(self) -> bool:
+        """Recharge une fois un instantané issu du disque ; renvoie False s'il était déjà à jour"""
+        with self._lock:
+            if not self._from_cache:
+                return False
+            logger.info("Instantané local incomplet, revalidation auprès de l'API...")
+            self.refresh()
+            return True
+
+    # Tables
+
+    def get_table(self, table_name: str) -> Optional[Dict[str, Any]]:
+        self._ensure_loaded()
+        table = self._tables_by_name.get(table_name)
+        if table is None and self._revalidate():
+            table = self._tables_by_name.get(table_name)
+        return table
+
+    def add_table(self, table: Dict[str, Any]):
+        """Enregistre une table créée pendant l'exécution"""
+        if not table.get('table_name'):
+            return
+        with self._lock:
+            self._tables_by_name[table['table_name']] = table
+            self._save()
+
+    # Vues
+
+    def _views_for(self, table_id: str) -> Dict[str, Dict[str, Any]]:
+        self._ensure_loaded()
+        views = self._views.get(table_id)
+        if views is None:
+            with self._lock:
+                views = self._views.get(table_id)
+                if views is None:
+                    response = self._request('GET', f'/meta/tables/{table_id}/views')
+                    views = {view['title']: view for view in _as_list(response) if view.get('title')}
+                    self._views[table_id] = views
+                    self._save()
+        return views
+
+    def get_view(self, table_id: str, title: str, view_type: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        view = self._views_for(table_id).get(title)
+        if view is None and self._revalidate():
+            view = self._views_for(table_id).get(title)
+        if view is not None and view_type is not None and view.get('type') != view_type:
+            return None
+        return view
+
+    def add_view(self, table_id: str, view: Dict[str, Any]):
+        """Enregistre une vue créée pendant l'exécution"""
+        if not view.get('title'):
+            return
+        with self._lock:
+            self._views_for(table_id)[view['title']] = view
+            self._save()
+
+    # Colonnes
+
+    def get_columns(self, table_id: str) -> Dict[str, Dict[str, Any]]:
+        """Colonnes de la table indexées par column_name"""
+        self._ensure_loaded()
+        columns = self._columns.get(table_id)
+        if columns is None:
+            with self._lock:
+                columns = self._columns.get(table_id)
+                if columns is None:
+                    response = self._request('GET', f'/meta/tables/{table_id}')
+                    raw = response.get('columns', []) if isinstance(response, dict) else []
+                    columns = {col['column_name']: col for col in raw if isinstance(col, dict) and col.get('column_name')}
+                    self._columns[table_id] = columns
+                    self._save()
+        return columns
+
+    def invalidate_columns(self, table_id: str):
+        with self._lock:
+            self._columns.pop(table_id, None)
+            self._save()
+
+    # Persistance
+
+    def _load_from_disk(self) -> bool:
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return False
+        try:
+            with open(self.cache_path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Instantané de métadonnées illisible ({self.cache_path}): {str(e)}")
+            return False
+        if data.get('base_id') != self.base_id:
+            return False
+        age = time.time() - data.get('fetched_at', 0)
+        if age > self.ttl:
+            logger.info(f"Instantané de métadonnées expiré ({int(age)}s), rechargement")
+            return False
+        self._tables_by_name = data.get('tables', {})
+        self._views = data.get('views', {})
+        self._columns = data.get('columns', {})
+        self.fetched_at = data['fetched_at']
+        self._from_cache = True
+        logger.info(f"Métadonnées chargées depuis {self.cache_path} ({int(age)}s)")
+        return True
+
+    def _save(self):
+        if not self.cache_path:
+            return
+        data = {
+            'base_id': self.base_id,
+            'fetched_at': self.fetched_at,
+            'tables': self._tables_by_name,
+            'views': self._views,
+            'columns': self._columns,
+        }
+        tmp_path = f"{self.cache_path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logger.warning(f"Impossible d'enregistrer l'instantané de métadonnées: {str(e)}")
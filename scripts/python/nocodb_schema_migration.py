@@ -0,0 +1,139 @@
+"""
+Diff de schéma et migration incrémentale des tables festival existantes.
+
+`create_table` s'arrête dès que la table existe : une modification de `get_columns()` (nouvelle
+option, nouvelle colonne, champ devenu obligatoire...) n'est jamais appliquée. Ce module compare
+les colonnes déclarées à la table réelle et produit un plan d'opérations minimal :
+- `create` : colonne déclarée absente de la table
+- `update` : colonne existante dont le titre, le type, le caractère obligatoire, l'aide ou les options diffèrent
+
+Les colonnes présentes dans la table mais non déclarées ne sont jamais supprimées (données conservées),
+et les options existantes d'un SingleSelect sont gardées : les nouvelles sont ajoutées à la suite.
+"""
+
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SELECT_TYPES = frozenset({'SingleSelect', 'MultiSelect'})
+
+
+def _option_titles(column: Dict[str, Any]) -> List[str]:
+    options = (column.get('colOptions') or {}).get('options') or []
+    return [opt.get('title') for opt in options if isinstance(opt, dict)]
+
+
+def parse_meta(meta: Any) -> Dict[str, Any]:
+    """Champ `meta` NocoDB (table ou colonne), renvoyé selon les versions sous forme d'objet ou de chaîne JSON"""
+    if isinstance(meta, str):
+        try:
+            meta = json.loads(meta)
+        except ValueError:
+            return {}
+    return meta if isinstance(meta, dict) else {}
+
+
+def _help(column: Dict[str, Any]) -> Optional[str]:
+    return parse_meta(column.get('meta')).get('help')
+
+
+def diff_column(declared: Dict[str, Any], live: Dict[str, Any]) -> Dict[str, Any]:
+    """Différences champ par champ : {champ: (valeur actuelle, valeur déclarée)}"""
+    changes = {}
+    if declared.get('title') != live.get('title'):
+        changes['title'] = (live.get('title'), declared.get('title'))
+    if declared.get('uidt') != live.get('uidt'):
+        changes['uidt'] = (live.get('uidt'), declared.get('uidt'))
+    if bool(declared.get('rqd')) != bool(live.get('rqd')):
+        changes['rqd'] = (bool(live.get('rqd')), bool(declared.get('rqd')))
+    if _help(declared) is not None and _help(declared) != _help(live):
+        changes['help'] = (_help(live), _help(declared))
+    if declared.get('uidt') in SELECT_TYPES:
+        live_options = _option_titles(live)
+        missing = [opt for opt in _option_titles(declared) if opt not in live_options]
+        if missing:
+            changes['options'] = (live_options, live_options + missing)
+    return changes
+
+
+def _update_payload(declared: Dict[str, Any], live: Dict[str, Any], changes: Dict[str, Any]) -> Dict[str, Any]:
+    """Définition complète de la colonne attendue par PATCH /meta/columns/{columnId}"""
+    payload = {
+        'column_name': live['column_name'],
+        'title': declared.get('title', live.get('title')),
+        'uidt': declared.get('uidt', live.get('uidt')),
+        'rqd': bool(declared.get('rqd')),
+    }
+    meta = parse_meta(live.get('meta'))
+    meta.update(parse_meta(declared.get('meta')))
+    if meta:
+        payload['meta'] = meta
+    if payload['uidt'] in SELECT_TYPES:
+        # Garder les options existantes (avec leur id) pour ne pas perdre les valeurs déjà saisies
+        live_options = list((live.get('colOptions') or {}).get('options') or [])
+        new_titles = changes['options'][1][len(live_options):] if 'options' in changes else []
+        payload['colOptions'] = {'options': live_options + [{'title': title} for title in new_titles]}
+    return payload
+
+
+def plan_migration(
+    declared_columns: List[Dict[str, Any]],
+    live_columns: Dict[str, Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """
+    Compare les colonnes déclarées à celles de la table (indexées par column_name)
+    et renvoie la liste minimale d'opérations à effectuer.
+    """
+    plan = []
+    for declared in declared_columns:
+        column_name = declared['column_name']
+        live = live_columns.get(column_name)
+        if live is None:
+            plan.append({
+                'action': 'create',
+                'column_name': column_name,
+                'payload': declared
+            })
+            continue
+        changes = diff_column(declared, live)
+        if changes:
+            plan.append({
+                'action': 'update',
+                'column_name': column_name,
+                'column_id': live.get('id'),
+                'changes': changes,
+                'payload': _update_payload(declared, live, changes)
+            })
+    return plan
+
+
+def format_plan(table_name: str, plan: List[Dict[str, Any]]) -> str:
+    """Résumé lisible d'un plan de migration"""
+    if not plan:
+        return f"{table_name}: schéma à jour"
+    lines = [f"{table_name}: {len(plan)} opération(s)"]
+    for op in plan:
+        if op['action'] == 'create':
+            lines.append(f"  + {op['column_name']} ({op['payload'].get('uidt')})")
+        else:
+            for field, (current, wanted) in op['changes'].items():
+                lines.append(f"  ~ {op['column_name']}.{field}: {current!r} -> {wanted!r}")
+    return "\n".join(lines)
+
+
+def apply_migration(request, table_id: str, plan: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Applique un plan via `request(method, endpoint, data)` (FestivalFormCreator._make_request).
+    Renvoie les réponses de l'API, dans l'ordre du plan.
+    """
+    responses = []
+    for op in plan:
+        if op['action'] == 'create':
+            logger.info(f"Ajout de la colonne {op['column_name']}...")
+            responses.append(request('POST', f'/meta/tables/{table_id}/columns', op['payload']))
+        else:
+            logger.info(f"Mise à jour de la colonne {op['column_name']} ({', '.join(op['changes'])})...")
+            responses.append(request('PATCH', f"/meta/columns/{op['column_id']}", op['payload']))
+    return responses
@@ -0,0 +1,625 @@
+"""
+Serveur NocoDB local de substitution.
+
+Sert les endpoints `/api/v2/meta/...` utilisés par `create_table`, `create_form_view` et les migrations,
+ainsi que l'API de données `/api/v2/tables/{id}/records`, avec un état en mémoire (tables, colonnes,
+vues, enregistrements, webhooks), une latence configurable et l'injection d'erreurs 429/5xx.
+Les webhooks enregistrés sont appelés (dans l'ordre, depuis un thread dédié) après chaque
+création, modification ou suppression d'enregistrements.
+Permet de tester et de mesurer le provisionnement sans accès réseau.
+
+Utilisation dans un script :
+
+    with NocoDBStub(latency=0.02) as stub:
+        os.environ['NOCODB_BASE_URL'] = stub.base_url
+        create_all_forms()
+
+En ligne de commande :
+
+    python nocodb_stub.py --port 8080 --latency 0.05 --error-rate 0.1
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import queue
+import random
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_ID = 'stub_base'
+DEFAULT_TOKEN = 'stub_token'
+# Taille de page maximale de l'API de données (limite par défaut de NocoDB)
+MAX_PAGE_SIZE = 1000
+
+# Clauses acceptées dans `where` : (Champ,op,valeur) ou (Champ,op,exactDate,valeur), combinées
+# par ~and / ~or (évaluées de gauche à droite) et regroupables entre parenthèses
+WHERE_CLAUSE = re.compile(r'^(?P<field>[^,()]+),(?P<op>eq|neq|gt|gte|lt|lte|is|isnot)(?:,exactDate)?,(?P<value>[^()]*)$')
+WHERE_OPERATORS = {
+    'eq': lambda a, b: a == b,
+    'neq': lambda a, b: a != b,
+    'gt': lambda a, b: a is not None and a > b,
+    'gte': lambda a, b: a is not None and a >= b,
+    'lt': lambda a, b: a is not None and a < b,
+    'lte': lambda a, b: a is not None and a <= b,
+    # Seule la valeur `null` est reconnue
+    'is': lambda a, b: a is None,
+    'isnot': lambda a, b: a is not None,
+}
+
+# Colonnes système ajoutées par NocoDB à chaque table
+SYSTEM_COLUMNS = [
+    {'title': 'Id', 'column_name': 'id', 'uidt': 'ID', 'pk': True, 'system': True},
+    {'title': 'CreatedAt', 'column_name': 'created_at', 'uidt': 'CreatedTime', 'system': True},
+    {'title': 'UpdatedAt', 'column_name': 'updated_at', 'uidt': 'LastModifiedTime', 'system': True},
+]
+
+
+class StubError(Exception):
+    """Erreur renvoyée au client avec un statut HTTP"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class NocoDBStubState:
+    """État en mémoire d'une instance NocoDB : tables, colonnes et vues par base"""
+
+    def __init__(self, base_id: str = DEFAULT_BASE_ID):
+        self.base_id = base_id
+        self.lock = threading.RLock()
+        self._ids = itertools.count(1)
+        self.tables: Dict[str, Dict[str, Any]] = {}
+        self.columns: Dict[str, Dict[str, Any]] = {}
+        self.views: Dict[str, List[Dict[str, Any]]] = {}
+        self.records: Dict[str, Dict[int, Dict[str, Any]]] = {}
+        self._record_ids: Dict[str, itertools.count] = {}
+        self.hooks: Dict[str, List[Dict[str, Any]]] = {}
+        # Appels de webhooks en attente : (url, en-têtes, charge utile)
+        self.deliveries: queue.Queue = queue.Queue()
+
+    def next_id(self, prefix: str) -> str:
+        return f"{prefix}{next(self._ids):06d}"
+
+    def _check_base(self, base_id: str):
+        if base_id != self.base_id:
+            raise StubError(404, f"Base '{base_id}' not found")
+
+    def _get_table(self, table_id: str) -> Dict[str, Any]:
+        table = self.tables.get(table_id)
+        if table is None:
+            raise StubError(404, f"Table '{table_id}' not found")
+        return table
+
+    def _new_column(self, table_id: str, column: Dict[str, Any], column_id: Optional[str] = None) -> Dict[str, Any]:
+        column = json.loads(json.dumps(column))
+        column['id'] = column_id or self.next_id('cl_')
+        column['fk_model_id'] = table_id
+        for option in (column.get('colOptions') or {}).get('options') or []:
+            option.setdefault('id', self.next_id('sl_'))
+        self.columns[column['id']] = column
+        return column
+
+    def table_by_name(self, table_name: str) -> Optional[Dict[str, Any]]:
+        return next((t for t in self.tables.values() if t['table_name'] == table_name), None)
+
+    def _table_summary(self, table: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: value for key, value in table.items() if key != 'columns'}
+
+    # Tables
+
+    def list_tables(self, base_id: str) -> Dict[str, Any]:
+        self._check_base(base_id)
+        return {'list': [self._table_summary(t) for t in self.tables.values()], 'pageInfo': {'totalRows': len(self.tables)}}
+
+    def create_table(self, base_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        self._check_base(base_id)
+        table_name = body.get('table_name')
+        if not table_name:
+            raise StubError(400, "table_name is required")
+        if any(t['table_name'] == table_name for t in self.tables.values()):
+            raise StubError(400, "Table already exists")
+        table_id = self.next_id('md_')
+        table = {
+            'id': table_id,
+            'base_id': base_id,
+            'table_name': table_name,
+            'title': body.get('title', table_name),
+            'meta': body.get('meta'),
+            'columns': [],
+        }
+        for column in SYSTEM_COLUMNS + list(body.get('columns') or []):
+            table['columns'].append(self._new_column(table_id, column))
+        self.tables[table_id] = table
+        self.records[table_id] = {}
+        self._record_ids[table_id] = itertools.count(1)
+        self.views[table_id] = [{'id': self.next_id('vw_'), 'title': table['title'], 'type': 3, 'fk_model_id': table_id}]
+        self.hooks[table_id] = []
+        return table
+
+    def get_table(self, table_id: str) -> Dict[str, Any]:
+        return self._get_table(table_id)
+
+    def update_table(self, table_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        table = self._get_table(table_id)
+        for key in ('title', 'meta'):
+            if key in body:
+                table[key] = body[key]
+        return {'msg': 'The table has been updated successfully'}
+
+    # Colonnes
+
+    def create_column(self, table_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        table = self._get_table(table_id)
+        if any(c['column_name'] == body.get('column_name') for c in table['columns']):
+            raise StubError(400, "Duplicate column name")
+        table['columns'].append(self._new_column(table_id, body))
+        return table
+
+    def update_column(self, column_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        column = self.columns.get(column_id)
+        if column is None:
+            raise StubError(404, f"Column '{column_id}' not found")
+        table = self._get_table(column['fk_model_id'])
+        updated = self._new_column(table['id'], dict(column, **body), column_id)
+        table['columns'] = [updated if c['id'] == column_id else c for c in table['columns']]
+        return table
+
+    # Vues
+
+    def list_views(self, table_id: str) -> Dict[str, Any]:
+        self._get_table(table_id)
+        return {'list': self.views.get(table_id, []), 'pageInfo': {'totalRows': len(self.views.get(table_id, []))}}
+
+    def create_form(self, table_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        self._get_table(table_id)
+        view = dict(body, id=self.next_id('vw_'), type=1, fk_model_id=table_id)
+        self.views.setdefault(table_id, []).append(view)
+        return view
+
+    # Webhooks
+
+    def list_hooks(self, table_id: str) -> Dict[str, Any]:
+        self._get_table(table_id)
+        return {'list': self.hooks[table_id], 'pageInfo': {'totalRows': len(self.hooks[table_id])}}
+
+    def create_hook(self, table_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        self._get_table(table_id)
+        hook = dict(body, id=self.next_id('hk_'), fk_model_id=table_id)
+        hook.setdefault('event', 'after')
+        hook.setdefault('active', True)
+        self.hooks[table_id].append(hook)
+        return hook
+
+    def update_hook(self, hook_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        hook = next((h for hooks in self.hooks.values() for h in hooks if h['id'] == hook_id), None)
+        if hook is None:
+            raise StubError(404, f"Hook '{hook_id}' not found")
+        hook.update({key: value for key, value in body.items() if key not in ('id', 'fk_model_id')})
+        return hook
+
+    def _emit(self, table_id: str, operation: str, rows: List[Dict[str, Any]], previous_rows=None):
+        """Met en file les appels des webhooks « after » de la table pour cette opération"""
+        table = self.tables[table_id]
+        for hook in self.hooks.get(table_id, []):
+            if not hook.get('active') or hook.get('event') != 'after' or hook.get('operation') != operation:
+                continue
+            notification = (hook.get('notification') or {}).get('payload') or {}
+            if not notification.get('path'):
+                continue
+            headers = {
+                header['name']: header['value']
+                for header in notification.get('headers') or []
+                if header.get('enabled', True) and header.get('name')
+            }
+            # Comme NocoDB : titre de la table dans table_name, et un simple compte pour bulkInsert
+            data = {'table_id': table_id, 'table_name': table['title']}
+            if operation == 'bulkInsert':
+                data['row_inserted'] = len(rows)
+            else:
+                data['rows'] = json.loads(json.dumps(rows))
+            if previous_rows is not None:
+                data['previous_rows'] = previous_rows
+            payload = {'type': f"records.after.{operation}", 'id': str(uuid.uuid4()), 'version': 'v2', 'data': data}
+            self.deliveries.put((notification['path'], headers, payload))
+
+    # Enregistrements
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.now(timezone.utc).isoformat(sep=' ', timespec='milliseconds')
+
+    @staticmethod
+    def _parse_where(where: str):
+        """Prédicat `row -> bool` d'une expression `where` (valeurs comparées comme chaînes sauf Id)"""
+        pos = 0
+
+        def clause(text: str):
+            match = WHERE_CLAUSE.match(text)
+            if not match:
+                raise StubError(400, f"Unsupported where clause: {where}")
+            field, op, value = match.group('field'), match.group('op'), match.group('value')
+            compare = WHERE_OPERATORS[op]
+            if field == 'Id' and op not in ('is', 'isnot'):
+                return lambda row: compare(row.get(field), int(value))
+            return lambda row: compare(None if row.get(field) is None else str(row.get(field)), value)
+
+        def term():
+            nonlocal pos
+            if not where.startswith('(', pos):
+                raise StubError(400, f"Unsupported where clause: {where}")
+            pos += 1
+            if where.startswith('(', pos):
+                predicate = expression()
+            else:
+                end = where.find(')', pos)
+                if end < 0:
+                    raise StubError(400, f"Unsupported where clause: {where}")
+                predicate = clause(where[pos:end])
+                pos = end
+            if not where.startswith(')', pos):
+                raise StubError(400, f"Unsupported where clause: {where}")
+            pos += 1
+            return predicate
+
+        def expression():
+            nonlocal pos
+            predicate = term()
+            while where.startswith(('~and', '~or'), pos):
+                both = where.startswith('~and', pos)
+                pos += 4 if both else 3
+                left, right = predicate, term()
+                if both:
+                    predicate = lambda row, left=left, right=right: left(row) and right(row)
+                else:
+                    predicate = lambda row, left=left, right=right: left(row) or right(row)
+            return predicate
+
+        predicate = expression()
+        if pos != len(where):
+            raise StubError(400, f"Unsupported where clause: {where}")
+        return predicate
+
+    def _filter_records(self, table_id: str, query: Dict[str, List[str]]) -> List[Dict[str, Any]]:
+        """Applique `where`"""
+        self._get_table(table_id)
+        rows = list(self.records[table_id].values())
+        where = (query.get('where') or [''])[0]
+        if not where:
+            return rows
+        predicate = self._parse_where(where)
+        return [row for row in rows if predicate(row)]
+
+    def count_records(self, table_id: str, query: Dict[str, List[str]]) -> Dict[str, Any]:
+        return {'count': len(self._filter_records(table_id, query))}
+
+    def list_records(self, table_id: str, query: Dict[str, List[str]]) -> Dict[str, Any]:
+        rows = self._filter_records(table_id, query)
+        # Tri sur plusieurs champs (`UpdatedAt,Id`), le dernier d'abord (tri stable)
+        for sort in reversed((query.get('sort') or ['Id'])[0].split(',')):
+            field, descending = sort.strip().lstrip('-'), sort.strip().startswith('-')
+            rows.sort(key=lambda row: (row.get(field) is None, row.get(field)), reverse=descending)
+
+        limit = min(int((query.get('limit') or [25])[0]), MAX_PAGE_SIZE)
+        offset = int((query.get('offset') or [0])[0])
+        page = rows[offset:offset + limit]
+        fields = (query.get('fields') or [''])[0]
+        if fields:
+            wanted = [name.strip() for name in fields.split(',')]
+            page = [{name: row.get(name) for name in wanted} for row in page]
+        return {
+            'list': page,
+            'pageInfo': {
+                'totalRows': len(rows),
+                'page': offset // limit + 1 if limit else 1,
+                'pageSize': limit,
+                'isFirstPage': offset == 0,
+                'isLastPage': offset + limit >= len(rows),
+            },
+        }
+
+    def create_records(self, table_id: str, body: Any) -> Any:
+        self._get_table(table_id)
+        rows = body if isinstance(body, list) else [body]
+        created = []
+        for row in rows:
+            record_id = next(self._record_ids[table_id])
+            now = self._now()
+            self.records[table_id][record_id] = dict(row, Id=record_id, CreatedAt=now, UpdatedAt=now)
+            created.append({'Id': record_id})
+        self._emit(
+            table_id,
+            'bulkInsert' if isinstance(body, list) else 'insert',
+            [self.records[table_id][row['Id']] for row in created]
+        )
+        return created if isinstance(body, list) else created[0]
+
+    def update_records(self, table_id: str, body: Any) -> Any:
+        self._get_table(table_id)
+        rows = body if isinstance(body, list) else [body]
+        previous = []
+        for row in rows:
+            record = self.records[table_id].get(row.get('Id'))
+            if record is None:
+                raise StubError(404, f"Record '{row.get('Id')}' not found")
+            previous.append(dict(record))
+            record.update(row, UpdatedAt=self._now())
+        self._emit(
+            table_id,
+            'bulkUpdate' if isinstance(body, list) else 'update',
+            [self.records[table_id][row['Id']] for row in rows],
+            previous
+        )
+        updated = [{'Id': row['Id']} for row in rows]
+        return updated if isinstance(body, list) else updated[0]
+
+    def delete_records(self, table_id: str, body: Any) -> Any:
+        self._get_table(table_id)
+        rows = body if isinstance(body, list) else [body]
+        removed = []
+        for row in rows:
+            record = self.records[table_id].pop(row.get('Id'), None)
+            if record is not None:
+                removed.append(record)
+        if removed:
+            self._emit(table_id, 'bulkDelete' if isinstance(body, list) else 'delete', removed)
+        deleted = [{'Id': row.get('Id')} for row in rows]
+        return deleted if isinstance(body, list) else deleted[0]
+
+
+# (méthode, motif d'URL, méthode de NocoDBStubState, lit un corps JSON, reçoit la query string)
+Route = Tuple[str, re.Pattern, str, bool, bool]
+
+ROUTES: List[Route] = [
+    ('GET', re.compile(r'^/api/v2/meta/bases/([^/]+)/tables$'), 'list_tables', False, False),
+    ('POST', re.compile(r'^/api/v2/meta/bases/([^/]+)/tables$'), 'create_table', True, False),
+    ('GET', re.compile(r'^/api/v2/meta/tables/([^/]+)$'), 'get_table', False, False),
+    ('PATCH', re.compile(r'^/api/v2/meta/tables/([^/]+)$'), 'update_table', True, False),
+    ('POST', re.compile(r'^/api/v2/meta/tables/([^/]+)/columns$'), 'create_column', True, False),
+    ('PATCH', re.compile(r'^/api/v2/meta/columns/([^/]+)$'), 'update_column', True, False),
+    ('GET', re.compile(r'^/api/v2/meta/tables/([^/]+)/views$'), 'list_views', False, False),
+    ('POST', re.compile(r'^/api/v2/meta/tables/([^/]+)/forms$'), 'create_form', True, False),
+    ('GET', re.compile(r'^/api/v2/meta/tables/([^/]+)/hooks$'), 'list_hooks', False, False),
+    ('POST', re.compile(r'^/api/v2/meta/tables/([^/]+)/hooks$'), 'create_hook', True, False),
+    ('PATCH', re.compile(r'^/api/v2/meta/hooks/([^/]+)$'), 'update_hook', True, False),
+    ('GET', re.compile(r'^/api/v2/tables/([^/]+)/records$'), 'list_records', False, True),
+    ('GET', re.compile(r'^/api/v2/tables/([^/]+)/records/count$'), 'count_records', False, True),
+    ('POST', re.compile(r'^/api/v2/tables/([^/]+)/records$'), 'create_records', True, False),
+    ('PATCH', re.compile(r'^/api/v2/tables/([^/]+)/records$'), 'update_records', True, False),
+    ('DELETE', re.compile(r'^/api/v2/tables/([^/]+)/records$'), 'delete_records', True, False),
+]
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    server_version = 'NocoDBStub/1.0'
+    protocol_version = 'HTTP/1.1'
+    # En-têtes et corps partent en deux écritures : sans TCP_NODELAY, Nagle + ACK retardé
+    # ajoutent ~40 ms à chaque réponse d'une connexion persistante
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def _send(self, status: int, payload: Any, headers: Optional[Dict[str, str]] = None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self, method: str):
+        stub: 'NocoDBStub' = self.server.stub
+        parsed = urlparse(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        raw_body = self.rfile.read(length) if length else b''
+        stub._record(method, parsed.path)
+
+        if stub.latency:
+            time.sleep(stub.latency)
+
+        fault = stub._next_fault()
+        if fault is not None:
+            status, retry_after = fault
+            headers = {'Retry-After': str(retry_after)} if retry_after is not None else None
+            return self._send(status, {'msg': 'Injected error'}, headers)
+
+        if stub.token and self.headers.get('xc-token') != stub.token:
+            return self._send(401, {'msg': 'Invalid token'})
+
+        for route_method, pattern, handler_name, has_body, has_query in ROUTES:
+            match = pattern.match(parsed.path)
+            if route_method != method or not match:
+                continue
+            args = list(match.groups())
+            if has_body:
+                try:
+                    args.append(json.loads(raw_body or b'{}'))
+                except ValueError:
+                    return self._send(400, {'msg': 'Invalid JSON body'})
+            try:
+                with stub.state.lock:
+                    if has_query:
+                        args.append(parse_qs(parsed.query))
+                    result = getattr(stub.state, handler_name)(*args)
+            except StubError as e:
+                return self._send(e.status, {'msg': str(e)})
+            return self._send(200, result)
+        return self._send(404, {'msg': f'Route {method} {parsed.path} not found'})
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def do_PATCH(self):
+        self._handle('PATCH')
+
+    def do_DELETE(self):
+        self._handle('DELETE')
+
+
+class NocoDBStub:
+    """Serveur HTTP local (thread en arrière-plan) imitant l'API meta de NocoDB"""
+
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        base_id: str = DEFAULT_BASE_ID,
+        token: Optional[str] = DEFAULT_TOKEN,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        seed: Optional[int] = None,
+    ):
+        self.state = NocoDBStubState(base_id)
+        self.token = token
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.requests: List[Tuple[str, str]] = []
+        self._faults: deque = deque()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _StubHandler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread: Optional[threading.Thread] = None
+        self._hook_thread: Optional[threading.Thread] = None
+        # Appels de webhooks effectués : (url, statut HTTP ou None en cas d'échec)
+        self.hook_deliveries: List[Tuple[str, Optional[int]]] = []
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def base_id(self) -> str:
+        return self.state.base_id
+
+    def env(self) -> Dict[str, str]:
+        """Variables d'environnement pointant FestivalFormCreator vers ce serveur"""
+        return {
+            'NOCODB_BASE_URL': self.base_url,
+            'NOCODB_BASE_ID': self.base_id,
+            'NOCODB_API_TOKEN': self.token or DEFAULT_TOKEN,
+        }
+
+    def inject_errors(self, status: int = 429, count: int = 1, retry_after: Optional[float] = None):
+        """Les `count` prochaines requêtes recevront `status` (avec `Retry-After` si fourni)"""
+        with self._lock:
+            for _ in range(count):
+                self._faults.append((status, retry_after))
+
+    def _next_fault(self) -> Optional[Tuple[int, Optional[float]]]:
+        with self._lock:
+            if self._faults:
+                return self._faults.popleft()
+            if self.error_rate and self._random.random() < self.error_rate:
+                return (self.error_status, None)
+        return None
+
+    def _record(self, method: str, path: str):
+        with self._lock:
+            self.requests.append((method, path))
+
+    def _deliver_hooks(self):
+        """Appelle les webhooks un par un, dans l'ordre des modifications"""
+        while True:
+            delivery = self.state.deliveries.get()
+            if delivery is None:
+                return
+            url, headers, payload = delivery
+            request = urllib.request.Request(
+                url,
+                data=json.dumps(payload).encode('utf-8'),
+                headers=dict(headers, **{'Content-Type': 'application/json'}),
+                method='POST',
+            )
+            try:
+                with urllib.request.urlopen(request, timeout=10) as response:
+                    status = response.status
+            except urllib.error.HTTPError as e:
+                status = e.code
+            except OSError as e:
+                logger.warning(f"Webhook {url} injoignable: {str(e)}")
+                status = None
+            with self._lock:
+                self.hook_deliveries.append((url, status))
+
+    def start(self) -> 'NocoDBStub':
+        self._thread = threading.Thread(target=self._server.serve_forever, name='nocodb-stub', daemon=True)
+        self._thread.start()
+        self._hook_thread = threading.Thread(target=self._deliver_hooks, name='nocodb-stub-hooks', daemon=True)
+        self._hook_thread.start()
+        logger.info(f"Serveur NocoDB local démarré sur {self.base_url} (base {self.base_id})")
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._hook_thread is not None:
+            self.state.deliveries.put(None)
+            self._hook_thread.join()
+            self._hook_thread = None
+
+    def __enter__(self) -> 'NocoDBStub':
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serveur NocoDB local pour tests hors ligne")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--base-id', default=DEFAULT_BASE_ID)
+    parser.add_argument('--token', default=DEFAULT_TOKEN)
+    parser.add_argument('--latency', type=float, default=0.0, help="Latence ajoutée à chaque requête (secondes)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Proportion de requêtes en erreur")
+    parser.add_argument('--error-status', type=int, default=503)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    stub = NocoDBStub(
+        host=args.host,
+        port=args.port,
+        base_id=args.base_id,
+        token=args.token,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+    )
+    for name, value in stub.env().items():
+        print(f"{name}={value}")
+    stub.start()
+    try:
+        stub._thread.join()
+    except KeyboardInterrupt:
+        stub.stop()
+
+
+if __name__ == "__main__":
+    main()
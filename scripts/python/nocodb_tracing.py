@@ -0,0 +1,170 @@
+"""
+Instrumentation des appels NocoDB : un span par requête HTTP et par phase de provisionnement.
+
+- requête HTTP (`http`) : méthode, endpoint sans identifiants, statut, latence, tailles des corps, tentatives
+- phase (`phase`) : `create_table`, `create_form_view`, provisionnement complet d'un type de formulaire
+
+Les spans sont agrégés en histogrammes de latence par endpoint / phase et exportés soit en JSON
+(`trace_format='json'`), soit au format Chrome trace (`trace_format='chrome'`, à ouvrir dans chrome://tracing
+ou https://ui.perfetto.dev).
+
+    python festival_form_creator.py --trace trace.json --trace-format chrome
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List
+
+TRACE_FORMATS = ('json', 'chrome')
+# Bornes supérieures des classes de l'histogramme, en millisecondes
+HISTOGRAM_BOUNDS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Tracer:
+    """Collecteur de spans partagé entre threads ; inactif (aucun coût) si enabled=False"""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.spans: List[Dict[str, Any]] = []
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, category: str, **args: Any) -> Iterator[Dict[str, Any]]:
+        """
+        Mesure le bloc ; le dictionnaire renvoyé peut être complété (statut, tailles...).
+        Une exception levée dans le bloc est notée dans `error` puis propagée.
+        """
+        if not self.enabled:
+            yield args
+            return
+        start = time.perf_counter()
+        try:
+            yield args
+        except BaseException as e:
+            args.setdefault('error', e.__class__.__name__)
+            raise
+        finally:
+            end = time.perf_counter()
+            span = {
+                'name': name,
+                'category': category,
+                'start_ms': (start - self._origin) * 1000,
+                'duration_ms': (end - start) * 1000,
+                'thread': threading.get_ident(),
+                'args': args,
+            }
+            with self._lock:
+                self.spans.append(span)
+
+    # Agrégation
+
+    def histograms(self) -> Dict[str, Dict[str, Any]]:
+        """Statistiques de latence par endpoint (`GET /api/v2/...`) ou par phase"""
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        with self._lock:
+            spans = list(self.spans)
+        for span in spans:
+            args = span['args']
+            key = f"{args.get('method')} {args.get('endpoint')}" if span['category'] == 'http' else span['name']
+            groups.setdefault(key, []).append(span)
+
+        histograms = {}
+        for key, group in sorted(groups.items()):
+            durations = sorted(span['duration_ms'] for span in group)
+            buckets = {f"<={bound}ms": 0 for bound in HISTOGRAM_BOUNDS_MS}
+            buckets['>10000ms'] = 0
+            for duration in durations:
+                bound = next((b for b in HISTOGRAM_BOUNDS_MS if duration <= b), None)
+                buckets[f"<={bound}ms" if bound is not None else '>10000ms'] += 1
+            histograms[key] = {
+                'category': group[0]['category'],
+                'count': len(durations),
+                'errors': sum(1 for span in group if _is_error(span['args'])),
+                'retries': sum(span['args'].get('retries', 0) for span in group),
+                'request_bytes': sum(span['args'].get('request_bytes', 0) for span in group),
+                'response_bytes': sum(span['args'].get('response_bytes', 0) for span in group),
+                'admission_wait_ms': round(sum(span['args'].get('admission_wait_ms', 0) for span in group), 3),
+                'total_ms': round(sum(durations), 3),
+                'min_ms': round(durations[0], 3),
+                'p50_ms': round(_percentile(durations, 50), 3),
+                'p90_ms': round(_percentile(durations, 90), 3),
+                'p99_ms': round(_percentile(durations, 99), 3),
+                'max_ms': round(durations[-1], 3),
+                'buckets': buckets,
+            }
+        return histograms
+
+    # Export
+
+    def to_json(self) -> Dict[str, Any]:
+        with self._lock:
+            spans = list(self.spans)
+        return {
+            'spans': len(spans),
+            'histograms': self.histograms(),
+            'trace': sorted(spans, key=lambda span: span['start_ms']),
+        }
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """Format « Trace Event » : événements complets (ph=X), temps en microsecondes"""
+        pid = os.getpid()
+        with self._lock:
+            spans = list(self.spans)
+        events = [
+            {
+                'name': f"{span['args'].get('method')} {span['args'].get('endpoint')}"
+                if span['category'] == 'http' else span['name'],
+                'cat': span['category'],
+                'ph': 'X',
+                'ts': round(span['start_ms'] * 1000, 1),
+                'dur': round(span['duration_ms'] * 1000, 1),
+                'pid': pid,
+                'tid': span['thread'],
+                'args': span['args'],
+            }
+            for span in sorted(spans, key=lambda span: span['start_ms'])
+        ]
+        return {'traceEvents': events, 'displayTimeUnit': 'ms', 'otherData': {'histograms': self.histograms()}}
+
+    def export(self, path: str, trace_format: str = 'json'):
+        if trace_format not in TRACE_FORMATS:
+            raise ValueError(f"Format de trace inconnu: {trace_format} (attendu: {', '.join(TRACE_FORMATS)})")
+        payload = self.to_chrome_trace() if trace_format == 'chrome' else self.to_json()
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, path)
+
+
+# Traceur inactif utilisé par défaut
+NULL_TRACER = Tracer(enabled=False)
+
+
+def traced_phase(name: str) -> Callable:
+    """Décorateur de méthode : span `phase` sur self.tracer, annoté du type de formulaire"""
+    def decorator(method: Callable) -> Callable:
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.tracer.span(name, 'phase', form_type=getattr(self, 'form_type', None)):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _is_error(args: Dict[str, Any]) -> bool:
+    return 'error' in args or (args.get('status') or 0) >= 400
+
+
+def _percentile(sorted_values: List[float], percentile: float) -> float:
+    """Percentile par interpolation linéaire sur une liste triée non vide"""
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    rank = (len(sorted_values) - 1) * percentile / 100
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
@@ -0,0 +1,254 @@
+"""
+Couche de transport HTTP partagée pour l'API NocoDB.
+
+Toutes les instances de `FestivalFormCreator` passent par un même `NocoDBTransport` :
+- une `requests.Session` avec pool de connexions keep-alive (pas de nouveau handshake TLS par requête)
+- des timeouts explicites de connexion et de lecture
+- des tentatives bornées avec backoff exponentiel, en respectant `Retry-After` sur 429/5xx
+- optionnellement, un contrôle d'admission par jeton d'API partagé entre processus (`nocodb_admission.py`)
+"""
+
+import itertools
+import json as jsonlib
+import logging
+import random
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from nocodb_admission import AdmissionControl
+from nocodb_tracing import NULL_TRACER, Tracer
+
+logger = logging.getLogger(__name__)
+
+# Statuts pour lesquels le serveur a explicitement refusé la requête : on peut rejouer quelle que soit la méthode
+REJECTED_STATUSES = frozenset({429, 503})
+# Seul refus garanti sans traitement : un 503 peut suivre une écriture déjà validée (insertions en masse)
+THROTTLED_STATUSES = frozenset({429})
+# Statuts transitoires rejoués uniquement pour les méthodes idempotentes
+TRANSIENT_STATUSES = frozenset({500, 502, 504})
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+
+# Segments d'URL suivis d'un identifiant NocoDB
+_ID_SEGMENT = re.compile(r'/(bases|tables|columns|views|forms|hooks|records)/([^/?]+)')
+
+
+def endpoint_template(url: str) -> str:
+    """Chemin de l'endpoint sans les identifiants : /api/v2/meta/tables/md_123/views -> /api/v2/meta/tables/{id}/views"""
+    return _ID_SEGMENT.sub(lambda m: f"/{m.group(1)}/{{id}}", urlparse(url).path)
+
+
+class NocoDBTransport:
+    """Session HTTP partagée avec pool de connexions, timeouts et backoff"""
+
+    DEFAULT_TIMEOUT: Tuple[float, float] = (5.0, 30.0)
+
+    def __init__(
+        self,
+        pool_size: int = 10,
+        timeout: Tuple[float, float] = DEFAULT_TIMEOUT,
+        max_retries: int = 5,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        admission: Optional[AdmissionControl] = None,
+    ):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        # Seaux à jetons par jeton d'API (None : pas de limitation côté client)
+        self.admission = admission
+        self._session: Optional[requests.Session] = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        """Session créée à la première utilisation puis réutilisée par tous les appels"""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    session = requests.Session()
+                    # Les tentatives sont gérées ici, pas par urllib3
+                    adapter = HTTPAdapter(
+                        pool_connections=self.pool_size,
+                        pool_maxsize=self.pool_size,
+                        max_retries=0,
+                    )
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    self._session = session
+        return self._session
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        json: Any = None,
+        params: Optional[Dict[str, Any]] = None,
+        tracer: Tracer = NULL_TRACER,
+        retry_statuses: Optional[FrozenSet[int]] = None,
+    ) -> requests.Response:
+        """
+        Envoie une requête en rejouant les erreurs transitoires.
+        La dernière réponse est renvoyée telle quelle une fois les tentatives épuisées.
+        `retry_statuses` remplace les statuts rejoués (par défaut REJECTED_STATUSES, plus
+        TRANSIENT_STATUSES pour les méthodes idempotentes).
+        Un span `http` (toutes tentatives comprises) est enregistré sur `tracer`.
+        """
+        method = method.upper()
+        with tracer.span('request', 'http', method=method, endpoint=endpoint_template(url)) as span:
+            response = self._send(method, url, headers, json, params, span, retry_statuses)
+            if tracer.enabled:
+                span['status'] = response.status_code
+                span['request_bytes'] = len(response.request.body or b'') if response.request else 0
+                span['response_bytes'] = len(response.content)
+            return response
+
+    def _send(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Dict[str, str]],
+        json: Any,
+        params: Optional[Dict[str, Any]],
+        span: Dict[str, Any],
+        retry_statuses: Optional[FrozenSet[int]] = None,
+    ) -> requests.Response:
+        attempt = 0
+        # Les requêtes sans jeton (pièces jointes signées) ne comptent pas dans le quota
+        api_token = (headers or {}).get('xc-token') if self.admission is not None else None
+        while True:
+            span['retries'] = attempt
+            if api_token:
+                span['admission_wait_ms'] = span.get('admission_wait_ms', 0.0) + self.admission.acquire(api_token) * 1000
+            try:
+                response = self.session.request(
+                    method=method,
+                    url=url,
+                    headers=headers,
+                    json=json,
+                    params=params,
+                    timeout=self.timeout,
+                )
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if method not in IDEMPOTENT_METHODS or attempt >= self.max_retries:
+                    raise
+                delay = self._retry_delay(attempt)
+                logger.warning(f"{method} {url}: {e.__class__.__name__}, nouvelle tentative dans {delay:.1f}s")
+            else:
+                if api_token and response.status_code == 429:
+                    self.admission.penalize(api_token, self._retry_delay(attempt, response))
+                if not self._should_retry(method, response.status_code, retry_statuses) or attempt >= self.max_retries:
+                    return response
+                delay = self._retry_delay(attempt, response)
+                logger.warning(f"{method} {url}: HTTP {response.status_code}, nouvelle tentative dans {delay:.1f}s")
+                response.close()
+            attempt += 1
+            time.sleep(delay)
+
+    @staticmethod
+    def _should_retry(method: str, status_code: int, retry_statuses: Optional[FrozenSet[int]] = None) -> bool:
+        if retry_statuses is not None:
+            return status_code in retry_statuses
+        if status_code in REJECTED_STATUSES:
+            return True
+        return status_code in TRANSIENT_STATUSES and method in IDEMPOTENT_METHODS
+
+    def _retry_delay(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        """Délai avant la prochaine tentative : `Retry-After` si présent, sinon backoff exponentiel avec jitter"""
+        if response is not None:
+            retry_after = self._parse_retry_after(response.headers.get('Retry-After'))
+            if retry_after is not None:
+                return min(retry_after, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    @staticmethod
+    def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """`Retry-After` peut être un nombre de secondes ou une date HTTP"""
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def close(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+class DryRunTransport(NocoDBTransport):
+    """
+    Transport qui n'envoie rien : chaque requête est enregistrée dans `planned_requests`
+    et reçoit une réponse synthétique (listes vides, objets créés avec un identifiant fictif).
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.planned_requests: List[Dict[str, Any]] = []
+        self._ids = itertools.count(1)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        json: Any = None,
+        params: Optional[Dict[str, Any]] = None,
+        tracer: Tracer = NULL_TRACER,
+        retry_statuses: Optional[FrozenSet[int]] = None,
+    ) -> requests.Response:
+        method = method.upper()
+        with self._lock:
+            self.planned_requests.append({'method': method, 'url': url, 'params': params, 'json': json})
+            fake_id = f"dry_run_{next(self._ids)}"
+        logger.info(f"[dry-run] {method} {urlparse(url).path}")
+
+        if method == 'GET':
+            payload: Any = {'list': [], 'pageInfo': {'totalRows': 0}}
+        elif isinstance(json, dict):
+            payload = dict(json, id=fake_id)
+        else:
+            payload = {'id': fake_id}
+
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response.headers['Content-Type'] = 'application/json'
+        response._content = jsonlib.dumps(payload).encode('utf-8')
+        with tracer.span('request', 'http', method=method, endpoint=endpoint_template(url)) as span:
+            span.update(
+                status=200,
+                retries=0,
+                request_bytes=len(jsonlib.dumps(json)) if json is not None else 0,
+                response_bytes=len(response._content),
+            )
+        return response
+
+
+_shared_transport: Optional[NocoDBTransport] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_transport() -> NocoDBTransport:
+    """Transport unique du processus, partagé par tous les clients NocoDB"""
+    global _shared_transport
+    if _shared_transport is None:
+        with _shared_lock:
+            if _shared_transport is None:
+                _shared_transport = NocoDBTransport(admission=AdmissionControl.from_env())
+    return _shared_transport